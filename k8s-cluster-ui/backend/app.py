@@ -1,26 +1,316 @@
-from flask import Flask, jsonify, request, send_from_directory, g
+from flask import Flask, jsonify, request, send_from_directory, g, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import atexit
+import hmac
+import logging
 import os
+import json
 import time
+from telemetry import (REQUEST_DURATION, configure_logging, get_log_level, render_metrics, server_timing,
+                       set_log_level, start_request_timings, timed)
+
+logger = logging.getLogger(__name__)
 
 # Create a persistent EKS connector that lives outside request context
 from eks_connector import EKSConnector
+from connection_registry import create_connection_registry
+from snapshot_store import create_snapshot_store
+from http_cache import (MIN_COMPRESS_SIZE, choose_encoding, compress, content_etag, etag_matches, matched_etag,
+                        version_etag)
+# Share connections between worker processes, e.g. CONNECTION_REGISTRY=sqlite:////var/lib/k8s-ui/connections.db
+connection_registry_url = os.environ.get('CONNECTION_REGISTRY')
+# Warm restarts from saved connections and resource lists, e.g. SNAPSHOT_STORE=sqlite:////var/lib/k8s-ui/snapshots.db
+snapshot_store_url = os.environ.get('SNAPSHOT_STORE')
 # Create it once at module level instead of per request
-persistent_eks_connector = EKSConnector()
-print("Created persistent EKS connector")
-
-# Debug print to verify static folder path
+persistent_eks_connector = EKSConnector(
+    connection_pool_maxsize=int(os.environ.get('K8S_CONNECTION_POOL_MAXSIZE', 32)),
+    discovery_cache_ttl=int(os.environ.get('DISCOVERY_CACHE_TTL', 300)),
+    session_idle_ttl=int(os.environ.get('AWS_SESSION_IDLE_TTL', 900)),
+    list_reuse_window=float(os.environ.get('LIST_REUSE_WINDOW', 0)),
+    aggregate_timeout=float(os.environ.get('AGGREGATE_TIMEOUT', 10)),
+    connection_registry=create_connection_registry(connection_registry_url) if connection_registry_url else None,
+    registry_check_interval=float(os.environ.get('CONNECTION_REGISTRY_CHECK_INTERVAL', 2)),
+    log_streams_per_cluster=int(os.environ.get('LOG_STREAMS_PER_CLUSTER', 4)),
+    log_keepalive_interval=float(os.environ.get('LOG_KEEPALIVE_INTERVAL', 15)),
+    connect_timeout=float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 5)),
+    read_timeout=float(os.environ.get('UPSTREAM_READ_TIMEOUT', 30)),
+    breaker_failure_threshold=int(os.environ.get('BREAKER_FAILURE_THRESHOLD', 5)),
+    breaker_reset_timeout=float(os.environ.get('BREAKER_RESET_TIMEOUT', 30)),
+    health_check_interval=float(os.environ.get('HEALTH_CHECK_INTERVAL', 60)),
+    snapshot_store=create_snapshot_store(snapshot_store_url) if snapshot_store_url else None,
+    snapshot_interval=float(os.environ.get('SNAPSHOT_INTERVAL', 60))
+)
+logger.info("Created persistent EKS connector")
+
+# Log the static folder path to help diagnose missing frontend files
 static_folder_path = os.path.abspath("../frontend")
-print(f"Looking for static files in: {static_folder_path}")
+logger.debug(f"Looking for static files in: {static_folder_path}")
 
 # Initialize Flask app and CORS
 app = Flask(__name__, static_folder=static_folder_path, static_url_path="/")
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that records the serialization of responses as a request stage"""
+
+    def response(self, *args, **kwargs):
+        with timed("serialize", resource_type=resource_type_label((request.view_args or {}).get('resource_type'))):
+            return super().response(*args, **kwargs)
+
+
+app.json = TimedJSONProvider(app)
 CORS(app, resources={r"/api/*": {"origins": "*"}})  
 
+# Resource types served by the resources endpoints
+VALID_RESOURCE_TYPES = ['pods', 'deployments', 'services', 'nodes']
+
+# Seconds without changes after which an SSE heartbeat is sent
+SSE_HEARTBEAT_INTERVAL = int(os.environ.get('SSE_HEARTBEAT_INTERVAL', 15))
+# Reconnection delay suggested to EventSource clients
+SSE_RETRY_MS = 3000
+
+def resource_type_label(resource_type):
+    """Resource type as a metric label: unsupported types from the URL are dropped to keep the series bounded"""
+    return resource_type if resource_type in VALID_RESOURCE_TYPES else None
+
 # Use the persistent connector instead of creating one per request
 def get_eks_connector():
     return persistent_eks_connector
 
+_started = False
+
+def create_app():
+    """
+    Configure logging and start the background work of the connector, once per process.
+
+    Called by the server entry points (python app.py, the ASGI lifespan startup, or
+    gunicorn 'app:create_app()') rather than at import, so importing the module has no side effects.
+
+    Returns:
+        Flask: The Flask app
+    """
+    global _started
+    if _started:
+        return app
+    _started = True
+    # LOG_LEVEL can be changed later through PUT /api/log-level (when ADMIN_TOKEN is set); LOG_FORMAT=text gives
+    # human-readable lines
+    configure_logging(os.environ.get('LOG_LEVEL', 'INFO'), os.environ.get('LOG_FORMAT', 'json'))
+    persistent_eks_connector.restore_snapshots()
+    persistent_eks_connector.start_snapshot_writer()
+    # Save the latest changes when the process exits
+    atexit.register(persistent_eks_connector.stop_snapshot_writer)
+    persistent_eks_connector.start_health_monitor()
+    return app
+
+def shutdown_app():
+    """Stop the background work started by create_app, waiting for running health checks and saving snapshots"""
+    persistent_eks_connector.stop_health_monitor()
+    persistent_eks_connector.stop_snapshot_writer()
+
+def get_resource_query_args(args=None):
+    """Read the filtering, pagination and projection query parameters of a resources request"""
+    if args is None:
+        args = request.args
+    limit = args.get('limit')
+    if limit is not None:
+        if not limit.isdigit() or int(limit) <= 0:
+            raise ValueError("limit must be a positive integer")
+        limit = int(limit)
+
+    top = args.get('top')
+    if top is not None:
+        if not top.isdigit() or int(top) <= 0:
+            raise ValueError("top must be a positive integer")
+        top = int(top)
+
+    fields = args.get('fields')
+    return {
+        "namespace": args.get('namespace') or None,
+        "label_selector": args.get('labelSelector') or None,
+        "field_selector": args.get('fieldSelector') or None,
+        "limit": limit,
+        "continue_token": args.get('continue') or None,
+        "fields": [field.strip() for field in fields.split(',') if field.strip()] if fields else None,
+        "conditions": parse_conditions(args.get('where')),
+        "metrics": args.get('metrics') in ('1', 'true'),
+        "sort_by": args.get('sortBy') or None,
+        "top": top
+    }
+
+def parse_conditions(expression):
+    """Parse a where expression like "reason=CrashLoopBackOff,status!=Running" into (field, operator, value) tuples"""
+    conditions = []
+    for part in (expression or '').split(','):
+        if not part.strip():
+            continue
+        operator = '!=' if '!=' in part else '='
+        field, separator, value = part.partition(operator)
+        if not separator or not field.strip():
+            raise ValueError(f"Invalid where condition: {part.strip()}")
+        conditions.append((field.strip(), operator, value.strip()))
+    return conditions
+
+def wants_stream():
+    """Check whether the client asked for a streamed NDJSON response"""
+    return request.args.get('stream') in ('1', 'true') or 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def ndjson_response(items):
+    """Stream the items of a generator as newline-delimited JSON"""
+    def generate():
+        try:
+            for item in items:
+                yield json.dumps(item, separators=(',', ':')) + '\n'
+        except Exception as e:
+            # Headers are already sent, so report the failure as the last line
+            logger.error(f"Error while streaming response: {str(e)}")
+            yield json.dumps({"success": False, "message": f"Request failed: {str(e)}"}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def sse_response(events):
+    """Stream resource events as Server-Sent Events, with a comment line as heartbeat"""
+    def generate():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        try:
+            for event in events:
+                if event is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                data = {key: value for key, value in event.items() if key not in ('id', 'type')}
+                yield f"id: {event['id']}\nevent: {event['type'].lower()}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        except Exception as e:
+            logger.error(f"Error while streaming events: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'success': False, 'message': f'Request failed: {str(e)}'})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Keep reverse proxies (nginx) from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+def log_response(lines, sse=False):
+    """Stream log lines as chunked plain text, or as Server-Sent Events with one event per line"""
+    def generate():
+        if sse:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+        try:
+            for line in lines:
+                if line is None:
+                    # Keep-alive of a quiet followed log; writing it fails once the client is gone
+                    yield ": keep-alive\n\n" if sse else '\n'
+                    continue
+                yield f"data: {line}\n\n" if sse else line + '\n'
+        except Exception as e:
+            logger.error(f"Error while streaming logs: {str(e)}")
+            if sse:
+                yield f"event: error\ndata: {json.dumps({'success': False, 'message': f'Request failed: {str(e)}'})}\n\n"
+        finally:
+            # Releases the upstream connection and the cluster's log stream slot
+            lines.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream' if sse else 'text/plain', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def positive_int_arg(name):
+    value = request.args.get(name)
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) <= 0:
+        raise ValueError(f"{name} must be a positive integer")
+    return int(value)
+
+def resources_etag(connection_id, resource_type, query_args):
+    """ETag of a resources response answered from an informer, known before the response is built"""
+    version = get_eks_connector().resources_version(
+        connection_id,
+        resource_type,
+        label_selector=query_args["label_selector"],
+        field_selector=query_args["field_selector"],
+        limit=query_args["limit"],
+        continue_token=query_args["continue_token"],
+        metrics=query_args["metrics"],
+        sort_by=query_args["sort_by"],
+        top=query_args["top"]
+    )
+    if version is None:
+        return None
+    return version_etag(connection_id, resource_type, version, request.query_string.decode())
+
+def failure_status(result):
+    """
+    HTTP status of a failed connector result: 503 while the cluster's circuit is open, 409 when the
+    client has to connect again on this worker, 500 otherwise
+    """
+    if result.get("circuit_open"):
+        return 503
+    return 409 if result.get("reconnect_required") else 500
+
+def error_response(result):
+    response = jsonify(result)
+    if result.get("circuit_open"):
+        response.headers['Retry-After'] = str(result["retry_after"])
+    return response, failure_status(result)
+
+def not_modified(etag):
+    response = Response(status=304)
+    # Same form (weak when it was compressed) as the ETag of the 200 the client holds
+    response.headers['ETag'] = matched_etag(request.headers.get('If-None-Match'), etag) or f'"{etag}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.before_request
+def start_timing():
+    g.request_start = time.perf_counter()
+    g.timings = start_request_timings()
+
+@app.after_request
+def record_timing(response):
+    """Observe the request duration and report its stages in a Server-Timing header"""
+    # Registered before add_etag_and_compress, so it runs after it and includes compression
+    start = g.get('request_start')
+    if start is None:
+        return response
+    duration = time.perf_counter() - start
+    view_args = request.view_args or {}
+    REQUEST_DURATION.observe(
+        duration,
+        endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+        method=request.method,
+        status=response.status_code,
+        resource_type=resource_type_label(view_args.get('resource_type') or ('pods' if request.endpoint == 'get_pods' else None))
+    )
+    response.headers['Server-Timing'] = server_timing(g.timings, duration)
+    return response
+
+@app.after_request
+def add_etag_and_compress(response):
+    """Answer conditional GETs of JSON responses with 304 and compress large bodies"""
+    if (request.method != 'GET' or response.status_code != 200 or response.is_streamed
+            or response.direct_passthrough or response.mimetype != 'application/json'):
+        return response
+
+    body = response.get_data()
+    etag = response.get_etag()[0] or content_etag(body)
+    response.set_etag(etag)
+    # Let browsers keep the body but always revalidate it
+    response.headers['Cache-Control'] = 'no-cache'
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return not_modified(etag)
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding and len(body) >= MIN_COMPRESS_SIZE:
+        with timed("compress"):
+            response.set_data(compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes differ from the identity representation
+        response.set_etag(etag, weak=True)
+    return response
+
 # ---------------- FRONTEND ROUTES ----------------
 @app.route('/')
 def serve_frontend():
@@ -71,17 +361,20 @@ def connect_cluster():
 
 @app.route('/api/clusters/available', methods=['POST'])
 def list_available_clusters():
-    """List available EKS clusters in a region"""
+    """List available EKS clusters in a region, or in several regions with "regions" (a list or "all")"""
     eks_connector = get_eks_connector()
     data = request.json
     if not data:
         return jsonify({"success": False, "message": "No data provided"}), 400
 
     region = data.get('region')
+    regions = data.get('regions')
     auth_type = data.get('auth_type', 'credentials')
 
-    if not region:
+    if not region and not regions:
         return jsonify({"success": False, "message": "Region is required."}), 400
+    if regions and regions != 'all' and not isinstance(regions, list):
+        return jsonify({"success": False, "message": "regions must be a list of regions or \"all\"."}), 400
 
     if auth_type == 'credentials':
         aws_access_key_id = data.get('aws_access_key_id')
@@ -91,17 +384,47 @@ def list_available_clusters():
         if not all([aws_access_key_id, aws_secret_access_key]):
             return jsonify({"success": False, "message": "AWS credentials required."}), 400
 
-        result = eks_connector.list_available_clusters(region, aws_access_key_id, aws_secret_access_key, aws_session_token)
+        auth_kwargs = {
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
+            "aws_session_token": aws_session_token
+        }
 
     elif auth_type == 'profile':
-        profile_name = data.get('profile_name', 'default')
-        result = eks_connector.list_available_clusters(region, profile_name=profile_name)
+        auth_kwargs = {"profile_name": data.get('profile_name', 'default')}
 
     else:
         return jsonify({"success": False, "message": f"Unsupported auth type: {auth_type}."}), 400
 
+    if regions:
+        if wants_stream():
+            # One line per region, written as soon as that region finishes
+            return ndjson_response(eks_connector.discover_clusters(regions, **auth_kwargs))
+        result = eks_connector.list_clusters_in_regions(regions, **auth_kwargs)
+    else:
+        result = eks_connector.list_available_clusters(region, **auth_kwargs)
+
     return jsonify(result), 200 if result["success"] else 500
 
+@app.route('/api/clusters/cache', methods=['GET'])
+def discovery_cache_stats():
+    """Show counters of the cluster discovery cache, the boto3 session pool and list coalescing"""
+    eks_connector = get_eks_connector()
+    return jsonify({
+        "success": True,
+        "cache": eks_connector.discovery_cache_stats(),
+        "sessions": eks_connector.session_pool_stats(),
+        "single_flight": eks_connector.single_flight_stats()
+    }), 200
+
+@app.route('/api/clusters/cache/invalidate', methods=['POST'])
+def invalidate_discovery_cache():
+    """Drop cached discovery results, optionally only for a region and/or cluster"""
+    eks_connector = get_eks_connector()
+    data = request.get_json(silent=True) or {}
+    result = eks_connector.invalidate_discovery_cache(data.get('region'), data.get('cluster_name'))
+    return jsonify(result), 200
+
 @app.route('/api/clusters', methods=['GET'])
 def list_clusters():
     """List all connected clusters"""
@@ -120,25 +443,162 @@ def disconnect_cluster(connection_id):
 def get_resources(connection_id, resource_type):
     """Get resources of a specific type from a connected cluster"""
     eks_connector = get_eks_connector()
-    valid_resource_types = ['pods', 'deployments', 'services', 'nodes']
     
     # Debug log
-    print(f"Attempting to get {resource_type} for connection {connection_id}")
-    print(f"Available connections: {list(eks_connector.connected_clusters.keys())}")
+    logger.info(f"Attempting to get {resource_type} for connection {connection_id}")
+    logger.debug(f"Available connections: {eks_connector.connection_ids()}")
     
-    if resource_type not in valid_resource_types:
-        return jsonify({"success": False, "message": f"Invalid resource type. Supported: {', '.join(valid_resource_types)}"}), 400
+    if resource_type not in VALID_RESOURCE_TYPES:
+        return jsonify({"success": False, "message": f"Invalid resource type. Supported: {', '.join(VALID_RESOURCE_TYPES)}"}), 400
+
+    try:
+        query_args = get_resource_query_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    if wants_stream():
+        result = eks_connector.stream_resources(connection_id, resource_type, **query_args)
+        if not result["success"]:
+            return error_response(result)
+        return ndjson_response(result["items"])
+
+    # Unchanged cached resources are answered without building the response
+    etag = resources_etag(connection_id, resource_type, query_args)
+    if etag and etag_matches(request.headers.get('If-None-Match'), etag):
+        return not_modified(etag)
+
+    result = eks_connector.get_resources(connection_id, resource_type, **query_args)
+    if not result.get("success", False):
+        return error_response(result)
+    response = jsonify(result)
+    if etag:
+        response.set_etag(etag)
+    return response, 200
 
-    result = eks_connector.get_resources(connection_id, resource_type)
+@app.route('/api/clusters/<connection_id>/snapshot', methods=['GET'])
+def get_snapshot(connection_id):
+    """Get several resource types of a connected cluster in one response"""
+    eks_connector = get_eks_connector()
+    types = request.args.get('types')
+    resource_types = [resource_type.strip() for resource_type in types.split(',') if resource_type.strip()] if types else VALID_RESOURCE_TYPES
+    invalid = [resource_type for resource_type in resource_types if resource_type not in VALID_RESOURCE_TYPES]
+    if invalid:
+        return jsonify({"success": False, "message": f"Invalid resource type. Supported: {', '.join(VALID_RESOURCE_TYPES)}"}), 400
+
+    try:
+        query_args = get_resource_query_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    result = eks_connector.get_snapshot(
+        connection_id,
+        resource_types,
+        namespace=query_args["namespace"],
+        fields=query_args["fields"],
+        conditions=query_args["conditions"]
+    )
+    return jsonify(result), 200 if result.get("success", False) else failure_status(result)
+
+@app.route('/api/aggregate/<resource_type>', methods=['GET'])
+def aggregate_resources(resource_type):
+    """Query a resource type across all (or the selected) connected clusters"""
+    eks_connector = get_eks_connector()
+    if resource_type not in VALID_RESOURCE_TYPES:
+        return jsonify({"success": False, "message": f"Invalid resource type. Supported: {', '.join(VALID_RESOURCE_TYPES)}"}), 400
+
+    try:
+        query_args = get_resource_query_args()
+        timeout = request.args.get('timeout')
+        if timeout is not None:
+            try:
+                timeout = float(timeout)
+            except ValueError:
+                timeout = -1
+            if timeout <= 0:
+                raise ValueError("timeout must be a positive number of seconds")
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    connections = request.args.get('connections')
+    result = eks_connector.aggregate_resources(
+        resource_type,
+        connection_ids=[connection_id.strip() for connection_id in connections.split(',') if connection_id.strip()] if connections else None,
+        namespace=query_args["namespace"],
+        label_selector=query_args["label_selector"],
+        field_selector=query_args["field_selector"],
+        conditions=query_args["conditions"],
+        fields=query_args["fields"],
+        timeout=timeout
+    )
     return jsonify(result), 200 if result.get("success", False) else 500
 
+@app.route('/api/clusters/<connection_id>/resources/<resource_type>/events', methods=['GET'])
+def watch_resources(connection_id, resource_type):
+    """Stream a snapshot and then live changes of a resource type as Server-Sent Events"""
+    eks_connector = get_eks_connector()
+    if resource_type not in VALID_RESOURCE_TYPES:
+        return jsonify({"success": False, "message": f"Invalid resource type. Supported: {', '.join(VALID_RESOURCE_TYPES)}"}), 400
+
+    # EventSource sends Last-Event-ID when reconnecting; the query parameter allows resuming a new EventSource
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    result = eks_connector.watch_resources(
+        connection_id,
+        resource_type,
+        namespace=request.args.get('namespace') or None,
+        last_event_id=last_event_id,
+        heartbeat_interval=SSE_HEARTBEAT_INTERVAL
+    )
+    if not result["success"]:
+        return error_response(result)
+    return sse_response(result["events"])
+
+@app.route('/api/clusters/<connection_id>/pods/<namespace>/<name>/logs', methods=['GET'])
+def get_pod_logs(connection_id, namespace, name):
+    """Stream the log of a pod, as plain text or as Server-Sent Events"""
+    eks_connector = get_eks_connector()
+    try:
+        log_args = {
+            "tail_lines": positive_int_arg('tailLines'),
+            "since_seconds": positive_int_arg('sinceSeconds'),
+            "limit_bytes": positive_int_arg('limitBytes')
+        }
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    result = eks_connector.stream_pod_logs(
+        connection_id,
+        namespace,
+        name,
+        container=request.args.get('container') or None,
+        follow=request.args.get('follow') in ('1', 'true'),
+        timestamps=request.args.get('timestamps') in ('1', 'true'),
+        **log_args
+    )
+    if not result["success"]:
+        return (jsonify(result), 429) if result.get("limit_reached") else error_response(result)
+    return log_response(result["lines"], sse='text/event-stream' in request.headers.get('Accept', ''))
+
 # Add this convenience endpoint for pods specifically to match the test.html expectations
 @app.route('/api/clusters/<connection_id>/pods', methods=['GET'])
 def get_pods(connection_id):
     """Get pods from a connected cluster - convenience endpoint"""
     eks_connector = get_eks_connector()
-    result = eks_connector.get_resources(connection_id, 'pods')
-    return jsonify(result), 200 if result.get("success", False) else 500
+    try:
+        query_args = get_resource_query_args()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    etag = resources_etag(connection_id, 'pods', query_args)
+    if etag and etag_matches(request.headers.get('If-None-Match'), etag):
+        return not_modified(etag)
+
+    result = eks_connector.get_resources(connection_id, 'pods', **query_args)
+    if not result.get("success", False):
+        return error_response(result)
+    response = jsonify(result)
+    if etag:
+        response.set_etag(etag)
+    return response, 200
 
 # Add this for testing EKS connectivity
 @app.route('/api/test-eks-list', methods=['GET'])
@@ -158,7 +618,32 @@ def health_check():
     response.headers.add('Access-Control-Allow-Methods', 'GET')
     return response, 200
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request and stage latency histograms in the Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/log-level', methods=['GET', 'PUT'])
+def log_level():
+    """Get or change the log level while the service runs"""
+    if request.method == 'PUT':
+        # Changing it is an admin action, disabled unless ADMIN_TOKEN is set
+        admin_token = os.environ.get('ADMIN_TOKEN')
+        if not admin_token:
+            return jsonify({"success": False, "message": "Changing the log level is disabled, set ADMIN_TOKEN to enable it"}), 403
+        authorization = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {admin_token}".encode()):
+            return jsonify({"success": False, "message": "Invalid or missing admin token"}), 401
+        data = request.get_json(silent=True) or {}
+        try:
+            level = set_log_level(data.get('level'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        logger.warning(f"Log level set to {level}")
+    return jsonify({"success": True, "level": get_log_level()})
+
 # ---------------- RUN APP ----------------
 if __name__ == '__main__':
+    create_app()
     port = int(os.environ.get('PORT', 8000))
     app.run(host='0.0.0.0', port=port, threaded=True)
\ No newline at end of file
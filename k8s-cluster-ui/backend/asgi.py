@@ -0,0 +1,217 @@
+"""
+ASGI entry point for the K8s Cluster UI API.
+
+Run with an ASGI server, e.g.:
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+
+Resource listing is served natively on the event loop (see EKSConnector.get_resources_async),
+so slow clusters don't hold one OS thread per waiting request. All other routes are delegated
+to the Flask app, which runs at most ASYNC_BLOCKING_WORKERS requests at a time, each in its own thread.
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (app, create_app, failure_status, get_eks_connector, get_resource_query_args, resource_type_label,
+                 shutdown_app, VALID_RESOURCE_TYPES)
+from http_cache import (MIN_COMPRESS_SIZE, choose_encoding, compress, content_etag, etag_matches, matched_etag,
+                        version_etag)
+from telemetry import REQUEST_DURATION, server_timing, start_request_timings, timed
+
+# Maximum threads for blocking work (Flask routes, boto3 calls, initial informer lists)
+BLOCKING_WORKERS = int(os.environ.get('ASYNC_BLOCKING_WORKERS', 32))
+
+RESOURCES_ROUTE = re.compile(r'^/api/clusters/(?P<connection_id>[^/]+)/resources/(?P<resource_type>[^/]+)$')
+PODS_ROUTE = re.compile(r'^/api/clusters/(?P<connection_id>[^/]+)/pods$')
+
+
+class BoundedWsgiToAsgi(WsgiToAsgi):
+    def __init__(self, wsgi_application, max_threads):
+        """
+        WsgiToAsgi running each request in its own thread, with at most max_threads requests at a time.
+
+        asgiref runs every WSGI request in one shared thread by default; a ThreadSensitiveContext
+        per request gives each one its own thread instead.
+
+        Args:
+            wsgi_application: WSGI application
+            max_threads (int): Maximum requests running at the same time, others wait for a slot
+        """
+        super().__init__(wsgi_application)
+        self.max_threads = max_threads
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if self._slots is None:
+            # Created on first use so it belongs to the server's event loop
+            self._slots = asyncio.Semaphore(self.max_threads)
+        async with self._slots, ThreadSensitiveContext():
+            await super().__call__(scope, receive, send)
+
+
+flask_application = BoundedWsgiToAsgi(app, BLOCKING_WORKERS)
+
+
+class RequestTiming:
+    def __init__(self, endpoint, resource_type=None):
+        """
+        Stage timings of a natively served request, reported like the Flask app does.
+
+        Args:
+            endpoint (str): Route pattern used as the endpoint label
+            resource_type (str, optional): Resource type label
+        """
+        self.endpoint = endpoint
+        self.resource_type = resource_type
+        self.start = time.perf_counter()
+        self.timings = start_request_timings()
+
+    def finish(self, status):
+        """Observe the request duration and return the Server-Timing header"""
+        duration = time.perf_counter() - self.start
+        REQUEST_DURATION.observe(duration, endpoint=self.endpoint, method="GET", status=status,
+                                 resource_type=resource_type_label(self.resource_type))
+        return (b"server-timing", server_timing(self.timings, duration).encode())
+
+
+async def send_json(send, body, status=200, headers=None, etag=None, timing=None):
+    """Send a JSON response, with the same ETag, compression and timing handling as the Flask app"""
+    with timed("serialize", resource_type=resource_type_label(timing and timing.resource_type)):
+        payload = json.dumps(body).encode()
+    headers = headers or {}
+    response_headers = [
+        (b"content-type", b"application/json"),
+        (b"access-control-allow-origin", b"*")
+    ]
+    if status == 200:
+        etag = etag or content_etag(payload)
+        if_none_match = headers.get(b"if-none-match", b"").decode()
+        if etag_matches(if_none_match, etag):
+            await send_not_modified(send, etag, if_none_match, timing)
+            return
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode())
+        response_headers.append((b"cache-control", b"no-cache"))
+        response_headers.append((b"vary", b"Accept-Encoding"))
+        if encoding and len(payload) >= MIN_COMPRESS_SIZE:
+            with timed("compress"):
+                payload = compress(payload, encoding)
+            response_headers.append((b"content-encoding", encoding.encode()))
+            response_headers.append((b"etag", f'W/"{etag}"'.encode()))
+        else:
+            response_headers.append((b"etag", f'"{etag}"'.encode()))
+    elif body.get("circuit_open"):
+        # Same as the Flask app's error_response
+        response_headers.append((b"retry-after", str(body["retry_after"]).encode()))
+    response_headers.append((b"content-length", str(len(payload)).encode()))
+    if timing is not None:
+        response_headers.append(timing.finish(status))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": response_headers
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def send_not_modified(send, etag, if_none_match, timing=None):
+    response_headers = [
+        # Same form (weak when it was compressed) as the ETag of the 200 the client holds
+        (b"etag", (matched_etag(if_none_match, etag) or f'"{etag}"').encode()),
+        (b"cache-control", b"no-cache"),
+        (b"access-control-allow-origin", b"*")
+    ]
+    if timing is not None:
+        response_headers.append(timing.finish(304))
+    await send({
+        "type": "http.response.start",
+        "status": 304,
+        "headers": response_headers
+    })
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def resources_endpoint(scope, send, connection_id, resource_type, query, endpoint):
+    """Async counterpart of the Flask get_resources route"""
+    timing = RequestTiming(endpoint, resource_type)
+    if resource_type not in VALID_RESOURCE_TYPES:
+        await send_json(send, {"success": False, "message": f"Invalid resource type. Supported: {', '.join(VALID_RESOURCE_TYPES)}"}, 400,
+                        timing=timing)
+        return
+
+    try:
+        query_args = get_resource_query_args(query)
+    except ValueError as e:
+        await send_json(send, {"success": False, "message": str(e)}, 400, timing=timing)
+        return
+
+    headers = dict(scope["headers"])
+    eks_connector = get_eks_connector()
+    version_args = {key: query_args[key] for key in ("label_selector", "field_selector", "limit", "continue_token",
+                                                        "metrics", "sort_by", "top")}
+    if eks_connector.connection_registry is None:
+        version = eks_connector.resources_version(connection_id, resource_type, **version_args)
+    else:
+        # Registry lookups block
+        version = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(eks_connector.resources_version, connection_id, resource_type, **version_args)
+        )
+    etag = None
+    if version is not None:
+        etag = version_etag(connection_id, resource_type, version, scope["query_string"].decode())
+        # Unchanged cached resources are answered without building the response
+        if_none_match = headers.get(b"if-none-match", b"").decode()
+        if etag_matches(if_none_match, etag):
+            await send_not_modified(send, etag, if_none_match, timing)
+            return
+
+    result = await eks_connector.get_resources_async(connection_id, resource_type, **query_args)
+    await send_json(send, result, 200 if result.get("success", False) else failure_status(result), headers, etag, timing)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Bound every blocking call made through run_in_executor(None, ...)
+            loop = asyncio.get_running_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking"))
+            # Restoring snapshots reads the snapshot store
+            await loop.run_in_executor(None, create_app)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # Waits for running health checks, then saves the latest informer changes
+            await asyncio.get_running_loop().run_in_executor(None, shutdown_app)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    if scope["type"] == "http" and scope["method"] == "GET":
+        query = dict(parse_qsl(scope["query_string"].decode()))
+        headers = dict(scope["headers"])
+        # Streamed responses are served by the Flask app
+        streaming = query.get("stream") in ("1", "true") or b"application/x-ndjson" in headers.get(b"accept", b"")
+        if not streaming:
+            match = RESOURCES_ROUTE.match(scope["path"])
+            if match:
+                await resources_endpoint(scope, send, match["connection_id"], match["resource_type"], query,
+                                         "/api/clusters/<connection_id>/resources/<resource_type>")
+                return
+            match = PODS_ROUTE.match(scope["path"])
+            if match:
+                await resources_endpoint(scope, send, match["connection_id"], "pods", query,
+                                         "/api/clusters/<connection_id>/pods")
+                return
+
+    await flask_application(scope, receive, send)
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PooledSession:
+    def __init__(self, session, client_config=None):
+        """
+        boto3 session shared between requests, with its clients created once and reused.
+
+        boto3 sessions aren't thread-safe, so clients are created under a lock; the clients
+        themselves are thread-safe and can be used concurrently. Other attributes (get_credentials,
+        events, region_name, ...) are those of the wrapped session.
+
+        Args:
+            session (boto3.Session): Session to share
+            client_config (botocore.config.Config, optional): Configuration of the clients, e.g. timeouts
+        """
+        self.session = session
+        self.client_config = client_config
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def client(self, service_name, region_name=None, **kwargs):
+        """
+        Get a client of the session, creating it on first use.
+
+        Args:
+            service_name (str): AWS service, e.g. "eks"
+            region_name (str, optional): Region of the client, the session's region if not given
+            **kwargs: Other client options; clients with options aren't cached
+
+        Returns:
+            botocore client
+        """
+        with self._lock:
+            if kwargs:
+                kwargs.setdefault("config", self.client_config)
+                return self.session.client(service_name, region_name=region_name, **kwargs)
+            key = (service_name, region_name)
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self.session.client(service_name, region_name=region_name,
+                                                                  config=self.client_config)
+            return client
+
+    def frozen_credentials(self):
+        """
+        Snapshot of the session's current credentials, taken under the session's lock.
+
+        Refreshable credentials can change between reading their key and their secret, and the
+        session is shared by every connection made with the same credentials.
+
+        Returns:
+            botocore.credentials.ReadOnlyCredentials: Access key, secret key and token, or None without credentials
+        """
+        with self._lock:
+            credentials = self.session.get_credentials()
+            return credentials.get_frozen_credentials() if credentials is not None else None
+
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+class SessionPool:
+    def __init__(self, maxsize=128, idle_ttl=900, client_config=None):
+        """
+        Thread-safe pool of boto3 sessions keyed by (credential identity, region).
+
+        Creating a session loads the botocore service models and resolves credentials, and creating a
+        client builds its endpoint and event handlers; pooling skips both for repeated calls. Keys only
+        hold the credential identity (a profile name or a hash of the keys), never the secrets, and
+        sessions unused for idle_ttl seconds are dropped.
+
+        Args:
+            maxsize (int, optional): Maximum pooled sessions, the least recently used is dropped when full
+            idle_ttl (float, optional): Seconds after which an unused session is dropped
+            client_config (botocore.config.Config, optional): Configuration of the cached clients
+        """
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.client_config = client_config
+        self.hits = 0
+        self.misses = 0
+        # (identity, region) -> [PooledSession or None while being created, creation lock, last use]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, identity, region, factory):
+        """
+        Get the pooled session of a credential identity and region, creating it on first use.
+
+        Args:
+            identity (str): Credential identity (see EKSConnector._credential_identity)
+            region (str): Default region of the session, or None
+            factory: Callable creating the boto3 session; exceptions are not cached
+
+        Returns:
+            PooledSession: Shared session
+        """
+        key = (identity, region)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [None, threading.Lock(), now]
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            entry[2] = now
+            self._entries.move_to_end(key)
+
+        # Only callers of the same key wait for a session being created
+        with entry[1]:
+            if entry[0] is None:
+                with self._lock:
+                    self.misses += 1
+                entry[0] = PooledSession(factory(), self.client_config)
+            else:
+                with self._lock:
+                    self.hits += 1
+            return entry[0]
+
+    def invalidate(self, identity=None):
+        """
+        Drop the sessions of a credential identity, or all of them.
+
+        Returns:
+            int: Number of dropped sessions
+        """
+        with self._lock:
+            keys = [key for key in self._entries if identity is None or key[0] == identity]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def _evict_idle(self, now):
+        # Entries are kept in order of last use, so idle ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry[2] < self.idle_ttl:
+                break
+            del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            sessions = [entry[0] for entry in self._entries.values() if entry[0] is not None]
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "idle_ttl": self.idle_ttl,
+                "clients": sum(session.client_count() for session in sessions),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
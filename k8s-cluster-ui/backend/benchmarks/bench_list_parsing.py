@@ -0,0 +1,125 @@
+"""
+Compare model deserialization with raw JSON parsing on a synthetic pod list.
+
+Usage (from the backend directory):
+    python benchmarks/bench_list_parsing.py [pod_count]
+"""
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kubernetes import client
+from eks_connector import EKSConnector
+from kube_json import loads
+
+
+def make_pod(index):
+    return {
+        "metadata": {
+            "name": f"web-{index}",
+            "namespace": f"team-{index % 40}",
+            "uid": f"0000-{index}",
+            "resourceVersion": str(100000 + index),
+            "creationTimestamp": "2024-05-01T10:00:00Z",
+            "labels": {"app": "web", "pod-template-hash": "5d9c8f7b6"},
+            "ownerReferences": [{"apiVersion": "apps/v1", "kind": "ReplicaSet", "name": "web-5d9c8f7b6", "uid": "1111", "controller": True}]
+        },
+        "spec": {
+            "nodeName": f"ip-10-0-{index % 250}-1.ec2.internal",
+            "containers": [
+                {
+                    "name": "app",
+                    "image": "nginx:1.25",
+                    "ports": [{"containerPort": 80, "protocol": "TCP"}],
+                    "resources": {"requests": {"cpu": "100m", "memory": "128Mi"}},
+                    "env": [{"name": f"VAR_{i}", "value": "x" * 16} for i in range(5)]
+                },
+                {"name": "sidecar", "image": "envoy:1.29"}
+            ]
+        },
+        "status": {
+            "phase": "Running",
+            "podIP": "10.0.0.1",
+            "conditions": [{"type": "Ready", "status": "True", "lastTransitionTime": "2024-05-01T10:00:05Z"}],
+            "containerStatuses": [
+                {"name": "app", "ready": True, "restartCount": 0, "image": "nginx:1.25", "imageID": "sha256:abc", "state": {"running": {"startedAt": "2024-05-01T10:00:03Z"}}}
+            ]
+        }
+    }
+
+
+def model_pod_reason(status):
+    for container_status in status.container_statuses or []:
+        current = container_status.state.waiting or container_status.state.terminated
+        if current and current.reason:
+            return current.reason
+    return status.reason
+
+
+def model_controller(metadata):
+    for owner in metadata.owner_references or []:
+        if owner.controller:
+            return f"{owner.kind}/{owner.name}"
+    return None
+
+
+def format_model_pod(item):
+    """Formatting used before raw parsing, reading attributes of V1Pod models"""
+    return {
+        "name": item.metadata.name,
+        "namespace": item.metadata.namespace,
+        "status": item.status.phase,
+        "reason": model_pod_reason(item.status),
+        "restarts": sum(cont.restart_count or 0 for cont in item.status.container_statuses or []),
+        "containers": [cont.name for cont in item.spec.containers],
+        "node": item.spec.node_name if item.spec.node_name else "Not scheduled",
+        "owner": model_controller(item.metadata),
+        "created_at": item.metadata.creation_timestamp.isoformat() if item.metadata.creation_timestamp else None
+    }
+
+
+def bench(label, func, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:9.1f} ms")
+    return best, result
+
+
+def main():
+    pod_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    body = json.dumps({
+        "apiVersion": "v1",
+        "kind": "PodList",
+        "metadata": {"resourceVersion": "200000"},
+        "items": [make_pod(index) for index in range(pod_count)]
+    }).encode()
+    print(f"Synthetic PodList: {pod_count} pods, {len(body) / 1024 / 1024:.1f} MiB")
+
+    api_client = client.ApiClient()
+    connector = EKSConnector()
+
+    def model_path():
+        pod_list = api_client.deserialize(SimpleNamespace(data=body.decode()), "V1PodList")
+        return [format_model_pod(item) for item in pod_list.items]
+
+    def raw_path():
+        pod_list = loads(body)
+        return [connector._format_item(item, "pods") for item in pod_list["items"]]
+
+    model_time, model_items = bench("V1PodList deserialize + format", model_path)
+    raw_time, raw_items = bench("raw JSON parse + format", raw_path)
+
+    assert model_items == raw_items, "raw formatting differs from model formatting"
+    print(f"Speedup: {model_time / raw_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
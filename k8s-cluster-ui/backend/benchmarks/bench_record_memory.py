@@ -0,0 +1,53 @@
+"""
+Compare the memory held by cached formatted dicts with compact slot-based records.
+
+Usage (from the backend directory):
+    python benchmarks/bench_record_memory.py [pod_count]
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eks_connector import EKSConnector
+from kube_json import loads
+from bench_list_parsing import make_pod
+
+
+def measure(label, build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f"{label:<30} {size / 1024 / 1024:8.1f} MiB  ({size / len(result):6.0f} bytes per item)")
+    return size, result
+
+
+def main():
+    pod_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    connector = EKSConnector()
+
+    body = json.dumps({"items": [make_pod(index) for index in range(pod_count)]}).encode()
+
+    # Parsing happens inside the measurement and the raw objects are dropped afterwards,
+    # like in an informer, so only what the cache keeps alive is counted
+    print(f"Synthetic pods: {pod_count}, measuring memory kept after parse + format")
+    dict_size, dicts = measure("formatted dicts", lambda: [connector._format_item(item, "pods") for item in loads(body)["items"]])
+    first_dict = dicts[0]
+    del dicts
+
+    record_size, records = measure("slot-based records", lambda: [connector._format_record(item, "pods") for item in loads(body)["items"]])
+
+    assert records[0].to_dict() == first_dict
+    print(f"Reduction: {dict_size / record_size:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
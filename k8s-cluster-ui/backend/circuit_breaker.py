@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, probe=None):
+        """
+        Circuit breaker of one upstream, failing calls fast while the upstream is unreachable.
+
+        After failure_threshold consecutive failures the circuit opens and allow() returns False.
+        When a probe is given, it is called in a background thread reset_timeout seconds later
+        (half-open): success closes the circuit, failure keeps it open until the next probe. Without
+        a probe, the first call after reset_timeout is let through as the trial call.
+
+        Args:
+            name (str): Name used in logs, e.g. the connection ID
+            failure_threshold (int, optional): Consecutive failures that open the circuit
+            reset_timeout (float, optional): Seconds the circuit stays open before it is probed
+            probe (optional): Callable raising an exception if the upstream is still unreachable
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._timer = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check whether a call may go to the upstream.
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if (self.state == OPEN and self.probe is None
+                    and time.monotonic() - self.opened_at >= self.reset_timeout):
+                # Let this call through as the trial
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit of '{self.name}' closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._open()
+
+    def retry_in(self):
+        """Seconds until the circuit is probed again, or None if it isn't open"""
+        with self._lock:
+            if self.state == CLOSED or self.opened_at is None:
+                return None
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def close(self):
+        """Stop background probing, e.g. when the connection is removed"""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "open_for": round(time.monotonic() - self.opened_at, 1) if self.opened_at is not None else None
+            }
+
+    def _open(self):
+        # Called with the lock held
+        if self.state != OPEN:
+            logger.warning(f"Circuit of '{self.name}' opened after {self.failures} failures: {self.last_error}")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        if self.probe is not None and not self._closed:
+            self._timer = threading.Timer(self.reset_timeout, self._run_probe)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run_probe(self):
+        with self._lock:
+            if self._closed or self.state != OPEN:
+                return
+            self.state = HALF_OPEN
+        try:
+            self.probe()
+        except Exception as e:
+            logger.info(f"Probe of '{self.name}' failed: {str(e)}")
+            self.record_failure(e)
+            return
+        self.record_success()
@@ -0,0 +1,100 @@
+import json
+import logging
+import threading
+import time
+
+from sqlite_util import connect, restrict_permissions
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryConnectionRegistry:
+    def __init__(self):
+        """
+        Connection registry kept in the memory of one process.
+
+        Only useful with a single worker (or in tests); use SQLiteConnectionRegistry to share
+        connections between gunicorn workers.
+        """
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def save(self, connection_id, record):
+        with self._lock:
+            self._records[connection_id] = dict(record)
+
+    def get(self, connection_id):
+        with self._lock:
+            record = self._records.get(connection_id)
+            return dict(record) if record is not None else None
+
+    def delete(self, connection_id):
+        with self._lock:
+            return self._records.pop(connection_id, None) is not None
+
+    def list(self):
+        with self._lock:
+            return {connection_id: dict(record) for connection_id, record in self._records.items()}
+
+
+class SQLiteConnectionRegistry:
+    def __init__(self, path):
+        """
+        Connection registry stored in a SQLite database shared by all worker processes of a host.
+
+        Args:
+            path (str): Path of the database file, created if missing
+        """
+        self.path = path
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS connections ("
+                "connection_id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+        # Records hold cluster endpoints and certificates, keep them readable by the service user only
+        restrict_permissions(path)
+
+    def _connection(self):
+        return connect(self.path)
+
+    def save(self, connection_id, record):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO connections (connection_id, record, updated_at) VALUES (?, ?, ?)",
+                (connection_id, json.dumps(record), time.time())
+            )
+
+    def get(self, connection_id):
+        row = self._connection().execute(
+            "SELECT record FROM connections WHERE connection_id = ?", (connection_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, connection_id):
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute("DELETE FROM connections WHERE connection_id = ?", (connection_id,))
+        return cursor.rowcount > 0
+
+    def list(self):
+        rows = self._connection().execute("SELECT connection_id, record FROM connections ORDER BY connection_id").fetchall()
+        return {connection_id: json.loads(record) for connection_id, record in rows}
+
+
+def create_connection_registry(url):
+    """
+    Create a connection registry from a URL.
+
+    Args:
+        url (str): "memory" or "sqlite:///path/to/connections.db"
+
+    Returns:
+        A registry with save/get/delete/list methods
+    """
+    if url == "memory":
+        return MemoryConnectionRegistry()
+    if url.startswith("sqlite:///"):
+        return SQLiteConnectionRegistry(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported connection registry: {url}")
@@ -1,16 +1,152 @@
+import asyncio
 import boto3
 from kubernetes import client, config
+from kubernetes.client.rest import ApiException
 import os
-import yaml
 import base64
-import tempfile
 import json
+import functools
+import logging
+import hashlib
+import heapq
+import math
+import random
+import socket
+import threading
+import time
+import uuid
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError, ReadTimeoutError
+from aws_sessions import SessionPool
+from circuit_breaker import CircuitBreaker
+from eks_token import EKSTokenProvider
+from health_monitor import HealthMonitor
+from informer import ResourceInformer
+from kube_json import list_raw, loads
+from metrics import USAGE_FIELDS, usage_index
+from resource_records import RECORD_TYPES, intern
+from single_flight import SingleFlight
+from telemetry import timed
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Optional async Kubernetes client used by get_resources_async
+try:
+    from kubernetes_asyncio import client as async_client
+except ImportError:
+    async_client = None
 
 class EKSConnector:
-    def __init__(self):
+    # Kubernetes API class, cluster-wide list method and namespaced list method for each supported resource type
+    RESOURCE_LISTERS = {
+        "pods": (client.CoreV1Api, "list_pod_for_all_namespaces", "list_namespaced_pod"),
+        "deployments": (client.AppsV1Api, "list_deployment_for_all_namespaces", "list_namespaced_deployment"),
+        "services": (client.CoreV1Api, "list_service_for_all_namespaces", "list_namespaced_service"),
+        "nodes": (client.CoreV1Api, "list_node", None)
+    }
+    # Formatted item fields indexed by the informer stores, so equality filters on them only visit matching items
+    INDEXED_FIELDS = ("namespace", "status", "node", "owner")
+    # Resource types with usage figures in the metrics.k8s.io API
+    METRICS_RESOURCE_TYPES = ("pods", "nodes")
+    # Number of items requested per upstream list call when streaming
+    STREAM_PAGE_SIZE = 500
+    # Lines returned by a log request that doesn't bound the log itself (tail_lines, since_seconds, limit_bytes)
+    DEFAULT_LOG_TAIL_LINES = 1000
+    # Bytes read from the API server per chunk of a log stream, and longest line buffered before it is split
+    LOG_CHUNK_SIZE = 8192
+    MAX_LOG_LINE_SIZE = 65536
+    # Extra seconds of log asked for when a followed log is reopened, to absorb clock skew with the node;
+    # the lines read twice are skipped by their timestamp
+    LOG_RESUME_MARGIN = 5
+    # AWS error codes returned when credentials are expired or invalid
+    REJECTED_CREDENTIALS_ERROR_CODES = ("ExpiredToken", "ExpiredTokenException", "InvalidClientTokenId",
+                                        "UnrecognizedClientException", "RequestExpired")
+    # AWS error codes returned when API calls are rate limited
+    THROTTLING_ERROR_CODES = ("Throttling", "ThrottlingException", "TooManyRequestsException", "RequestLimitExceeded")
+    # Region used to look up the enabled regions when the session has no default region
+    DEFAULT_DISCOVERY_REGION = "us-east-1"
+
+    def __init__(self, use_informers=True, connection_pool_maxsize=32, tcp_keepalive=True,
+                 describe_concurrency=8, describe_max_attempts=5, describe_backoff_base=0.5, region_concurrency=8,
+                 discovery_cache_ttl=300, discovery_cache_size=1024, aggregate_concurrency=16, aggregate_timeout=10,
+                 connection_registry=None, registry_check_interval=2, metrics_cache_ttl=15, log_streams_per_cluster=4,
+                 log_keepalive_interval=15,
+                 session_pool_size=128, session_idle_ttl=900, list_reuse_window=0, connect_timeout=5, read_timeout=30,
+                 breaker_failure_threshold=5, breaker_reset_timeout=30, health_check_interval=60,
+                 snapshot_store=None, snapshot_interval=60):
         self.connected_clusters = {}
-        print("EKSConnector initialized")
+        # Optional registry shared between worker processes; connections made by another worker
+        # are rebuilt locally on first use
+        self.connection_registry = connection_registry
+        # Seconds a local connection is served before its registry record is checked again, so requests
+        # don't all read the registry; disconnects by other workers are noticed within that time
+        self.registry_check_interval = registry_check_interval
+        self._rebuild_locks = {}
+        self._rebuild_locks_lock = threading.Lock()
+        # metrics.k8s.io usage indexed by (namespace, name), keyed by (connection ID, resource type);
+        # metrics-server only refreshes every 15 seconds or so
+        self.metrics_cache = TTLCache(maxsize=256, ttl=metrics_cache_ttl)
+        # Concurrent identical upstream lists share one call; with list_reuse_window > 0 its formatted
+        # result is also reused for that many seconds after it finished
+        self.single_flight = SingleFlight(reuse_window=list_reuse_window)
+        # Serve get_resources from watch-backed in-memory stores instead of listing on every call
+        self.use_informers = use_informers
+        # Size of the urllib3 connection pool of each cluster's API client
+        self.connection_pool_maxsize = connection_pool_maxsize
+        # Enable TCP keep-alive on pooled connections to the API servers
+        self.tcp_keepalive = tcp_keepalive
+        # Maximum parallel describe_cluster calls and throttling retry settings for cluster discovery
+        self.describe_concurrency = describe_concurrency
+        self.describe_max_attempts = describe_max_attempts
+        self.describe_backoff_base = describe_backoff_base
+        # Maximum regions scanned in parallel by multi-region discovery
+        self.region_concurrency = region_concurrency
+        # list_clusters/describe_cluster results keyed by (credential identity, region, cluster name or None)
+        self.discovery_cache = TTLCache(maxsize=discovery_cache_size, ttl=discovery_cache_ttl)
+        # Seconds to wait for a connection and for each read of AWS and Kubernetes API calls, so a
+        # hanging upstream fails the request instead of holding its worker thread
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.kube_request_timeout = (connect_timeout, read_timeout)
+        # boto3 sessions and their clients keyed by (credential identity, region), reused across requests
+        self.sessions = SessionPool(maxsize=session_pool_size, idle_ttl=session_idle_ttl,
+                                    client_config=Config(connect_timeout=connect_timeout, read_timeout=read_timeout))
+        # Circuit breaker of each connection: after breaker_failure_threshold consecutive errors calls to
+        # the cluster fail fast, and it is probed in the background every breaker_reset_timeout seconds
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        # Re-probes the connections of this worker in the background (see start_health_monitor)
+        self.health_monitor = HealthMonitor(
+            self.check_health,
+            lambda: list(self.connected_clusters),
+            interval=health_check_interval
+        ) if health_check_interval else None
+        # Optional on-disk copy of the connections and informer caches, saved every snapshot_interval
+        # seconds, so a restarted service answers right away and resumes its watches (see restore_snapshots)
+        self.snapshot_store = snapshot_store
+        self.snapshot_interval = snapshot_interval
+        # (connection ID, resource type) -> resourceVersion of the saved or restored snapshot
+        self._saved_resource_versions = {}
+        self._snapshot_stop = threading.Event()
+        self._snapshot_thread = None
+        # Maximum clusters queried in parallel, and default seconds to wait for each, by aggregate queries
+        self.aggregate_concurrency = aggregate_concurrency
+        self.aggregate_timeout = aggregate_timeout
+        # Maximum concurrent log streams per connection; each holds a pooled API server connection
+        self.log_streams_per_cluster = log_streams_per_cluster
+        # Seconds a followed log may stay quiet before a keep-alive is sent, so streams of clients that went
+        # away end (and free their slot) instead of waiting for the next log line
+        self.log_keepalive_interval = log_keepalive_interval
+        self._log_semaphores = {}
+        self._log_semaphores_lock = threading.Lock()
+        logger.info("EKSConnector initialized")
         
     def connect_with_aws_credentials(self, cluster_name, region, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None):
         """
@@ -26,7 +162,7 @@ class EKSConnector:
         Returns:
             dict: Connection result with success status and message
         """
-        print(f"Attempting to connect to cluster '{cluster_name}' in region '{region}'")
+        logger.info(f"Attempting to connect to cluster '{cluster_name}' in region '{region}'")
         try:
             # Initialize AWS session
             session_kwargs = {
@@ -39,77 +175,31 @@ class EKSConnector:
                 session_kwargs['aws_secret_access_key'] = aws_secret_access_key
                 if aws_session_token:
                     session_kwargs['aws_session_token'] = aws_session_token
-                print(f"Using provided AWS credentials (Access Key ID: {aws_access_key_id[:4]}...)")
+                logger.debug(f"Using provided AWS credentials (Access Key ID: {aws_access_key_id[:4]}...)")
             else:
-                print("No AWS credentials provided")
-            
-            # Create boto3 session
-            print("Creating boto3 session...")
-            session = boto3.Session(**session_kwargs)
+                logger.debug("No AWS credentials provided")
             
-            # Create EKS client
-            print("Creating EKS client...")
-            eks_client = session.client('eks')
-            
-            # Get cluster info
-            print(f"Retrieving cluster info for '{cluster_name}'...")
-            cluster = eks_client.describe_cluster(name=cluster_name)
-            cluster_info = cluster['cluster']
-            print(f"Cluster info retrieved successfully. Version: {cluster_info.get('version')}, Status: {cluster_info.get('status')}")
-            
-            # Generate kubeconfig for the cluster
-            print("Generating kubeconfig...")
-            kubeconfig = self._generate_kubeconfig(cluster_info, session)
-            
-            # Load the kubeconfig
-            print("Loading kubeconfig...")
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(yaml.dump(kubeconfig).encode())
-                temp_file_path = temp_file.name
-            
-            # Load the configuration
-            config.load_kube_config(config_file=temp_file_path)
-            os.unlink(temp_file_path)
-            
-            # Initialize the API client
-            print("Initializing Kubernetes API client...")
-            api_client = client.ApiClient()
-            
-            # Test connection by listing namespaces
-            print("Testing connection by listing namespaces...")
-            v1 = client.CoreV1Api(api_client)
-            namespaces = v1.list_namespace()
-            print(f"Connection successful. Found {len(namespaces.items)} namespaces.")
-            
-            # Store the client for later use
-            connection_id = f"{region}_{cluster_name}"
-            self.connected_clusters[connection_id] = {
-                "api_client": api_client,
-                "cluster_info": {
-                    "name": cluster_name,
-                    "region": region,
-                    "version": cluster_info.get('version'),
-                    "status": cluster_info.get('status'),
-                    "endpoint": cluster_info.get('endpoint')
-                }
-            }
+            # Reuse the boto3 session of these credentials
+            identity = self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token)
+            session = self.sessions.get(identity, region, lambda: self._new_session(session_kwargs))
             
-            return {
-                "success": True,
-                "message": f"Successfully connected to cluster {cluster_name}",
-                "connection_id": connection_id
-            }
+            auth = {"type": "default"}
+            if aws_access_key_id and aws_secret_access_key:
+                # Only the hash of the keys is stored, the keys themselves never leave this worker
+                auth = {"type": "keys", "identity": identity}
+            return self._connect_with_session(session, cluster_name, region, identity, auth)
             
         except ClientError as e:
+            self._forget_rejected_session(e, identity)
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             error_message = e.response.get('Error', {}).get('Message', str(e))
-            print(f"AWS ClientError: {error_code} - {error_message}")
+            logger.error(f"AWS ClientError: {error_code} - {error_message}")
             return {
                 "success": False,
                 "message": f"AWS Error ({error_code}): {error_message}"
             }
         except Exception as e:
-            print(f"Connection error: {str(e)}")
+            logger.error(f"Connection error: {str(e)}")
             return {
                 "success": False,
                 "message": f"Failed to connect to cluster: {str(e)}"
@@ -127,80 +217,285 @@ class EKSConnector:
         Returns:
             dict: Connection result with success status and message
         """
-        print(f"Attempting to connect to cluster '{cluster_name}' in region '{region}' using profile '{profile_name}'")
+        logger.info(f"Attempting to connect to cluster '{cluster_name}' in region '{region}' using profile '{profile_name}'")
         try:
-            # Create boto3 session with profile
-            print(f"Creating boto3 session with profile '{profile_name}'...")
-            session = boto3.Session(profile_name=profile_name, region_name=region)
+            # Reuse the boto3 session of this profile
+            identity = self._credential_identity(profile_name=profile_name)
+            session = self.sessions.get(identity, region,
+                                        lambda: self._new_session({'profile_name': profile_name, 'region_name': region}))
             
-            # Create EKS client
-            print("Creating EKS client...")
-            eks_client = session.client('eks')
-            
-            # Get cluster info
-            print(f"Retrieving cluster info for '{cluster_name}'...")
-            cluster = eks_client.describe_cluster(name=cluster_name)
-            cluster_info = cluster['cluster']
-            print(f"Cluster info retrieved successfully. Version: {cluster_info.get('version')}, Status: {cluster_info.get('status')}")
-            
-            # Generate kubeconfig for the cluster
-            print("Generating kubeconfig...")
-            kubeconfig = self._generate_kubeconfig(cluster_info, session)
-            
-            # Load the kubeconfig
-            print("Loading kubeconfig...")
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(yaml.dump(kubeconfig).encode())
-                temp_file_path = temp_file.name
-            
-            # Load the configuration
-            config.load_kube_config(config_file=temp_file_path)
-            os.unlink(temp_file_path)
-            
-            # Initialize the API client
-            print("Initializing Kubernetes API client...")
-            api_client = client.ApiClient()
-            
-            # Test connection by listing namespaces
-            print("Testing connection by listing namespaces...")
-            v1 = client.CoreV1Api(api_client)
-            namespaces = v1.list_namespace()
-            print(f"Connection successful. Found {len(namespaces.items)} namespaces.")
-            
-            # Store the client for later use
-            connection_id = f"{region}_{cluster_name}"
-            self.connected_clusters[connection_id] = {
-                "api_client": api_client,
-                "cluster_info": {
-                    "name": cluster_name,
-                    "region": region,
-                    "version": cluster_info.get('version'),
-                    "status": cluster_info.get('status'),
-                    "endpoint": cluster_info.get('endpoint')
-                }
-            }
-            
-            return {
-                "success": True,
-                "message": f"Successfully connected to cluster {cluster_name}",
-                "connection_id": connection_id
-            }
+            return self._connect_with_session(session, cluster_name, region, identity, {"type": "profile", "profile_name": profile_name})
             
         except ClientError as e:
+            self._forget_rejected_session(e, identity)
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             error_message = e.response.get('Error', {}).get('Message', str(e))
-            print(f"AWS ClientError: {error_code} - {error_message}")
+            logger.error(f"AWS ClientError: {error_code} - {error_message}")
             return {
                 "success": False,
                 "message": f"AWS Error ({error_code}): {error_message}"
             }
         except Exception as e:
-            print(f"Connection error: {str(e)}")
+            logger.error(f"Connection error: {str(e)}")
             return {
                 "success": False,
                 "message": f"Failed to connect to cluster: {str(e)}"
             }
     
+    def _connect_with_session(self, session, cluster_name, region, identity=None, auth=None):
+        """
+        Connect to an EKS cluster with an already configured boto3 session.
+        
+        Args:
+            session: boto3 session holding the credentials to use
+            cluster_name (str): Name of the EKS cluster
+            region (str): AWS region where the cluster is located
+            identity (str, optional): Credential identity used to key cached cluster metadata
+            auth (dict, optional): How to recreate the session, stored in the connection registry
+            
+        Returns:
+            dict: Connection result with success status and message
+        """
+        # Create EKS client
+        logger.debug("Creating EKS client...")
+        eks_client = session.client('eks')
+        
+        # Get cluster info
+        logger.info(f"Retrieving cluster info for '{cluster_name}'...")
+        cluster_info = self._describe_cluster(eks_client, region, cluster_name, identity)
+        logger.info(f"Cluster info retrieved successfully. Version: {cluster_info.get('version')}, Status: {cluster_info.get('status')}")
+        
+        try:
+            return self._connect_with_cluster_info(session, cluster_info, cluster_name, region, auth)
+        except Exception:
+            # The cached endpoint or CA may be outdated, describe the cluster again next time
+            self.discovery_cache.invalidate(key=(identity, region, cluster_name))
+            raise
+    
+    def _connect_with_cluster_info(self, session, cluster_info, cluster_name, region, auth=None, generation=None, probe=True):
+        """
+        Build and test the Kubernetes API client of a described cluster and register the connection.
+        
+        Args:
+            session: boto3 session holding the credentials to use
+            cluster_info (dict): Cluster info as returned by describe_cluster
+            cluster_name (str): Name of the EKS cluster
+            region (str): AWS region where the cluster is located
+            auth (dict, optional): How to recreate the session, stored in the connection registry
+            generation (str, optional): Generation of a registry record being rebuilt; a new
+                connection is registered when not given
+            probe (bool, optional): Check that the API server answers first; connections restored
+                from a snapshot skip it and are checked by the health monitor
+            
+        Returns:
+            dict: Connection result with success status and message
+        """
+        # Bearer tokens are generated in-process from the session and cached until shortly before expiry
+        token_provider = EKSTokenProvider(session, cluster_name, region)
+        
+        # Generate kubeconfig for the cluster
+        logger.debug("Generating kubeconfig...")
+        kubeconfig = self._generate_kubeconfig(cluster_info, token_provider.get_token())
+        
+        # Build a client that owns its configuration instead of loading the global default
+        logger.debug("Initializing Kubernetes API client...")
+        api_client = self._create_api_client(kubeconfig, token_provider)
+        
+        health = None
+        if probe:
+            # Test the connection with the small /version response
+            logger.debug("Testing connection with the API server version...")
+            health = self._probe_api_server(api_client)
+            logger.info(f"Connection successful. API server version {health['kubernetes_version']}, "
+                        f"{health['latency_ms']} ms")
+        
+        # Store the client for later use, replacing a previous connection to the same cluster
+        connection_id = f"{region}_{cluster_name}"
+        previous = self.connected_clusters.get(connection_id)
+        if previous is not None:
+            logger.info(f"Replacing existing connection '{connection_id}'")
+            self._close_connection(previous)
+        # The failures and probe of the previous client don't apply to the new one
+        self._close_breaker(connection_id)
+        summary = {
+            "name": cluster_name,
+            "region": region,
+            "version": cluster_info.get('version'),
+            "status": cluster_info.get('status'),
+            "endpoint": cluster_info.get('endpoint')
+        }
+        # Endpoint and CA are public, so other workers (or the next start) can rebuild without describing the cluster again
+        record = {
+            "cluster_name": cluster_name,
+            "region": region,
+            "auth": auth or {"type": "default"},
+            "cluster": {
+                "name": cluster_info['name'],
+                "arn": cluster_info['arn'],
+                "endpoint": cluster_info['endpoint'],
+                "certificateAuthority": cluster_info['certificateAuthority'],
+                "version": cluster_info.get('version'),
+                "status": cluster_info.get('status')
+            },
+            "cluster_info": summary
+        }
+        if self.connection_registry is not None and generation is None:
+            generation = uuid.uuid4().hex
+            self.connection_registry.save(connection_id, dict(record, generation=generation))
+        # Key-based connections can't be restored without their keys, so nothing of them is saved
+        saves_snapshots = record["auth"]["type"] != "keys"
+        if self.snapshot_store is not None:
+            if saves_snapshots:
+                self._save_connection_snapshot(connection_id, record)
+            else:
+                self._delete_snapshots(connection_id)
+        self.connected_clusters[connection_id] = {
+            "api_client": api_client,
+            "informers": {},
+            "informer_lock": threading.Lock(),
+            "generation": generation,
+            "cluster_info": summary,
+            # EKS status, shown again once an unreachable cluster answers
+            "eks_status": summary["status"],
+            "health": health,
+            "saves_snapshots": saves_snapshots,
+            # monotonic time the registry record was last seen with this generation
+            "registry_checked_at": time.monotonic()
+        }
+        
+        return {
+            "success": True,
+            "message": f"Successfully connected to cluster {cluster_name}",
+            "connection_id": connection_id
+        }
+    
+    def _get_cluster(self, connection_id):
+        """
+        Get the entry of a connection, rebuilding it from the connection registry when it was
+        made (or replaced) by another worker, and dropping it when another worker disconnected it.
+        
+        Args:
+            connection_id (str): ID of the connection
+            
+        Returns:
+            dict: Entry of the connected cluster, or None if it isn't connected
+        """
+        cluster = self.connected_clusters.get(connection_id)
+        if self.connection_registry is None:
+            return cluster
+        now = time.monotonic()
+        if cluster is not None and now - cluster.get("registry_checked_at", 0) < self.registry_check_interval:
+            return cluster
+        
+        record = self.connection_registry.get(connection_id)
+        if record is None:
+            if cluster is not None:
+                logger.info(f"Connection '{connection_id}' was disconnected by another worker")
+                self._drop_local_connection(connection_id, cluster)
+            return None
+        if cluster is not None and cluster.get("generation") == record["generation"]:
+            cluster["registry_checked_at"] = now
+            return cluster
+        
+        with self._rebuild_locks_lock:
+            rebuild_lock = self._rebuild_locks.setdefault(connection_id, threading.Lock())
+        with rebuild_lock:
+            cluster = self.connected_clusters.get(connection_id)
+            if cluster is not None and cluster.get("generation") == record["generation"]:
+                return cluster
+            session = self._session_from_auth(record["auth"], record["region"])
+            if session is None:
+                # Keep serving our own connection rather than one we can't rebuild
+                logger.warning(f"Connection '{connection_id}' uses access keys that aren't shared between workers")
+                if cluster is not None:
+                    cluster["registry_checked_at"] = now
+                return cluster
+            logger.info(f"Rebuilding connection '{connection_id}' from the connection registry")
+            try:
+                self._connect_with_cluster_info(session, record["cluster"], record["cluster_name"], record["region"],
+                                                record["auth"], generation=record["generation"])
+            except Exception as e:
+                logger.error(f"Error rebuilding connection '{connection_id}': {str(e)}")
+                return None
+            return self.connected_clusters.get(connection_id)
+    
+    def _not_connected(self, connection_id):
+        """
+        Error result for a connection this worker can't serve.
+        
+        Connections made with access keys by another worker are listed from the connection registry,
+        but the keys were only given to that worker: clients are asked to reconnect instead.
+        """
+        logger.warning(f"Connection '{connection_id}' not found")
+        record = self.connection_registry.get(connection_id) if self.connection_registry is not None else None
+        if record is not None and record["auth"]["type"] == "keys":
+            return {
+                "success": False,
+                "reconnect_required": True,
+                "message": "Cluster was connected with access keys on another worker, connect again to use it here"
+            }
+        return {
+            "success": False,
+            "message": "Cluster not connected"
+        }
+    
+    def _session_from_auth(self, auth, region):
+        if auth["type"] == "profile":
+            return self.sessions.get(self._credential_identity(profile_name=auth["profile_name"]), region,
+                                     lambda: self._new_session({'profile_name': auth["profile_name"], 'region_name': region}))
+        if auth["type"] == "keys":
+            # Access keys are never stored, only the worker that was given them can use them
+            return None
+        return self.sessions.get(self._credential_identity(), region, lambda: self._new_session({'region_name': region}))
+    
+    def _drop_local_connection(self, connection_id, cluster):
+        if self.connected_clusters.get(connection_id) is cluster:
+            self.connected_clusters.pop(connection_id, None)
+            self._close_connection(cluster)
+    
+    def connection_ids(self):
+        """
+        IDs of the connections visible to this worker.
+        
+        Returns:
+            list: Connection IDs, including connections made by other workers when a registry is used
+        """
+        if self.connection_registry is None:
+            return list(self.connected_clusters)
+        return list(self.connection_registry.list())
+    
+    def _create_api_client(self, kubeconfig, token_provider=None):
+        """
+        Create a Kubernetes API client with its own configuration and connection pool.
+        
+        The kubeconfig is loaded from memory into a fresh Configuration, so the process-wide
+        default configuration is never touched and each connection keeps its own settings.
+        
+        Args:
+            kubeconfig (dict): Kubeconfig data
+            token_provider (EKSTokenProvider, optional): Source of refreshed bearer tokens
+            
+        Returns:
+            ApiClient: Kubernetes API client of the connection
+        """
+        configuration = client.Configuration()
+        config.load_kube_config_from_dict(kubeconfig, client_configuration=configuration, persist_config=False)
+        configuration.connection_pool_maxsize = self.connection_pool_maxsize
+        
+        if token_provider is not None:
+            # Called before every request; returns the cached token until it is about to expire
+            def refresh_token(client_configuration):
+                client_configuration.api_key['authorization'] = f"Bearer {token_provider.get_token()}"
+            configuration.refresh_api_key_hook = refresh_token
+        
+        api_client = client.ApiClient(configuration)
+        
+        if self.tcp_keepalive:
+            # Keep idle pooled connections to the API server alive through NAT and load balancers
+            api_client.rest_client.pool_manager.connection_pool_kw['socket_options'] = \
+                HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        return api_client
+    
     def list_available_clusters(self, region, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None, profile_name=None):
         """
         List available EKS clusters in the specified region.
@@ -215,80 +510,28 @@ class EKSConnector:
         Returns:
             dict: List of available clusters
         """
-        print(f"Attempting to list clusters in region '{region}'")
+        logger.info(f"Attempting to list clusters in region '{region}'")
         try:
-            # Initialize AWS session
-            session_kwargs = {
-                'region_name': region
-            }
-            
-            # Add credentials if provided
-            if profile_name:
-                session_kwargs['profile_name'] = profile_name
-                print(f"Using AWS profile: {profile_name}")
-            elif aws_access_key_id and aws_secret_access_key:
-                session_kwargs['aws_access_key_id'] = aws_access_key_id
-                session_kwargs['aws_secret_access_key'] = aws_secret_access_key
-                if aws_session_token:
-                    session_kwargs['aws_session_token'] = aws_session_token
-                print(f"Using AWS credentials (Access Key ID: {aws_access_key_id[:4]}...)")
-            else:
-                print("No AWS credentials or profile provided, using instance role or environment variables")
-            
-            # Create boto3 session
-            print("Creating boto3 session...")
-            session = boto3.Session(**session_kwargs)
+            session = self._create_session(region, aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name)
+            identity = self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name)
             
             # Create EKS client
-            print("Creating EKS client...")
+            logger.debug("Creating EKS client...")
             eks_client = session.client('eks')
             
-            # List clusters
-            print("Calling list_clusters API...")
-            clusters = eks_client.list_clusters()
-            cluster_names = clusters['clusters']
-            print(f"Found {len(cluster_names)} clusters: {cluster_names}")
-            
-            # Get details for each cluster
-            cluster_details = []
-            for cluster_name in cluster_names:
-                try:
-                    print(f"Getting details for cluster '{cluster_name}'...")
-                    cluster_info = eks_client.describe_cluster(name=cluster_name)['cluster']
-                    created_at = cluster_info.get('createdAt')
-                    created_at_str = created_at.isoformat() if created_at else None
-                    
-                    cluster_details.append({
-                        "name": cluster_name,
-                        "status": cluster_info.get('status'),
-                        "version": cluster_info.get('version'),
-                        "endpoint": cluster_info.get('endpoint'),
-                        "created_at": created_at_str
-                    })
-                    print(f"Successfully retrieved details for cluster '{cluster_name}'")
-                except Exception as e:
-                    print(f"Error getting details for cluster '{cluster_name}': {str(e)}")
-                    # Skip clusters that we can't get details for
-                    continue
-            
-            print(f"Returning details for {len(cluster_details)} clusters")
-            return {
-                "success": True,
-                "region": region,
-                "clusters": cluster_details,
-                "count": len(cluster_details)
-            }
+            return self._list_clusters_in_region(eks_client, region, identity)
             
         except ClientError as e:
+            self._forget_rejected_session(e, self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name))
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
             error_message = e.response.get('Error', {}).get('Message', str(e))
-            print(f"AWS ClientError when listing clusters: {error_code} - {error_message}")
+            logger.error(f"AWS ClientError when listing clusters: {error_code} - {error_message}")
             return {
                 "success": False,
                 "message": f"AWS Error ({error_code}): {error_message}"
             }
         except Exception as e:
-            print(f"Unexpected error when listing clusters: {str(e)}")
+            logger.error(f"Unexpected error when listing clusters: {str(e)}")
             import traceback
             traceback.print_exc()
             return {
@@ -296,254 +539,1864 @@ class EKSConnector:
                 "message": f"Failed to list clusters: {str(e)}"
             }
     
-    def get_resources(self, connection_id, resource_type):
+    def discover_clusters(self, regions=None, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None, profile_name=None):
         """
-        Get resources of specified type from the connected cluster.
+        Discover EKS clusters in several regions at once.
+        
+        All regions are scanned concurrently with one boto3 session, and each region's result is
+        yielded as soon as it is ready, so a slow region doesn't hold up the others.
         
         Args:
-            connection_id (str): ID of the connected cluster
-            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            regions (list or str, optional): AWS regions to scan, or "all"/None for every enabled region
+            aws_access_key_id (str, optional): AWS access key ID
+            aws_secret_access_key (str, optional): AWS secret access key
+            aws_session_token (str, optional): AWS session token
+            profile_name (str, optional): AWS profile name
             
-        Returns:
-            dict: Resources data or error message
+        Yields:
+            dict: Result of one region (same shape as list_available_clusters), including the region
         """
-        print(f"Getting resources of type '{resource_type}' for connection '{connection_id}'")
-        if connection_id not in self.connected_clusters:
-            print(f"Connection '{connection_id}' not found")
-            return {
-                "success": False,
-                "message": "Cluster not connected"
-            }
-        
+        logger.info(f"Attempting to discover clusters in regions: {regions or 'all'}")
         try:
-            api_client = self.connected_clusters[connection_id]["api_client"]
-            
-            if resource_type == "pods":
-                print("Listing pods...")
-                api = client.CoreV1Api(api_client)
-                resources = api.list_pod_for_all_namespaces()
-                print(f"Found {len(resources.items)} pods")
-                return self._format_resources(resources.items, resource_type)
-            
-            elif resource_type == "deployments":
-                print("Listing deployments...")
-                api = client.AppsV1Api(api_client)
-                resources = api.list_deployment_for_all_namespaces()
-                print(f"Found {len(resources.items)} deployments")
-                return self._format_resources(resources.items, resource_type)
-            
-            elif resource_type == "services":
-                print("Listing services...")
-                api = client.CoreV1Api(api_client)
-                resources = api.list_service_for_all_namespaces()
-                print(f"Found {len(resources.items)} services")
-                return self._format_resources(resources.items, resource_type)
-            
-            elif resource_type == "nodes":
-                print("Listing nodes...")
-                api = client.CoreV1Api(api_client)
-                resources = api.list_node()
-                print(f"Found {len(resources.items)} nodes")
-                return self._format_resources(resources.items, resource_type)
+            session = self._create_session(None, aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name)
+            identity = self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name)
+            if not regions or regions == "all":
+                regions = self._enabled_regions(session)
             
-            else:
-                print(f"Unsupported resource type: {resource_type}")
-                return {
-                    "success": False,
-                    "message": f"Unsupported resource type: {resource_type}"
-                }
-                
+            # Clients are thread-safe but sessions are not, so create them all before fanning out
+            eks_clients = {region: session.client('eks', region_name=region) for region in regions}
+        except ClientError as e:
+            self._forget_rejected_session(e, self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name))
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            error_message = e.response.get('Error', {}).get('Message', str(e))
+            logger.error(f"AWS ClientError when preparing discovery: {error_code} - {error_message}")
+            yield {
+                "success": False,
+                "region": None,
+                "message": f"AWS Error ({error_code}): {error_message}"
+            }
+            return
         except Exception as e:
-            print(f"Error getting resources: {str(e)}")
-            return {
+            logger.error(f"Unexpected error when preparing discovery: {str(e)}")
+            yield {
                 "success": False,
-                "message": f"Failed to get resources: {str(e)}"
+                "region": None,
+                "message": f"Failed to list clusters: {str(e)}"
             }
+            return
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.region_concurrency, len(eks_clients)))) as executor:
+            futures = {
+                executor.submit(self._list_clusters_in_region, eks_client, region, identity): region
+                for region, eks_client in eks_clients.items()
+            }
+            for future in as_completed(futures):
+                region = futures[future]
+                try:
+                    yield future.result()
+                except ClientError as e:
+                    error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+                    error_message = e.response.get('Error', {}).get('Message', str(e))
+                    logger.error(f"AWS ClientError when listing clusters in '{region}': {error_code} - {error_message}")
+                    yield {
+                        "success": False,
+                        "region": region,
+                        "message": f"AWS Error ({error_code}): {error_message}"
+                    }
+                except Exception as e:
+                    logger.error(f"Unexpected error when listing clusters in '{region}': {str(e)}")
+                    yield {
+                        "success": False,
+                        "region": region,
+                        "message": f"Failed to list clusters: {str(e)}"
+                    }
     
-    def disconnect(self, connection_id):
+    def list_clusters_in_regions(self, regions=None, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None, profile_name=None):
         """
-        Disconnect from a cluster.
+        Discover EKS clusters in several regions and combine the results.
         
         Args:
-            connection_id (str): ID of the connected cluster
+            regions (list or str, optional): AWS regions to scan, or "all"/None for every enabled region
+            aws_access_key_id (str, optional): AWS access key ID
+            aws_secret_access_key (str, optional): AWS secret access key
+            aws_session_token (str, optional): AWS session token
+            profile_name (str, optional): AWS profile name
             
         Returns:
-            dict: Disconnection result with success status and message
-        """
-        print(f"Disconnecting from cluster with connection ID '{connection_id}'")
-        if connection_id in self.connected_clusters:
-            cluster_info = self.connected_clusters[connection_id]["cluster_info"]
-            del self.connected_clusters[connection_id]
-            print(f"Successfully disconnected from cluster '{cluster_info['name']}'")
-            return {
-                "success": True,
-                "message": f"Disconnected from cluster {cluster_info['name']}"
-            }
-        else:
-            print(f"Connection '{connection_id}' not found")
-            return {
-                "success": False,
-                "message": "Cluster not connected"
-            }
-    
-    def list_connected_clusters(self):
+            dict: Clusters of all regions tagged with their region, and per-region errors
         """
-        List all connected clusters.
+        clusters = []
+        errors = {}
+        scanned = []
+        for result in self.discover_clusters(regions, aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name):
+            if result["region"] is None:
+                return result
+            scanned.append(result["region"])
+            if result["success"]:
+                clusters.extend(dict(cluster, region=result["region"]) for cluster in result["clusters"])
+            else:
+                errors[result["region"]] = result["message"]
         
-        Returns:
-            list: List of connected clusters with their information
-        """
-        print(f"Listing connected clusters. Currently connected to {len(self.connected_clusters)} clusters")
-        return [
-            {
-                "connection_id": conn_id,
-                "cluster_info": cluster_data["cluster_info"]
-            }
-            for conn_id, cluster_data in self.connected_clusters.items()
-        ]
+        clusters.sort(key=lambda cluster: (cluster["region"], cluster["name"]))
+        return {
+            "success": True,
+            "regions": sorted(scanned),
+            "clusters": clusters,
+            "count": len(clusters),
+            "errors": errors
+        }
     
-    def _generate_kubeconfig(self, cluster_info, aws_session):
+    def _create_session(self, region, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None, profile_name=None):
         """
-        Generate a kubeconfig for connecting to the EKS cluster.
+        Get the pooled boto3 session of a profile, explicit credentials or the default credential chain.
         
         Args:
-            cluster_info: EKS cluster info
-            aws_session: boto3 session
+            region (str): Default AWS region of the session (may be None)
+            aws_access_key_id (str, optional): AWS access key ID
+            aws_secret_access_key (str, optional): AWS secret access key
+            aws_session_token (str, optional): AWS session token
+            profile_name (str, optional): AWS profile name
             
         Returns:
-            dict: Kubeconfig data
+            PooledSession: Session shared by calls with the same credentials and region
         """
-        cluster_name = cluster_info['name']
-        cluster_endpoint = cluster_info['endpoint']
-        cluster_ca = cluster_info['certificateAuthority']['data']
-        cluster_arn = cluster_info['arn']
-        region = cluster_arn.split(':')[3]
-        
-        print(f"Generating kubeconfig for cluster '{cluster_name}' in region '{region}'")
-        
-        # Create a kubeconfig
-        kubeconfig = {
-            "apiVersion": "v1",
-            "kind": "Config",
-            "current-context": cluster_name,
-            "clusters": [
-                {
-                    "name": cluster_name,
-                    "cluster": {
-                        "server": cluster_endpoint,
-                        "certificate-authority-data": cluster_ca
-                    }
-                }
-            ],
-            "contexts": [
-                {
-                    "name": cluster_name,
-                    "context": {
-                        "cluster": cluster_name,
-                        "user": "aws"
-                    }
-                }
-            ],
-            "users": [
-                {
-                    "name": "aws",
-                    "user": {
-                        "exec": {
-                            "apiVersion": "client.authentication.k8s.io/v1beta1",
-                            "command": "aws",
-                            "args": [
-                                "eks",
-                                "get-token",
-                                "--cluster-name",
-                                cluster_name,
-                                "--region",
-                                region
-                            ]
-                        }
-                    }
-                }
-            ]
+        # Initialize AWS session
+        session_kwargs = {
+            'region_name': region
         }
         
-        # Add profile if it exists - safely check for profile_name
-        try:
-            profile_name = None
-            # Try to get profile name safely
-            if hasattr(aws_session, '_session'):
-                if hasattr(aws_session._session, 'profile_name'):
-                    profile_name = aws_session._session.profile_name
-            
-            # Alternative method to get profile name if above doesn't work
-            if profile_name is None and hasattr(aws_session, 'profile_name'):
-                profile_name = aws_session.profile_name
-                
-            if profile_name:
-                print(f"Adding profile '{profile_name}' to kubeconfig")
-                kubeconfig["users"][0]["user"]["exec"]["args"].extend(["--profile", profile_name])
-        except Exception as e:
-            print(f"Warning: Couldn't add profile to kubeconfig: {str(e)}")
-            # Continue without profile - will use default credentials
+        # Add credentials if provided
+        if profile_name:
+            session_kwargs['profile_name'] = profile_name
+            logger.debug(f"Using AWS profile: {profile_name}")
+        elif aws_access_key_id and aws_secret_access_key:
+            session_kwargs['aws_access_key_id'] = aws_access_key_id
+            session_kwargs['aws_secret_access_key'] = aws_secret_access_key
+            if aws_session_token:
+                session_kwargs['aws_session_token'] = aws_session_token
+            logger.debug(f"Using AWS credentials (Access Key ID: {aws_access_key_id[:4]}...)")
+        else:
+            logger.debug("No AWS credentials or profile provided, using instance role or environment variables")
         
-        return kubeconfig
+        identity = self._credential_identity(aws_access_key_id, aws_secret_access_key, aws_session_token, profile_name)
+        return self.sessions.get(identity, region, lambda: self._new_session(session_kwargs))
     
-    def _format_resources(self, items, resource_type):
+    def _forget_rejected_session(self, error, identity):
+        """Drop pooled sessions whose credentials AWS rejected, so e.g. a refreshed profile is reloaded next time"""
+        if error.response.get('Error', {}).get('Code') in self.REJECTED_CREDENTIALS_ERROR_CODES:
+            removed = self.sessions.invalidate(identity)
+            logger.warning(f"Dropped {removed} pooled sessions with rejected credentials")
+    
+    def _new_session(self, session_kwargs):
+        logger.debug("Creating boto3 session...")
+        with timed("boto3_session"):
+            return boto3.Session(**session_kwargs)
+    
+    def _credential_identity(self, aws_access_key_id=None, aws_secret_access_key=None, aws_session_token=None, profile_name=None):
         """
-        Format resources for API response.
+        Build a non-reversible identity for a set of AWS credentials, used to key cached results.
+        
+        The secret is part of the hash so that a caller knowing only an access key ID
+        can't read results cached for the real credentials.
         
         Args:
-            items: List of resource items
-            resource_type: Type of the resource
+            aws_access_key_id (str, optional): AWS access key ID
+            aws_secret_access_key (str, optional): AWS secret access key
+            aws_session_token (str, optional): AWS session token
+            profile_name (str, optional): AWS profile name
             
         Returns:
-            dict: Formatted resources
+            str: Credential identity
         """
-        formatted_items = []
-        
-        for item in items:
-            if resource_type == "pods":
-                formatted_items.append({
-                    "name": item.metadata.name,
-                    "namespace": item.metadata.namespace,
-                    "status": item.status.phase,
-                    "containers": [cont.name for cont in item.spec.containers],
-                    "node": item.spec.node_name if item.spec.node_name else "Not scheduled",
-                    "created_at": item.metadata.creation_timestamp.isoformat() if item.metadata.creation_timestamp else None
-                })
-            
-            elif resource_type == "deployments":
-                formatted_items.append({
-                    "name": item.metadata.name,
-                    "namespace": item.metadata.namespace,
-                    "replicas": item.spec.replicas,
-                    "available_replicas": item.status.available_replicas if item.status.available_replicas else 0,
-                    "created_at": item.metadata.creation_timestamp.isoformat() if item.metadata.creation_timestamp else None
-                })
+        if profile_name:
+            return f"profile:{profile_name}"
+        if aws_access_key_id and aws_secret_access_key:
+            digest = hashlib.sha256(
+                "\0".join([aws_access_key_id, aws_secret_access_key, aws_session_token or ""]).encode()
+            ).hexdigest()
+            return f"keys:{digest}"
+        return "default"
+    
+    def invalidate_discovery_cache(self, region=None, cluster_name=None):
+        """
+        Drop cached list_clusters/describe_cluster results.
+        
+        Args:
+            region (str, optional): Only drop entries of this region
+            cluster_name (str, optional): Only drop the describe_cluster entries of this cluster
             
-            elif resource_type == "services":
-                formatted_items.append({
-                    "name": item.metadata.name,
-                    "namespace": item.metadata.namespace,
-                    "type": item.spec.type,
-                    "cluster_ip": item.spec.cluster_ip,
-                    "ports": [{"port": port.port, "target_port": port.target_port, "protocol": port.protocol} for port in item.spec.ports],
-                    "created_at": item.metadata.creation_timestamp.isoformat() if item.metadata.creation_timestamp else None
-                })
+        Returns:
+            dict: Number of removed entries
+        """
+        def matches(key):
+            _, key_region, key_cluster = key
+            if region and key_region != region:
+                return False
+            if cluster_name and key_cluster != cluster_name:
+                return False
+            return True
+        
+        removed = self.discovery_cache.invalidate(predicate=matches)
+        logger.info(f"Invalidated {removed} discovery cache entries")
+        return {
+            "success": True,
+            "removed": removed
+        }
+    
+    def discovery_cache_stats(self):
+        return self.discovery_cache.stats()
+    
+    def session_pool_stats(self):
+        return self.sessions.stats()
+    
+    def single_flight_stats(self):
+        return self.single_flight.stats()
+    
+    def _enabled_regions(self, session):
+        """
+        List the regions enabled for the account.
+        
+        Args:
+            session: boto3 session
+            
+        Returns:
+            list: Region names
+        """
+        logger.debug("Listing enabled regions...")
+        ec2_client = session.client('ec2', region_name=session.region_name or self.DEFAULT_DISCOVERY_REGION)
+        with timed("boto3"):
+            regions = ec2_client.describe_regions(AllRegions=False)['Regions']
+        return sorted(region['RegionName'] for region in regions)
+    
+    def _list_clusters_in_region(self, eks_client, region, identity=None):
+        """
+        List the clusters of one region with their details.
+        
+        Args:
+            eks_client: boto3 EKS client of the region
+            region (str): AWS region
+            identity (str, optional): Credential identity used to key cached results
+            
+        Returns:
+            dict: List of available clusters
+        """
+        # List clusters, following nextToken across all pages
+        cluster_names = self.discovery_cache.get_or_load(
+            (identity, region, None),
+            lambda: self._list_cluster_names(eks_client)
+        )
+        logger.debug(f"Found {len(cluster_names)} clusters: {cluster_names}")
+        
+        # Get details for each cluster in parallel, bounded by the concurrency limit
+        cluster_details = []
+        if cluster_names:
+            max_workers = min(self.describe_concurrency, len(cluster_names))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(lambda name: self._describe_cluster_summary(eks_client, region, name, identity), cluster_names)
+                # Skip clusters that we can't get details for
+                cluster_details = [details for details in results if details is not None]
+        
+        logger.info(f"Returning details for {len(cluster_details)} clusters in region '{region}'")
+        return {
+            "success": True,
+            "region": region,
+            "clusters": cluster_details,
+            "count": len(cluster_details)
+        }
+    
+    def _list_cluster_names(self, eks_client):
+        logger.debug("Calling list_clusters API...")
+        paginator = eks_client.get_paginator('list_clusters')
+        with timed("boto3"):
+            return [name for page in paginator.paginate() for name in page['clusters']]
+    
+    def _describe_cluster(self, eks_client, region, cluster_name, identity=None):
+        """
+        Describe a cluster, answering from the discovery cache when possible.
+        
+        Args:
+            eks_client: boto3 EKS client of the region
+            region (str): AWS region
+            cluster_name (str): Name of the EKS cluster
+            identity (str, optional): Credential identity used to key cached results
+            
+        Returns:
+            dict: Cluster info as returned by describe_cluster
+        """
+        def describe():
+            with timed("boto3"):
+                return eks_client.describe_cluster(name=cluster_name)['cluster']
+        
+        return self.discovery_cache.get_or_load((identity, region, cluster_name), describe)
+    
+    def _describe_cluster_summary(self, eks_client, region, cluster_name, identity=None):
+        """
+        Describe one cluster for the cluster picker, retrying with backoff when throttled.
+        
+        Args:
+            eks_client: boto3 EKS client
+            region (str): AWS region
+            cluster_name (str): Name of the EKS cluster
+            identity (str, optional): Credential identity used to key cached results
+            
+        Returns:
+            dict: Cluster summary, or None if the cluster couldn't be described
+        """
+        for attempt in range(self.describe_max_attempts):
+            try:
+                logger.debug(f"Getting details for cluster '{cluster_name}'...")
+                cluster_info = self._describe_cluster(eks_client, region, cluster_name, identity)
+                created_at = cluster_info.get('createdAt')
+                created_at_str = created_at.isoformat() if created_at else None
+                logger.debug(f"Successfully retrieved details for cluster '{cluster_name}'")
+                return {
+                    "name": cluster_name,
+                    "status": cluster_info.get('status'),
+                    "version": cluster_info.get('version'),
+                    "endpoint": cluster_info.get('endpoint'),
+                    "created_at": created_at_str
+                }
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code')
+                if error_code in self.THROTTLING_ERROR_CODES and attempt < self.describe_max_attempts - 1:
+                    # Exponential backoff with full jitter
+                    delay = random.uniform(0, self.describe_backoff_base * (2 ** attempt))
+                    logger.warning(f"Throttled describing cluster '{cluster_name}', retrying in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Error getting details for cluster '{cluster_name}': {str(e)}")
+                return None
+            except Exception as e:
+                logger.error(f"Error getting details for cluster '{cluster_name}': {str(e)}")
+                return None
+        return None
+    
+    def get_resources(self, connection_id, resource_type, namespace=None, label_selector=None, field_selector=None,
+                      limit=None, continue_token=None, fields=None, conditions=None, metrics=False, sort_by=None, top=None):
+        """
+        Get resources of specified type from the connected cluster.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            namespace (str, optional): Only return resources in this namespace (ignored for nodes)
+            label_selector (str, optional): Kubernetes label selector
+            field_selector (str, optional): Kubernetes field selector
+            limit (int, optional): Maximum number of items to return in one page
+            continue_token (str, optional): Continue token of the previous page
+            fields (list, optional): Only return these fields of each item
+            conditions (list, optional): (field, operator, value) tuples matched against formatted items,
+                operator being "=" or "!="; equality on indexed fields is answered from the informer indexes
+            metrics (bool, optional): Add cpu_millicores and memory_bytes from metrics.k8s.io (pods and nodes)
+            sort_by (str, optional): Field to order by, highest first; usage fields imply metrics
+            top (int, optional): Only return the first items by sort_by (cpu_millicores by default)
+            
+        Returns:
+            dict: Resources data or error message
+        """
+        logger.info(f"Getting resources of type '{resource_type}' for connection '{connection_id}'",
+                    extra={"connection_id": connection_id, "resource_type": resource_type})
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            return self._not_connected(connection_id)
+        
+        if resource_type not in self.RESOURCE_LISTERS:
+            logger.warning(f"Unsupported resource type: {resource_type}")
+            return {
+                "success": False,
+                "message": f"Unsupported resource type: {resource_type}"
+            }
+        namespace = self._namespace_filter(resource_type, namespace)
+        
+        if top and not sort_by:
+            sort_by = "cpu_millicores"
+        error = self._ranking_error(resource_type, metrics, sort_by)
+        if error:
+            return {
+                "success": False,
+                "message": error
+            }
+        
+        # Selectors and pagination are handled by the API server
+        list_kwargs = self._list_kwargs(label_selector, field_selector, limit, continue_token)
+        # Answers of a running informer don't call the cluster and are served even while its circuit is open
+        cached = self.use_informers and not list_kwargs and resource_type in cluster["informers"]
+        breaker = self._breaker(connection_id)
+        if not cached and not breaker.allow():
+            return self._circuit_open_result(connection_id, breaker)
+        
+        try:
+            usage, metrics_error = None, None
+            if metrics or sort_by in USAGE_FIELDS:
+                usage, metrics_error = self._get_usage(connection_id, cluster, resource_type)
+            
+            if self.use_informers and not list_kwargs:
+                # Answer from the watch-backed store, listing only on first use
+                informer = self._get_informer(cluster, resource_type)
+                with timed("cache", resource_type=resource_type):
+                    records = self._select(informer, namespace, conditions)
+                    if sort_by:
+                        records = self._rank(records, sort_by, top, usage)
+                logger.info(f"Found {len(records)} {resource_type} in informer cache",
+                            extra={"connection_id": connection_id, "resource_type": resource_type, "count": len(records)})
+                # Cached records are only turned into response dicts here, after ranking
+                with timed("format", resource_type=resource_type):
+                    items = [record.to_dict(fields) for record in records]
+                    if usage is not None:
+                        items = [self._add_usage(item, record, usage, fields) for item, record in zip(items, records)]
+                    result = self._resources_result(items, resource_type)
+                if informer.stale:
+                    # Restored from a snapshot, the watch hasn't caught up yet
+                    result["stale"] = True
+            else:
+                logger.info(f"Listing {resource_type} with {list_kwargs or 'no options'}...")
+                # Identical concurrent lists share one upstream call and its formatted result
+                shared = self.single_flight.do(
+                    self._list_key(connection_id, resource_type, namespace, list_kwargs),
+                    lambda: self._list_formatted(connection_id, cluster, resource_type, namespace, list_kwargs)
+                )
+                with timed("format", resource_type=resource_type):
+                    # Work on a copy, the shared result may be returned to other callers
+                    result = self._filter_result(dict(shared), conditions)
+                    if sort_by:
+                        result["items"] = self._rank(result["items"], sort_by, top, usage)
+                        result["count"] = len(result["items"])
+                    if usage is not None:
+                        result["items"] = [self._add_usage(dict(item), item, usage, None) for item in result["items"]]
+                    result = self._apply_fields(result, fields)
+            
+            if metrics_error:
+                result["metrics_error"] = metrics_error
+            if not cached:
+                breaker.record_success()
+            return result
+                
+        except Exception as e:
+            logger.error(f"Error getting resources: {str(e)}")
+            self._record_failure(breaker, e)
+            return {
+                "success": False,
+                "message": f"Failed to get resources: {str(e)}"
+            }
+    
+    def resources_version(self, connection_id, resource_type, label_selector=None, field_selector=None,
+                          limit=None, continue_token=None, metrics=False, sort_by=None, top=None):
+        """
+        Version of the cached resources answering a get_resources call, without building the answer.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            resource_type (str): Type of the resource
+            label_selector, field_selector, limit, continue_token, metrics, sort_by, top (optional): As for get_resources
+            
+        Returns:
+            str: Version that changes whenever the cached items change, or None if the call
+            wouldn't be answered from a running informer alone
+        """
+        if not self.use_informers or self._list_kwargs(label_selector, field_selector, limit, continue_token):
+            return None
+        if metrics or sort_by in USAGE_FIELDS or (top and not sort_by):
+            # Usage figures change without any change to the cached items
+            return None
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            return None
+        informer = cluster["informers"].get(resource_type)
+        if informer is None or informer.stopped:
+            return None
+        return informer.version
+    
+    def get_snapshot(self, connection_id, resource_types=None, namespace=None, fields=None, conditions=None):
+        """
+        Get several resource types of the connected cluster at once.
+        
+        The lists run concurrently on the connection's pooled client, so the call takes about
+        as long as the slowest list rather than the sum of all of them.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            resource_types (list, optional): Types to get, all supported types if not given
+            namespace (str, optional): Only return resources in this namespace (ignored for nodes)
+            fields (list, optional): Only return these fields of each item
+            conditions (list, optional): (field, operator, value) tuples matched against formatted items
+            
+        Returns:
+            dict: Per-type results with their duration, and per-type errors
+        """
+        logger.info(f"Getting snapshot of {resource_types or 'all resources'} for connection '{connection_id}'")
+        if self._get_cluster(connection_id) is None:
+            return self._not_connected(connection_id)
+        
+        resource_types = list(dict.fromkeys(resource_types or self.RESOURCE_LISTERS))
+        unsupported = [resource_type for resource_type in resource_types if resource_type not in self.RESOURCE_LISTERS]
+        if unsupported:
+            return {
+                "success": False,
+                "message": f"Unsupported resource type: {', '.join(unsupported)}"
+            }
+        
+        def timed_get(resource_type):
+            start = time.perf_counter()
+            result = self.get_resources(connection_id, resource_type, namespace=namespace, fields=fields, conditions=conditions)
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            return resource_type, result
+        
+        start = time.perf_counter()
+        resources = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(resource_types)) as executor:
+            for resource_type, result in executor.map(timed_get, resource_types):
+                resources[resource_type] = result
+                if not result["success"]:
+                    errors[resource_type] = result["message"]
+        
+        return {
+            "success": True,
+            "resources": resources,
+            "errors": errors,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+    
+    def aggregate_resources(self, resource_type, connection_ids=None, namespace=None, label_selector=None,
+                            field_selector=None, conditions=None, fields=None, timeout=None):
+        """
+        Query one resource type across several connected clusters in parallel and merge the results.
+        
+        Clusters that don't answer within the timeout are reported instead of failing the whole
+        query, so the result can be partial.
+        
+        Args:
+            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            connection_ids (list, optional): Connections to query, all connected clusters if not given
+            namespace (str, optional): Only return resources in this namespace (ignored for nodes)
+            label_selector (str, optional): Kubernetes label selector
+            field_selector (str, optional): Kubernetes field selector
+            conditions (list, optional): (field, operator, value) tuples matched against formatted items,
+                operator being "=" or "!=", e.g. ("reason", "=", "CrashLoopBackOff")
+            fields (list, optional): Only return these fields of each item (connection_id is always kept)
+            timeout (float, optional): Seconds to wait for the clusters, aggregate_timeout if not given
+            
+        Returns:
+            dict: Merged items tagged with their connection_id, per-cluster status and errors
+        """
+        if resource_type not in self.RESOURCE_LISTERS:
+            logger.warning(f"Unsupported resource type: {resource_type}")
+            return {
+                "success": False,
+                "message": f"Unsupported resource type: {resource_type}"
+            }
+        namespace = self._namespace_filter(resource_type, namespace)
+        
+        known_ids = self.connection_ids()
+        connection_ids = list(dict.fromkeys(connection_ids or known_ids))
+        timeout = self.aggregate_timeout if timeout is None else timeout
+        logger.info(f"Aggregating {resource_type} across {len(connection_ids)} clusters")
+        
+        def query(connection_id):
+            start = time.perf_counter()
+            result = self.get_resources(connection_id, resource_type, namespace=namespace, label_selector=label_selector,
+                                        field_selector=field_selector, conditions=conditions)
+            return result, round((time.perf_counter() - start) * 1000, 1)
+        
+        items = []
+        clusters = {}
+        errors = {}
+        for connection_id in [connection_id for connection_id in connection_ids if connection_id not in known_ids]:
+            connection_ids.remove(connection_id)
+            clusters[connection_id] = {"success": False}
+            errors[connection_id] = "Cluster not connected"
+        
+        if connection_ids:
+            executor = ThreadPoolExecutor(max_workers=min(self.aggregate_concurrency, len(connection_ids)))
+            futures = {executor.submit(query, connection_id): connection_id for connection_id in connection_ids}
+            done, _ = wait(futures, timeout=timeout)
+            # Don't wait for slow clusters, their lists finish in the background
+            executor.shutdown(wait=False)
+            
+            for future, connection_id in futures.items():
+                if future not in done:
+                    future.cancel()
+                    clusters[connection_id] = {"success": False, "timed_out": True}
+                    errors[connection_id] = f"Timed out after {timeout} seconds"
+                    continue
+                result, duration_ms = future.result()
+                if not result["success"]:
+                    clusters[connection_id] = {"success": False, "duration_ms": duration_ms}
+                    errors[connection_id] = result["message"]
+                    continue
+                clusters[connection_id] = {"success": True, "count": len(result["items"]), "duration_ms": duration_ms}
+                items.extend(dict(item, connection_id=connection_id) for item in result["items"])
+        
+        items.sort(key=lambda item: (item["connection_id"], item.get("namespace") or "", item["name"]))
+        if fields:
+            items = [self._project(item, ["connection_id"] + list(fields)) for item in items]
+        return {
+            "success": True,
+            "resource_type": resource_type,
+            "count": len(items),
+            "items": items,
+            "clusters": clusters,
+            "errors": errors,
+            "partial": bool(errors)
+        }
+    
+    async def get_resources_async(self, connection_id, resource_type, namespace=None, label_selector=None, field_selector=None,
+                                  limit=None, continue_token=None, fields=None, conditions=None,
+                                  metrics=False, sort_by=None, top=None):
+        """
+        Async variant of get_resources, used by the ASGI entry point.
+        
+        Answers from a running informer never leave the event loop, and upstream lists go through
+        the kubernetes_asyncio client when it is installed. Work that would block (starting an
+        informer, or listing without kubernetes_asyncio) runs on the loop's default executor.
+        
+        Args:
+            Same as get_resources
+            
+        Returns:
+            dict: Resources data or error message
+        """
+        query = {
+            "namespace": namespace,
+            "label_selector": label_selector,
+            "field_selector": field_selector,
+            "limit": limit,
+            "continue_token": continue_token,
+            "fields": fields,
+            "conditions": conditions,
+            "metrics": metrics,
+            "sort_by": sort_by,
+            "top": top
+        }
+        cluster = self.connected_clusters.get(connection_id)
+        if self.connection_registry is not None:
+            # Registry lookups and rebuilds block
+            cluster = await asyncio.get_running_loop().run_in_executor(None, self._get_cluster, connection_id)
+        list_kwargs = self._list_kwargs(label_selector, field_selector, limit, continue_token)
+        
+        if (cluster is None or resource_type not in self.RESOURCE_LISTERS
+                or self._ranking_error(resource_type, metrics, sort_by or (top and "cpu_millicores"))):
+            # Error responses don't need any I/O
+            return self.get_resources(connection_id, resource_type, **query)
+        
+        if metrics or sort_by in USAGE_FIELDS or (top and not sort_by):
+            # Usage figures come from a blocking metrics.k8s.io list
+            pass
+        elif self.use_informers and not list_kwargs:
+            if resource_type in cluster["informers"]:
+                return self.get_resources(connection_id, resource_type, **query)
+        elif async_client is not None:
+            breaker = self._breaker(connection_id)
+            if not breaker.allow():
+                return self._circuit_open_result(connection_id, breaker)
+            try:
+                logger.info(f"Listing {resource_type} asynchronously with {list_kwargs or 'no options'}...")
+                shared = await self.single_flight.do_async(
+                    self._list_key(connection_id, resource_type, namespace, list_kwargs),
+                    lambda: self._list_formatted_async(connection_id, cluster, resource_type, namespace, list_kwargs)
+                )
+                breaker.record_success()
+                with timed("format", resource_type=resource_type):
+                    result = self._filter_result(dict(shared), conditions)
+                    if sort_by:
+                        result["items"] = self._rank(result["items"], sort_by, top, None)
+                        result["count"] = len(result["items"])
+                    return self._apply_fields(result, fields)
+            except Exception as e:
+                logger.error(f"Error getting resources: {str(e)}")
+                self._record_failure(breaker, e)
+                return {
+                    "success": False,
+                    "message": f"Failed to get resources: {str(e)}"
+                }
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.get_resources, connection_id, resource_type, **query))
+    
+    def _list_key(self, connection_id, resource_type, namespace, list_kwargs):
+        """Single-flight key of an upstream list; namespace is ignored by cluster-scoped types"""
+        if not self.RESOURCE_LISTERS[resource_type][2]:
+            namespace = None
+        return ("list", connection_id, resource_type, namespace, tuple(sorted(list_kwargs.items())))
+    
+    def _list_formatted(self, connection_id, cluster, resource_type, namespace, list_kwargs):
+        """List resources upstream and format them, as shared between single-flight callers"""
+        list_func = self._list_function(cluster["api_client"], resource_type, namespace)
+        with timed("kube_list", resource_type=resource_type):
+            resources = list_raw(list_func, **list_kwargs)
+        with timed("format", resource_type=resource_type):
+            return self._list_result(resources, resource_type)
+    
+    async def _list_formatted_async(self, connection_id, cluster, resource_type, namespace, list_kwargs):
+        with timed("kube_list", resource_type=resource_type):
+            resources = await self._list_raw_async(cluster, resource_type, namespace, list_kwargs)
+        with timed("format", resource_type=resource_type):
+            return self._list_result(resources, resource_type)
+    
+    async def _list_raw_async(self, cluster, resource_type, namespace, list_kwargs):
+        """
+        List resources with the connection's kubernetes_asyncio client, parsing the raw response.
+        
+        Args:
+            cluster (dict): Entry of the connected cluster
+            resource_type: Type of the resource
+            namespace (str): Restrict the list to this namespace if the type is namespaced
+            list_kwargs (dict): Selectors and pagination options of the list call
+            
+        Returns:
+            dict: Parsed list response with "metadata" and "items"
+        """
+        api_class, list_all_method, list_namespaced_method = self.RESOURCE_LISTERS[resource_type]
+        api = getattr(async_client, api_class.__name__)(self._get_async_api_client(cluster))
+        # Total timeout, the async client doesn't take separate connect and read timeouts
+        timeout = int(self.connect_timeout + self.read_timeout)
+        if namespace and list_namespaced_method:
+            response = await getattr(api, list_namespaced_method)(namespace, _preload_content=False,
+                                                                  _request_timeout=timeout, **list_kwargs)
+        else:
+            response = await getattr(api, list_all_method)(_preload_content=False, _request_timeout=timeout, **list_kwargs)
+        try:
+            data = await response.read()
+            if not 200 <= response.status <= 299:
+                raise ApiException(status=response.status, reason=response.reason)
+            return loads(data)
+        finally:
+            response.release()
+    
+    def _get_async_api_client(self, cluster):
+        """
+        Get the kubernetes_asyncio client of a connection, creating it on the running loop on first use.
+        
+        It shares host, CA and bearer token with the connection's synchronous client.
+        
+        Args:
+            cluster (dict): Entry of the connected cluster
+            
+        Returns:
+            kubernetes_asyncio ApiClient
+        """
+        async_api_client = cluster.get("async_api_client")
+        if async_api_client is None:
+            sync_configuration = cluster["api_client"].configuration
+            configuration = async_client.Configuration()
+            configuration.host = sync_configuration.host
+            configuration.ssl_ca_cert = sync_configuration.ssl_ca_cert
+            configuration.verify_ssl = sync_configuration.verify_ssl
+            configuration.connection_pool_maxsize = self.connection_pool_maxsize
+            
+            # The synchronous configuration's hook keeps the cached EKS token fresh
+            def refresh_token(client_configuration):
+                client_configuration.api_key['BearerToken'] = sync_configuration.get_api_key_with_prefix('authorization')
+            configuration.refresh_api_key_hook = refresh_token
+            refresh_token(configuration)
+            
+            async_api_client = async_client.ApiClient(configuration)
+            cluster["async_api_client"] = async_api_client
+            cluster["async_loop"] = asyncio.get_running_loop()
+        return async_api_client
+    
+    def stream_resources(self, connection_id, resource_type, namespace=None, label_selector=None, field_selector=None,
+                         limit=None, continue_token=None, fields=None, conditions=None, metrics=False, sort_by=None, top=None):
+        """
+        Get resources of specified type as a generator of formatted items.
+        
+        Items are formatted one at a time while walking the list page by page, so the whole
+        list is never held in memory. Errors raised by later pages surface from the generator.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            namespace (str, optional): Only return resources in this namespace (ignored for nodes)
+            label_selector (str, optional): Kubernetes label selector
+            field_selector (str, optional): Kubernetes field selector
+            limit (int, optional): Page size of the upstream list calls
+            continue_token (str, optional): Continue token to start from
+            fields (list, optional): Only return these fields of each item
+            conditions (list, optional): (field, operator, value) tuples matched against formatted items
+            metrics, sort_by, top (optional): As for get_resources; ranking keeps at most top items in memory
+            
+        Returns:
+            dict: Success status with an "items" generator, or error message
+        """
+        logger.info(f"Streaming resources of type '{resource_type}' for connection '{connection_id}'")
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            return self._not_connected(connection_id)
+        
+        if resource_type not in self.RESOURCE_LISTERS:
+            logger.warning(f"Unsupported resource type: {resource_type}")
+            return {
+                "success": False,
+                "message": f"Unsupported resource type: {resource_type}"
+            }
+        namespace = self._namespace_filter(resource_type, namespace)
+        
+        if top and not sort_by:
+            sort_by = "cpu_millicores"
+        error = self._ranking_error(resource_type, metrics, sort_by)
+        if error:
+            return {
+                "success": False,
+                "message": error
+            }
+        
+        from_informer = self.use_informers and not (label_selector or field_selector or limit or continue_token)
+        breaker = self._breaker(connection_id)
+        if not (from_informer and resource_type in cluster["informers"]) and not breaker.allow():
+            return self._circuit_open_result(connection_id, breaker)
+        
+        if from_informer:
+            items = self._iter_informer(cluster, resource_type, namespace, conditions)
+        else:
+            items = self._iter_pages(cluster, resource_type, namespace, label_selector, field_selector,
+                                     limit or self.STREAM_PAGE_SIZE, continue_token, breaker)
+            if conditions:
+                items = (item for item in items if self._matches(item, conditions))
+        
+        if metrics or sort_by in USAGE_FIELDS:
+            # Errors are reported as null usage figures, the stream has no room for a metrics_error
+            usage, _ = self._get_usage(connection_id, cluster, resource_type)
+            items = (self._add_usage(item, item, usage, None) for item in items)
+        else:
+            usage = None
+        if sort_by:
+            items = self._iter_ranked(items, sort_by, top, usage)
+        
+        if fields:
+            items = (self._project(item, fields) for item in items)
+        return {
+            "success": True,
+            "resource_type": resource_type,
+            "items": items
+        }
+    
+    def watch_resources(self, connection_id, resource_type, namespace=None, last_event_id=None, heartbeat_interval=15):
+        """
+        Get live changes of a resource type as a generator of events.
+        
+        All consumers of a connection and resource type share the informer's single upstream watch.
+        The first event is a SNAPSHOT of all items; after that ADDED/MODIFIED/DELETED events carry
+        one item each. None is yielded when nothing happened for heartbeat_interval seconds.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            namespace (str, optional): Only return resources in this namespace (ignored for nodes)
+            last_event_id (str, optional): ID of the last event seen, to resume without a new snapshot
+            heartbeat_interval (float, optional): Seconds of inactivity after which None is yielded
+            
+        Returns:
+            dict: Success status with an "events" generator, or error message
+        """
+        logger.info(f"Watching resources of type '{resource_type}' for connection '{connection_id}'")
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            return self._not_connected(connection_id)
+        
+        if resource_type not in self.RESOURCE_LISTERS:
+            logger.warning(f"Unsupported resource type: {resource_type}")
+            return {
+                "success": False,
+                "message": f"Unsupported resource type: {resource_type}"
+            }
+        namespace = self._namespace_filter(resource_type, namespace)
+        
+        if not self.use_informers:
+            return {
+                "success": False,
+                "message": "Live updates require informers to be enabled"
+            }
+        
+        breaker = self._breaker(connection_id)
+        if resource_type not in cluster["informers"] and not breaker.allow():
+            return self._circuit_open_result(connection_id, breaker)
+        
+        try:
+            informer = self._get_informer(cluster, resource_type)
+        except Exception as e:
+            logger.error(f"Error starting {resource_type} informer: {str(e)}")
+            self._record_failure(breaker, e)
+            return {
+                "success": False,
+                "message": f"Error watching resources: {str(e)}"
+            }
+        
+        subscription = informer.subscribe(last_event_id=last_event_id)
+        return {
+            "success": True,
+            "resource_type": resource_type,
+            "events": self._iter_events(subscription, namespace, heartbeat_interval)
+        }
+    
+    def _iter_events(self, subscription, namespace, heartbeat_interval):
+        try:
+            while not subscription.closed:
+                event = subscription.get(timeout=heartbeat_interval)
+                if event is None:
+                    if not subscription.closed:
+                        yield None
+                    continue
+                if event["type"] == "SNAPSHOT":
+                    records = event["items"]
+                    if namespace:
+                        records = [record for record in records if record.get("namespace") == namespace]
+                    yield dict(event, items=[record.to_dict() for record in records])
+                elif not namespace or event["object"].get("namespace") == namespace:
+                    yield dict(event, object=event["object"].to_dict())
+        finally:
+            subscription.close()
+    
+    def _iter_informer(self, cluster, resource_type, namespace, conditions=None):
+        informer = self._get_informer(cluster, resource_type)
+        for record in self._select(informer, namespace, conditions):
+            yield record.to_dict()
+    
+    def _iter_ranked(self, items, sort_by, top, usage):
+        # Ranking consumes the items, keep it lazy so errors surface from the stream like other list errors
+        yield from self._rank(items, sort_by, top, usage)
+    
+    def _iter_pages(self, cluster, resource_type, namespace, label_selector, field_selector, page_size, continue_token,
+                    breaker):
+        list_func = self._list_function(cluster["api_client"], resource_type, namespace)
+        list_kwargs = {"limit": page_size}
+        if label_selector:
+            list_kwargs["label_selector"] = label_selector
+        if field_selector:
+            list_kwargs["field_selector"] = field_selector
+        
+        while True:
+            if continue_token:
+                list_kwargs["_continue"] = continue_token
+            logger.debug(f"Listing page of {resource_type} (limit {page_size})...")
+            try:
+                resources = list_raw(list_func, **list_kwargs)
+            except Exception as e:
+                self._record_failure(breaker, e)
+                raise
+            breaker.record_success()
+            for item in resources['items']:
+                yield self._format_item(item, resource_type)
+            continue_token = resources['metadata'].get('continue')
+            if not continue_token:
+                break
+    
+    def stream_pod_logs(self, connection_id, namespace, name, container=None, follow=False, tail_lines=None,
+                        since_seconds=None, limit_bytes=None, timestamps=False):
+        """
+        Get the log of a pod as a generator of lines.
+        
+        The log is read from the API server one chunk at a time as the consumer asks for lines, so it is
+        never held in memory and a slow client slows down the upstream read instead of buffering. Each
+        connection allows log_streams_per_cluster concurrent streams.
+        
+        A followed log that stays quiet for log_keepalive_interval seconds yields None, for the consumer to
+        write a keep-alive (which fails once the client is gone), and is then reopened from its last line.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            namespace (str): Namespace of the pod
+            name (str): Name of the pod
+            container (str, optional): Container to read, required for pods with several containers
+            follow (bool, optional): Keep streaming new lines until the client disconnects
+            tail_lines (int, optional): Only return the last lines of the log
+            since_seconds (int, optional): Only return lines newer than this many seconds
+            limit_bytes (int, optional): Stop after this many bytes
+            timestamps (bool, optional): Prefix each line with its RFC 3339 timestamp
+            
+        Returns:
+            dict: Success status with a "lines" generator of str (and None keep-alives when following),
+                or error message
+        """
+        logger.info(f"Streaming logs of pod '{namespace}/{name}' for connection '{connection_id}'")
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            return self._not_connected(connection_id)
+        
+        breaker = self._breaker(connection_id)
+        if not breaker.allow():
+            return self._circuit_open_result(connection_id, breaker)
+        
+        semaphore = self._log_semaphore(connection_id)
+        if not semaphore.acquire(blocking=False):
+            logger.warning(f"Log stream limit reached for connection '{connection_id}'")
+            return {
+                "success": False,
+                "message": f"Too many log streams for this cluster (maximum {self.log_streams_per_cluster})",
+                "limit_reached": True
+            }
+        
+        if tail_lines is None and since_seconds is None and limit_bytes is None:
+            tail_lines = self.DEFAULT_LOG_TAIL_LINES
+        log_kwargs = {
+            "follow": follow,
+            # Followed logs are read with timestamps, so a reopened log can skip the lines already sent
+            "timestamps": timestamps or follow,
+            "_preload_content": False,
+            # Reads of a followed log time out after a quiet log_keepalive_interval, then the log is reopened
+            "_request_timeout": (self.connect_timeout, self.log_keepalive_interval) if follow else self.kube_request_timeout
+        }
+        for key, value in (("container", container), ("tail_lines", tail_lines),
+                           ("since_seconds", since_seconds), ("limit_bytes", limit_bytes)):
+            if value is not None:
+                log_kwargs[key] = value
+        
+        try:
+            core_api = client.CoreV1Api(cluster["api_client"])
+            response = core_api.read_namespaced_pod_log(name, namespace, **log_kwargs)
+        except Exception as e:
+            semaphore.release()
+            logger.error(f"Error reading pod logs: {str(e)}")
+            self._record_failure(breaker, e)
+            return {
+                "success": False,
+                "message": f"Failed to read logs: {self._api_error_message(e)}"
+            }
+        
+        breaker.record_success()
+        reopen = None
+        if follow:
+            resume_kwargs = {key: value for key, value in log_kwargs.items() if key not in ("tail_lines", "since_seconds")}
+            
+            def reopen(since_seconds):
+                return core_api.read_namespaced_pod_log(name, namespace, since_seconds=since_seconds, **resume_kwargs)
+        lines = self._iter_log_lines(response, semaphore, reopen, strip_timestamps=follow and not timestamps)
+        # Start the generator so closing it, even before the first line, releases the stream
+        next(lines)
+        return {
+            "success": True,
+            "lines": lines
+        }
+    
+    def _log_semaphore(self, connection_id):
+        with self._log_semaphores_lock:
+            semaphore = self._log_semaphores.get(connection_id)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.log_streams_per_cluster)
+                self._log_semaphores[connection_id] = semaphore
+            return semaphore
+    
+    def _iter_log_lines(self, response, semaphore, reopen=None, strip_timestamps=False):
+        """
+        Lines of a log response, releasing the response and the stream slot when closed.
+        
+        Args:
+            response: urllib3 response of the log request
+            semaphore: Log stream slot of the connection, released at the end
+            reopen (optional): For followed logs read with timestamps, callable taking since_seconds and
+                returning a new response; called after a read timed out
+            strip_timestamps (bool, optional): Remove the timestamps the log was only read with for reopening
+        """
+        try:
+            yield None
+            opened_at = time.time()
+            last_time = None
+            while True:
+                try:
+                    for line in self._read_log_lines(response):
+                        if reopen is not None:
+                            line_time = self._log_line_time(line)
+                            if line_time is not None:
+                                if last_time is not None and line_time <= last_time:
+                                    # Already sent before the log was reopened
+                                    continue
+                                last_time = line_time
+                                if strip_timestamps:
+                                    line = line.partition(" ")[2]
+                        yield line
+                    return
+                except ReadTimeoutError:
+                    if reopen is None:
+                        raise
+                # Quiet log: the consumer writes a keep-alive, and stops here if its client went away
+                yield None
+                response.close()
+                response.release_conn()
+                since = last_time[0] if last_time is not None else opened_at
+                response = reopen(max(1, math.ceil(time.time() - since)) + self.LOG_RESUME_MARGIN)
+        finally:
+            response.close()
+            response.release_conn()
+            semaphore.release()
+    
+    def _read_log_lines(self, response):
+        pending = b""
+        for chunk in response.stream(self.LOG_CHUNK_SIZE, decode_content=True):
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8", errors="replace")
+            if len(pending) > self.MAX_LOG_LINE_SIZE:
+                # Don't buffer a runaway line, send it in pieces
+                yield pending.decode("utf-8", errors="replace")
+                pending = b""
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+    
+    def _log_line_time(self, line):
+        """
+        Time of a log line read with timestamps, e.g. "2024-05-01T10:00:00.123456789Z message".
+        
+        Returns:
+            tuple: (Unix seconds, nanoseconds), or None if the line doesn't start with a timestamp
+        """
+        stamp = line.partition(" ")[0]
+        try:
+            seconds = datetime.strptime(stamp[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+            fraction = stamp[20:-1] if stamp[19:20] == "." else ""
+            if not stamp.endswith("Z") or not (fraction.isdigit() or fraction == ""):
+                return None
+            return int(seconds), int(fraction.ljust(9, "0")[:9])
+        except ValueError:
+            return None
+    
+    def _api_error_message(self, error):
+        """Message of a Kubernetes API error, taken from the Status body when there is one"""
+        if isinstance(error, ApiException) and error.body:
+            try:
+                return json.loads(error.body).get("message") or str(error)
+            except (ValueError, AttributeError):
+                pass
+        return str(error)
+    
+    def _breaker(self, connection_id):
+        """Get the circuit breaker of a connection, creating it on first use"""
+        with self._breakers_lock:
+            breaker = self._breakers.get(connection_id)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    connection_id,
+                    failure_threshold=self.breaker_failure_threshold,
+                    reset_timeout=self.breaker_reset_timeout,
+                    probe=lambda: self._probe_cluster(connection_id)
+                )
+                self._breakers[connection_id] = breaker
+            return breaker
+    
+    def _circuit_stats(self, connection_id):
+        """State of a connection's circuit breaker, or None if no call went to the cluster yet"""
+        breaker = self._breakers.get(connection_id)
+        return breaker.stats() if breaker is not None else None
+    
+    def _close_breaker(self, connection_id):
+        """Forget the circuit breaker of a connection and stop its background probe"""
+        with self._breakers_lock:
+            breaker = self._breakers.pop(connection_id, None)
+        if breaker is not None:
+            breaker.close()
+    
+    def _probe_cluster(self, connection_id):
+        """Breaker probe of a connection, raising an exception while its API server doesn't answer"""
+        cluster = self._get_cluster(connection_id)
+        if cluster is None:
+            # Disconnected, possibly by another worker: stop probing
+            self._close_breaker(connection_id)
+            raise RuntimeError("Cluster not connected")
+        self._probe_api_server(cluster["api_client"])
+    
+    def _probe_api_server(self, api_client):
+        """
+        Check that an API server answers by reading its version, a response of a few hundred bytes.
+        
+        Args:
+            api_client: Kubernetes API client of the connection
+            
+        Returns:
+            dict: Health of a reachable cluster with its latency and Kubernetes version
+        """
+        start = time.perf_counter()
+        version_info = client.VersionApi(api_client).get_code(_request_timeout=self.kube_request_timeout)
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "reachable": True,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "last_seen": now,
+            "last_checked": now,
+            "kubernetes_version": version_info.git_version,
+            # Same form as the EKS version, e.g. "1.29" for major "1" and minor "29+"
+            "version": f"{version_info.major}.{version_info.minor.rstrip('+')}",
+            "error": None
+        }
+    
+    def start_health_monitor(self):
+        """Start re-probing the connected clusters in the background, unless health_check_interval is 0"""
+        if self.health_monitor is not None:
+            self.health_monitor.start()
+    
+    def stop_health_monitor(self):
+        if self.health_monitor is not None:
+            self.health_monitor.stop()
+    
+    def check_health(self, connection_id):
+        """
+        Probe the API server of a connection and refresh its health and cluster info.
+        
+        Failures also count against the connection's circuit breaker, so a cluster that went away
+        fails fast before users hit it.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
+            
+        Returns:
+            dict: Health of the connection, or None if it isn't connected
+        """
+        cluster = self.connected_clusters.get(connection_id)
+        if cluster is None:
+            return None
+        breaker = self._breaker(connection_id)
+        previous = cluster.get("health") or {}
+        try:
+            health = self._probe_api_server(cluster["api_client"])
+        except Exception as e:
+            logger.warning(f"Cluster of connection '{connection_id}' is unreachable: {str(e)}")
+            self._record_failure(breaker, e)
+            health = dict(previous, reachable=False, latency_ms=None,
+                          last_checked=datetime.now(timezone.utc).isoformat(), error=str(e))
+            cluster["cluster_info"]["status"] = "UNREACHABLE"
+        else:
+            breaker.record_success()
+            cluster["cluster_info"]["status"] = cluster.get("eks_status")
+            cluster["cluster_info"]["version"] = health["version"]
+        cluster["health"] = health
+        return health
+    
+    def restore_snapshots(self):
+        """
+        Restore the connections and informer caches saved in the snapshot store, e.g. after a restart.
+        
+        Connections are rebuilt without contacting their clusters, and their informers resume from
+        the saved items: requests are answered at once with "stale": true until the watches catch
+        up from the saved resourceVersions. Connections made with access keys are never saved.
+        
+        With a connection registry nothing is restored here: connections are rebuilt from the
+        registry on first use, and their informers resume from the snapshots as they are started.
+        
+        Returns:
+            list: IDs of the restored connections
+        """
+        if self.snapshot_store is None or self.connection_registry is not None:
+            return []
+        restored = []
+        for connection_id, record in self.snapshot_store.connections().items():
+            if connection_id in self.connected_clusters:
+                continue
+            try:
+                session = self._session_from_auth(record["auth"], record["region"])
+                if session is None:
+                    # Saved by an older version; it can't be restored without the keys
+                    logger.info(f"Connection '{connection_id}' was made with access keys, deleting its snapshots")
+                    self._delete_snapshots(connection_id)
+                    continue
+                self._connect_with_cluster_info(session, record["cluster"], record["cluster_name"], record["region"],
+                                                record["auth"], probe=False)
+                cluster = self.connected_clusters[connection_id]
+                for resource_type in self.snapshot_store.resource_types(connection_id):
+                    if resource_type in self.RESOURCE_LISTERS:
+                        self._get_informer(cluster, resource_type)
+            except Exception as e:
+                logger.error(f"Error restoring connection '{connection_id}': {str(e)}")
+                continue
+            restored.append(connection_id)
+        logger.info(f"Restored {len(restored)} connections from snapshots")
+        return restored
+    
+    def save_snapshots(self):
+        """
+        Save the informer caches whose resourceVersion changed since they were last saved.
+        
+        Returns:
+            int: Number of saved snapshots
+        """
+        if self.snapshot_store is None:
+            return 0
+        saved = 0
+        for connection_id, cluster in list(self.connected_clusters.items()):
+            if not cluster.get("saves_snapshots", True):
+                continue
+            with cluster["informer_lock"]:
+                informers = list(cluster["informers"].items())
+            for resource_type, informer in informers:
+                key = (connection_id, resource_type)
+                if informer.stopped or informer.store.resource_version in (None, self._saved_resource_versions.get(key)):
+                    continue
+                # Items and resourceVersion are read together, so the watch can resume from exactly there
+                items, resource_version = informer.store.snapshot()
+                rows = [(item_key, record.to_row()) for item_key, record in items.items()]
+                try:
+                    self.snapshot_store.save_resources(connection_id, resource_type, resource_version,
+                                                       RECORD_TYPES[resource_type].FIELDS, rows)
+                except Exception as e:
+                    logger.error(f"Error saving {resource_type} snapshot of '{connection_id}': {str(e)}")
+                    continue
+                self._saved_resource_versions[key] = resource_version
+                saved += 1
+        if saved:
+            logger.debug(f"Saved {saved} resource snapshots")
+        return saved
+    
+    def start_snapshot_writer(self):
+        """Save the informer caches every snapshot_interval seconds in the background"""
+        if self.snapshot_store is None or self._snapshot_thread is not None:
+            return
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(target=self._write_snapshots, name="snapshot-writer", daemon=True)
+        self._snapshot_thread.start()
+    
+    def stop_snapshot_writer(self):
+        """Stop the background writer and save the caches one last time, e.g. on shutdown"""
+        self._snapshot_stop.set()
+        thread, self._snapshot_thread = self._snapshot_thread, None
+        if thread is not None:
+            thread.join()
+        self.save_snapshots()
+    
+    def _write_snapshots(self):
+        while not self._snapshot_stop.wait(self.snapshot_interval):
+            try:
+                self.save_snapshots()
+            except Exception as e:
+                logger.error(f"Error saving snapshots: {str(e)}")
+    
+    def _save_connection_snapshot(self, connection_id, record):
+        try:
+            previous = self.snapshot_store.get_connection(connection_id)
+            if previous is not None and previous["cluster"]["endpoint"] != record["cluster"]["endpoint"]:
+                # A new cluster with the same name, the saved resources aren't its own
+                self.snapshot_store.delete(connection_id, resources_only=True)
+            self.snapshot_store.save_connection(connection_id, record)
+        except Exception as e:
+            logger.error(f"Error saving connection snapshot of '{connection_id}': {str(e)}")
+    
+    def _resource_snapshot(self, connection_id, resource_type):
+        """
+        Load the saved informer cache of a connection and resource type.
+        
+        Returns:
+            tuple: Records keyed by store key and their resourceVersion, or None if there is no usable snapshot
+        """
+        if self.snapshot_store is None:
+            return None
+        try:
+            snapshot = self.snapshot_store.load_resources(connection_id, resource_type)
+        except Exception as e:
+            logger.error(f"Error loading {resource_type} snapshot of '{connection_id}': {str(e)}")
+            return None
+        record_type = RECORD_TYPES[resource_type]
+        if snapshot is None or snapshot["fields"] != record_type.FIELDS:
+            # Missing, or saved by a version with other record fields
+            return None
+        items = {key: record_type.from_row(row) for key, row in snapshot["rows"]}
+        self._saved_resource_versions[(connection_id, resource_type)] = snapshot["resource_version"]
+        return items, snapshot["resource_version"]
+    
+    def _delete_snapshots(self, connection_id):
+        for key in [key for key in self._saved_resource_versions if key[0] == connection_id]:
+            self._saved_resource_versions.pop(key, None)
+        try:
+            self.snapshot_store.delete(connection_id)
+        except Exception as e:
+            logger.error(f"Error deleting snapshots of '{connection_id}': {str(e)}")
+    
+    def _record_failure(self, breaker, error):
+        """Count an error against a connection's circuit if it means the cluster is unreachable or failing"""
+        if isinstance(error, ApiException):
+            # Status 0 is a transport error; 4xx errors are about the request, not the cluster
+            failed = not error.status or error.status >= 500
+        else:
+            # Connection, timeout and protocol errors of urllib3 and the sockets below it
+            failed = isinstance(error, (HTTPError, OSError))
+        if failed:
+            breaker.record_failure(error)
+    
+    def _circuit_open_result(self, connection_id, breaker):
+        retry_in = breaker.retry_in() or 0
+        logger.warning(f"Circuit of connection '{connection_id}' is open, failing fast")
+        return {
+            "success": False,
+            "message": f"Cluster unavailable after repeated errors, retrying in {retry_in:.0f}s: {breaker.last_error}",
+            "circuit_open": True,
+            "retry_after": max(1, round(retry_in))
+        }
+    
+    def disconnect(self, connection_id):
+        """
+        Disconnect from a cluster.
+        
+        Args:
+            connection_id (str): ID of the connected cluster
             
-            elif resource_type == "nodes":
-                conditions = {cond.type: cond.status for cond in item.status.conditions}
-                formatted_items.append({
-                    "name": item.metadata.name,
-                    "status": "Ready" if conditions.get("Ready") == "True" else "NotReady",
-                    "roles": [label.split("node-role.kubernetes.io/")[1] for label in item.metadata.labels.keys() if "node-role.kubernetes.io/" in label] if item.metadata.labels else [],
-                    "instance_type": item.metadata.labels.get("node.kubernetes.io/instance-type", "Unknown"),
-                    "zone": item.metadata.labels.get("topology.kubernetes.io/zone", "Unknown"),
-                    "kubelet_version": item.status.node_info.kubelet_version,
-                    "created_at": item.metadata.creation_timestamp.isoformat() if item.metadata.creation_timestamp else None
+        Returns:
+            dict: Disconnection result with success status and message
+        """
+        logger.info(f"Disconnecting from cluster with connection ID '{connection_id}'")
+        record = None
+        if self.connection_registry is not None:
+            record = self.connection_registry.get(connection_id)
+            self.connection_registry.delete(connection_id)
+        cluster = self.connected_clusters.pop(connection_id, None)
+        if cluster is not None:
+            self._close_connection(cluster)
+        self.metrics_cache.invalidate(predicate=lambda key: key[0] == connection_id)
+        self.single_flight.invalidate(predicate=lambda key: key[1] == connection_id)
+        with self._log_semaphores_lock:
+            self._log_semaphores.pop(connection_id, None)
+        self._close_breaker(connection_id)
+        if self.snapshot_store is not None:
+            self._delete_snapshots(connection_id)
+        
+        if cluster is not None or record is not None:
+            # Other workers notice the missing registry record and close their own clients
+            cluster_info = cluster["cluster_info"] if cluster is not None else record["cluster_info"]
+            logger.info(f"Successfully disconnected from cluster '{cluster_info['name']}'")
+            return {
+                "success": True,
+                "message": f"Disconnected from cluster {cluster_info['name']}"
+            }
+        else:
+            logger.warning(f"Connection '{connection_id}' not found")
+            return {
+                "success": False,
+                "message": "Cluster not connected"
+            }
+    
+    def _close_connection(self, cluster):
+        """
+        Stop the background watches of a connection and release its connection pool.
+        
+        Args:
+            cluster (dict): Entry of the connected cluster
+        """
+        with cluster["informer_lock"]:
+            cluster["closed"] = True
+            for informer in cluster["informers"].values():
+                informer.stop()
+            cluster["informers"].clear()
+        try:
+            cluster["api_client"].close()
+        except Exception as e:
+            logger.warning(f"Couldn't close API client: {str(e)}")
+        
+        async_api_client = cluster.get("async_api_client")
+        if async_api_client is not None and cluster["async_loop"].is_running():
+            # The async client belongs to the event loop that created it
+            asyncio.run_coroutine_threadsafe(async_api_client.close(), cluster["async_loop"])
+    
+    def list_connected_clusters(self):
+        """
+        List all connected clusters.
+        
+        Returns:
+            list: List of connected clusters with their information, health (latency, last seen) and
+                circuit breaker state (None until this worker called the cluster)
+        """
+        if self.connection_registry is not None:
+            records = self.connection_registry.list()
+            logger.info(f"Listing connected clusters. {len(records)} clusters in the connection registry")
+            clusters = []
+            for conn_id, record in records.items():
+                # Connections of this worker have refreshed cluster info and health
+                local = self.connected_clusters.get(conn_id)
+                clusters.append({
+                    "connection_id": conn_id,
+                    "cluster_info": local["cluster_info"] if local is not None else record["cluster_info"],
+                    "health": local.get("health") if local is not None else None,
+                    "circuit": self._circuit_stats(conn_id)
                 })
+            return clusters
+        
+        logger.info(f"Listing connected clusters. Currently connected to {len(self.connected_clusters)} clusters")
+        return [
+            {
+                "connection_id": conn_id,
+                "cluster_info": cluster_data["cluster_info"],
+                "health": cluster_data.get("health"),
+                "circuit": self._circuit_stats(conn_id)
+            }
+            for conn_id, cluster_data in self.connected_clusters.items()
+        ]
+    
+    def _generate_kubeconfig(self, cluster_info, token):
+        """
+        Generate a kubeconfig for connecting to the EKS cluster.
+        
+        Args:
+            cluster_info: EKS cluster info
+            token (str): EKS bearer token
+            
+        Returns:
+            dict: Kubeconfig data
+        """
+        cluster_name = cluster_info['name']
+        cluster_endpoint = cluster_info['endpoint']
+        cluster_ca = cluster_info['certificateAuthority']['data']
+        cluster_arn = cluster_info['arn']
+        region = cluster_arn.split(':')[3]
+        
+        logger.info(f"Generating kubeconfig for cluster '{cluster_name}' in region '{region}'")
+        
+        # Create a kubeconfig
+        kubeconfig = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "current-context": cluster_name,
+            "clusters": [
+                {
+                    "name": cluster_name,
+                    "cluster": {
+                        "server": cluster_endpoint,
+                        "certificate-authority-data": cluster_ca
+                    }
+                }
+            ],
+            "contexts": [
+                {
+                    "name": cluster_name,
+                    "context": {
+                        "cluster": cluster_name,
+                        "user": "aws"
+                    }
+                }
+            ],
+            "users": [
+                {
+                    "name": "aws",
+                    "user": {
+                        "token": token
+                    }
+                }
+            ]
+        }
+        
+        return kubeconfig
+    
+    def _list_function(self, api_client, resource_type, namespace=None):
+        """
+        Get the Kubernetes list function for a resource type.
+        
+        Args:
+            api_client: Kubernetes API client of the connection
+            resource_type: Type of the resource
+            namespace (str, optional): Restrict the list to this namespace if the type is namespaced
+            
+        Returns:
+            callable: List method of the matching API class, with the connection's request timeout
+                (watches pass their own)
+        """
+        api_class, list_all_method, list_namespaced_method = self.RESOURCE_LISTERS[resource_type]
+        api = api_class(api_client)
+        if namespace and list_namespaced_method:
+            return functools.partial(getattr(api, list_namespaced_method), namespace,
+                                     _request_timeout=self.kube_request_timeout)
+        return functools.partial(getattr(api, list_all_method), _request_timeout=self.kube_request_timeout)
+    
+    def _get_informer(self, cluster, resource_type):
+        """
+        Get the informer of a connection for a resource type, starting it on first use.
+        
+        Args:
+            cluster (dict): Entry of the connected cluster
+            resource_type: Type of the resource
+            
+        Returns:
+            ResourceInformer: Started informer
+        """
+        with cluster["informer_lock"]:
+            informer = cluster["informers"].get(resource_type)
+            if informer is not None:
+                return informer
+            start_lock = cluster.setdefault("informer_start_locks", {}).setdefault(resource_type, threading.Lock())
+        
+        # Only starts of the same type wait for each other, so different types list in parallel
+        with start_lock:
+            with cluster["informer_lock"]:
+                informer = cluster["informers"].get(resource_type)
+                if informer is not None:
+                    return informer
+            
+            logger.info(f"Starting {resource_type} informer for cluster '{cluster['cluster_info']['name']}'")
+            informer = ResourceInformer(
+                self._list_function(cluster["api_client"], resource_type),
+                lambda item: self._format_record(item, resource_type),
+                resource_type,
+                indexed_fields=self.INDEXED_FIELDS
+            )
+            connection_id = f"{cluster['cluster_info']['region']}_{cluster['cluster_info']['name']}"
+            snapshot = self._resource_snapshot(connection_id, resource_type)
+            if snapshot is not None:
+                # Serve the saved items right away and watch the changes made since they were saved
+                informer.resume(*snapshot)
+            else:
+                # The initial list of the informer is the cold-cache cost of the first request
+                with timed("kube_list", resource_type=resource_type):
+                    informer.start()
+            with cluster["informer_lock"]:
+                if not cluster.get("closed"):
+                    cluster["informers"][resource_type] = informer
+                    return informer
+            # The connection was closed while listing
+            informer.stop()
+            return informer
+    
+    def _format_resources(self, items, resource_type):
+        """
+        Format resources for API response.
+        
+        Args:
+            items: List of resource items
+            resource_type: Type of the resource
+            
+        Returns:
+            dict: Formatted resources
+        """
+        formatted_items = [self._format_item(item, resource_type) for item in items]
+        return self._resources_result(formatted_items, resource_type)
+    
+    def _list_kwargs(self, label_selector=None, field_selector=None, limit=None, continue_token=None):
+        list_kwargs = {}
+        if label_selector:
+            list_kwargs["label_selector"] = label_selector
+        if field_selector:
+            list_kwargs["field_selector"] = field_selector
+        if limit:
+            list_kwargs["limit"] = limit
+        if continue_token:
+            list_kwargs["_continue"] = continue_token
+        return list_kwargs
+    
+    def _list_result(self, resources, resource_type):
+        """
+        Format a raw list response, keeping its continue token.
+        
+        Args:
+            resources (dict): Parsed list response
+            resource_type: Type of the resource
+            
+        Returns:
+            dict: Formatted resources
+        """
+        logger.info(f"Found {len(resources['items'])} {resource_type}")
+        result = self._format_resources(resources['items'], resource_type)
+        result["continue"] = resources['metadata'].get('continue') or None
+        return result
+    
+    def _apply_fields(self, result, fields):
+        if fields and result.get("success"):
+            result["items"] = [self._project(item, fields) for item in result["items"]]
+        return result
+    
+    def _ranking_error(self, resource_type, metrics, sort_by):
+        """Validate the metrics and sort_by options of a resource type, returning an error message or None"""
+        if (metrics or sort_by in USAGE_FIELDS) and resource_type not in self.METRICS_RESOURCE_TYPES:
+            return f"Metrics are only available for {', '.join(self.METRICS_RESOURCE_TYPES)}"
+        if sort_by and sort_by not in USAGE_FIELDS and sort_by not in RECORD_TYPES[resource_type].FIELDS:
+            return f"Unknown sort field for {resource_type}: {sort_by}"
+        return None
+    
+    def _get_usage(self, connection_id, cluster, resource_type):
+        """
+        Get the metrics.k8s.io usage of pods or nodes, cached for metrics_cache_ttl seconds.
+        
+        Returns:
+            tuple: Usage keyed by (namespace, name), and an error message if metrics are unavailable
+        """
+        def load():
+            logger.debug(f"Listing {resource_type} metrics...")
+            custom_api = client.CustomObjectsApi(cluster["api_client"])
+            with timed("metrics_list", resource_type=resource_type):
+                metrics_list = list_raw(custom_api.list_cluster_custom_object, "metrics.k8s.io", "v1beta1", resource_type,
+                                        _request_timeout=self.kube_request_timeout)
+            return usage_index(metrics_list, resource_type)
         
+        try:
+            # Concurrent misses share one metrics list
+            return self.metrics_cache.get_or_load(
+                (connection_id, resource_type),
+                lambda: self.single_flight.do(("metrics", connection_id, resource_type), load)
+            ), None
+        except Exception as e:
+            # Typically metrics-server isn't installed; resources are still returned
+            logger.error(f"Error getting {resource_type} metrics: {str(e)}")
+            return {}, f"Metrics unavailable: {str(e)}"
+    
+    def _add_usage(self, item, source, usage, fields):
+        figures = usage.get((source.get("namespace"), source.get("name"))) or {}
+        for field in USAGE_FIELDS:
+            if fields is None or field in fields:
+                item[field] = figures.get(field)
+        return item
+    
+    def _rank(self, items, sort_by, top, usage):
+        """
+        Order items by a field or usage figure, highest first, keeping only the top ones if requested.
+        
+        heapq.nlargest keeps a heap of top items, so ranking costs O(n log top) instead of a full sort.
+        Items without a value for the field come last.
+        """
+        if sort_by in USAGE_FIELDS:
+            def value(item):
+                return (usage.get((item.get("namespace"), item.get("name"))) or {}).get(sort_by)
+        else:
+            def value(item):
+                return item.get(sort_by)
+        
+        def key(item):
+            item_value = value(item)
+            return (False, 0) if item_value is None else (True, item_value)
+        
+        if top:
+            return heapq.nlargest(top, items, key=key)
+        return sorted(items, key=key, reverse=True)
+    
+    def _namespace_filter(self, resource_type, namespace):
+        """Namespace to filter a resource type by: cluster-scoped types ignore it, like their upstream lists"""
+        return namespace if self.RESOURCE_LISTERS[resource_type][2] is not None else None
+    
+    def _select(self, informer, namespace, conditions):
+        """
+        Get items from an informer, using its indexes for the namespace and equality conditions.
+        
+        Args:
+            informer (ResourceInformer): Informer of the resource type
+            namespace (str): Only return items in this namespace, or None
+            conditions (list): (field, operator, value) tuples, or None
+            
+        Returns:
+            list: Matching formatted items
+        """
+        indexed = {}
+        remaining = []
+        for condition in conditions or ():
+            field, operator, value = condition
+            if operator == "=" and field in self.INDEXED_FIELDS and field not in indexed:
+                indexed[field] = value
+            else:
+                remaining.append(condition)
+        if not indexed:
+            items = informer.list(namespace=namespace)
+        else:
+            if namespace:
+                if "namespace" in indexed and indexed["namespace"] != namespace:
+                    return []
+                indexed["namespace"] = namespace
+            items = informer.select(**indexed)
+        if remaining:
+            items = [item for item in items if self._matches(item, remaining)]
+        return items
+    
+    def _filter_result(self, result, conditions):
+        if conditions and result.get("success"):
+            result["items"] = [item for item in result["items"] if self._matches(item, conditions)]
+            result["count"] = len(result["items"])
+        return result
+    
+    def _matches(self, item, conditions):
+        for field, operator, value in conditions or ():
+            equal = str(item.get(field)) == value
+            if equal != (operator == "="):
+                return False
+        return True
+    
+    def _project(self, item, fields):
+        return {field: item[field] for field in fields if field in item}
+    
+    def _resources_result(self, formatted_items, resource_type):
         return {
             "success": True,
             "resource_type": resource_type,
             "count": len(formatted_items),
             "items": formatted_items
-        }
\ No newline at end of file
+        }
+    
+    def _format_item(self, item, resource_type):
+        """
+        Format a single resource item for API response.
+        
+        Args:
+            item (dict): Raw resource item
+            resource_type: Type of the resource
+            
+        Returns:
+            dict: Formatted item
+        """
+        return self._format_record(item, resource_type).to_dict()
+    
+    def _format_record(self, item, resource_type):
+        """
+        Build the compact record of a single resource item, as kept in informer caches.
+        
+        Works on the raw API object (plain dict parsed from the response body) and only
+        reads the fields shown in the UI. Strings repeated across items are interned.
+        
+        Args:
+            item (dict): Raw resource item
+            resource_type: Type of the resource
+            
+        Returns:
+            Record: Record of the resource type (see resource_records)
+        """
+        metadata = item['metadata']
+        spec = item.get('spec') or {}
+        status = item.get('status') or {}
+        record_type = RECORD_TYPES[resource_type]
+        
+        if resource_type == "pods":
+            return record_type(
+                name=metadata['name'],
+                namespace=intern(metadata.get('namespace')),
+                status=intern(status.get('phase')),
+                reason=intern(self._pod_reason(status)),
+                restarts=sum(cont.get('restartCount') or 0 for cont in status.get('containerStatuses') or []),
+                containers=tuple(intern(cont['name']) for cont in spec.get('containers') or []),
+                node=intern(spec.get('nodeName') or "Not scheduled"),
+                owner=intern(self._controller(metadata)),
+                created_at=metadata.get('creationTimestamp')
+            )
+        
+        elif resource_type == "deployments":
+            available_replicas = status.get('availableReplicas') or 0
+            return record_type(
+                name=metadata['name'],
+                namespace=intern(metadata.get('namespace')),
+                replicas=spec.get('replicas'),
+                available_replicas=available_replicas,
+                status="Available" if available_replicas >= (spec.get('replicas') or 0) else "Unavailable",
+                created_at=metadata.get('creationTimestamp')
+            )
+        
+        elif resource_type == "services":
+            return record_type(
+                name=metadata['name'],
+                namespace=intern(metadata.get('namespace')),
+                type=intern(spec.get('type')),
+                cluster_ip=spec.get('clusterIP'),
+                ports=tuple((port.get('port'), port.get('targetPort'), intern(port.get('protocol'))) for port in spec.get('ports') or []),
+                created_at=metadata.get('creationTimestamp')
+            )
+        
+        elif resource_type == "nodes":
+            conditions = {cond['type']: cond['status'] for cond in status.get('conditions') or []}
+            labels = metadata.get('labels') or {}
+            return record_type(
+                name=metadata['name'],
+                status="Ready" if conditions.get("Ready") == "True" else "NotReady",
+                roles=tuple(intern(label.split("node-role.kubernetes.io/")[1]) for label in labels.keys() if "node-role.kubernetes.io/" in label),
+                instance_type=intern(labels.get("node.kubernetes.io/instance-type", "Unknown")),
+                zone=intern(labels.get("topology.kubernetes.io/zone", "Unknown")),
+                kubelet_version=intern((status.get('nodeInfo') or {}).get('kubeletVersion')),
+                created_at=metadata.get('creationTimestamp')
+            )
+    
+    def _controller(self, metadata):
+        """Controller owning the object as "Kind/name" (e.g. "ReplicaSet/web-5d9c8f7b6"), or None"""
+        for owner in metadata.get('ownerReferences') or []:
+            if owner.get('controller'):
+                return f"{owner['kind']}/{owner['name']}"
+        return None
+    
+    def _pod_reason(self, status):
+        """Reason a pod isn't running normally (e.g. CrashLoopBackOff, Evicted), like kubectl's STATUS column"""
+        for container_status in status.get('containerStatuses') or []:
+            state = container_status.get('state') or {}
+            current = state.get('waiting') or state.get('terminated')
+            if current and current.get('reason'):
+                return current['reason']
+        return status.get('reason')
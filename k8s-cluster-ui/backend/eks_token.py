@@ -0,0 +1,99 @@
+import base64
+import logging
+import threading
+import time
+from botocore.credentials import Credentials
+from botocore.signers import RequestSigner
+from telemetry import timed
+
+logger = logging.getLogger(__name__)
+
+# Prefix expected by the EKS (aws-iam-authenticator) token webhook
+TOKEN_PREFIX = 'k8s-aws-v1.'
+# Header binding the presigned request to one cluster
+CLUSTER_NAME_HEADER = 'x-k8s-aws-id'
+# EKS accepts a presigned GetCallerIdentity request for 15 minutes; like `aws eks get-token`
+# we treat tokens as valid for 14 minutes to absorb clock skew
+TOKEN_LIFETIME = 14 * 60
+# Lifetime of the presigned URL itself, as used by `aws eks get-token`
+URL_EXPIRATION = 60
+
+
+class EKSTokenProvider:
+    def __init__(self, session, cluster_name, region, refresh_margin=60, signer=None):
+        """
+        Generate and cache bearer tokens for an EKS cluster from a boto3 session.
+
+        The token is a presigned STS GetCallerIdentity URL built in-process, the same way
+        `aws eks get-token` does it, so no subprocess or AWS CLI is needed.
+
+        Args:
+            session (PooledSession): Session holding the credentials to use
+            cluster_name (str): Name of the EKS cluster
+            region (str): AWS region of the cluster (and of the STS endpoint used)
+            refresh_margin (int, optional): Seconds before expiry at which a new token is generated
+            signer (optional): botocore RequestSigner to use, created from the session for each token if not given
+        """
+        self.session = session
+        self.cluster_name = cluster_name
+        self.region = region
+        self.refresh_margin = refresh_margin
+        self._signer = signer
+        self._service_id = None
+        self._token = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get_token(self):
+        """
+        Get a valid token, generating a new one only when the cached one is about to expire.
+
+        Returns:
+            str: Bearer token for the Kubernetes API server
+        """
+        with self._lock:
+            now = time.time()
+            if self._token is None or now >= self._expires_at - self.refresh_margin:
+                with timed("token"):
+                    self._token = self._generate_token()
+                self._expires_at = now + TOKEN_LIFETIME
+            return self._token
+
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    def _get_signer(self):
+        if self._signer is not None:
+            return self._signer
+        if self._service_id is None:
+            self._service_id = self.session.client('sts', region_name=self.region).meta.service_model.service_id
+        # Built for each token with the session's current credentials, so rotated or refreshed
+        # credentials are picked up instead of the ones the connection was made with
+        frozen = self.session.frozen_credentials()
+        return RequestSigner(
+            self._service_id,
+            self.region,
+            'sts',
+            'v4',
+            Credentials(*frozen) if frozen is not None else None,
+            self.session.events
+        )
+
+    def _generate_token(self):
+        logger.info(f"Generating EKS token for cluster '{self.cluster_name}'")
+        request_dict = {
+            'method': 'GET',
+            'url': f"https://sts.{self.region}.amazonaws.com/?Action=GetCallerIdentity&Version=2011-06-15",
+            'body': {},
+            'headers': {CLUSTER_NAME_HEADER: self.cluster_name},
+            'context': {}
+        }
+        presigned_url = self._get_signer().generate_presigned_url(
+            request_dict,
+            region_name=self.region,
+            expires_in=URL_EXPIRATION,
+            operation_name=''
+        )
+        encoded_url = base64.urlsafe_b64encode(presigned_url.encode('utf-8')).decode('utf-8')
+        return TOKEN_PREFIX + encoded_url.rstrip('=')
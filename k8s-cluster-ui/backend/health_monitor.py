@@ -0,0 +1,91 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    def __init__(self, check, targets, interval=60, jitter=0.2, concurrency=8):
+        """
+        Background thread checking a changing set of targets, each on its own jittered schedule.
+
+        New targets are first checked at a random point of the first interval, and each target is then
+        checked every interval * (1 ± jitter) seconds, so checks of many targets don't line up. Checks
+        run on a small thread pool, so one slow target doesn't delay the others.
+
+        Args:
+            check: Callable taking a target ID; exceptions are logged and don't stop the monitor
+            targets: Callable returning the IDs of the targets to check
+            interval (float, optional): Average seconds between two checks of a target
+            jitter (float, optional): Fraction of the interval the schedule varies by
+            concurrency (int, optional): Maximum checks running at the same time
+        """
+        self.check = check
+        self.targets = targets
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        # target ID -> monotonic time of its next check
+        self._due = {}
+        # Targets whose check is running, so a slow check isn't started twice
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Health monitor started, checking every {self.interval}s")
+
+    def stop(self):
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="health-check") as executor:
+            while not self._stopped.is_set():
+                for target in self._due_targets(time.monotonic()):
+                    executor.submit(self._check, target)
+                self._stopped.wait(self._next_wait(time.monotonic()))
+
+    def _due_targets(self, now):
+        targets = list(self.targets())
+        current = set(targets)
+        due = []
+        with self._lock:
+            for target in list(self._due):
+                if target not in current:
+                    del self._due[target]
+            for target in targets:
+                if target not in self._due:
+                    # Spread the first checks of targets added together
+                    self._due[target] = now + random.uniform(0, self.interval)
+                elif self._due[target] <= now and target not in self._running:
+                    self._running.add(target)
+                    self._due[target] = now + self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+                    due.append(target)
+        return due
+
+    def _next_wait(self, now):
+        with self._lock:
+            next_due = min(self._due.values(), default=now + self.interval)
+        # Wake up at least once per interval to pick up new targets
+        return min(max(next_due - now, 0.1), self.interval)
+
+    def _check(self, target):
+        try:
+            self.check(target)
+        except Exception as e:
+            logger.error(f"Health check of '{target}' failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(target)
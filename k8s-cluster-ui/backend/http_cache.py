@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+
+# Optional brotli support, gzip is used when it isn't installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+# Brotli quality 5 compresses better than gzip -6 at a similar speed
+BROTLI_QUALITY = 5
+
+
+def content_etag(body):
+    """ETag value derived from a response body"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def version_etag(*parts):
+    """ETag value derived from whatever identifies a response's content, e.g. an informer version and the query"""
+    return hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header against an ETag value, using the weak comparison required for GET.
+
+    Args:
+        if_none_match (str): Header value, or None
+        etag (str): Unquoted ETag value
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    return matched_etag(if_none_match, etag) is not None
+
+
+def matched_etag(if_none_match, etag):
+    """
+    The ETag of the client's current copy in the form the client received it, to echo in a 304.
+
+    Args:
+        if_none_match (str): Header value, or None
+        etag (str): Unquoted ETag value
+
+    Returns:
+        str: 'W/"etag"' or '"etag"' as sent by the client, or None if the header doesn't match
+    """
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return f'"{etag}"'
+        weak = candidate.startswith('W/')
+        if candidate[2:].strip('"') == etag if weak else candidate.strip('"') == etag:
+            return f'W/"{etag}"' if weak else f'"{etag}"'
+    return None
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def choose_encoding(accept_encoding):
+    """
+    Pick the content encoding for a response from the Accept-Encoding header.
+
+    Returns:
+        str: "br", "gzip", or None for an uncompressed response
+    """
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        name, _, params = token.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
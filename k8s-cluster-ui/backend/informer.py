@@ -0,0 +1,472 @@
+import logging
+import queue
+import threading
+import uuid
+from collections import deque
+from kubernetes.client.rest import ApiException
+from kube_json import RawWatch, list_raw
+
+logger = logging.getLogger(__name__)
+
+# HTTP status returned by the API server when a watch resourceVersion is too old
+HTTP_STATUS_GONE = 410
+
+
+class ResourceStore:
+    def __init__(self, indexed_fields=()):
+        """
+        Thread-safe store of formatted items with secondary indexes.
+
+        Args:
+            indexed_fields (tuple, optional): Item fields to index; each index maps the string value
+                of the field to the keys of the items having it, and is updated on every change
+        """
+        self._items = {}
+        # Keys in list order, rebuilt by list() after keys were added or removed; updates of
+        # existing items (most watch events) keep it
+        self._ordered_keys = []
+        self._lock = threading.RLock()
+        self.resource_version = None
+        self.indexed_fields = tuple(indexed_fields)
+        self._indices = {field: {} for field in self.indexed_fields}
+
+    def _index(self, key, item):
+        for field in self.indexed_fields:
+            self._indices[field].setdefault(str(item.get(field)), set()).add(key)
+
+    def _unindex(self, key, item):
+        for field in self.indexed_fields:
+            value = str(item.get(field))
+            keys = self._indices[field].get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._indices[field][value]
+
+    def replace(self, items, resource_version):
+        """
+        Replace the whole store content, e.g. after a (re)list.
+
+        Args:
+            items (dict): Formatted items keyed by store key
+            resource_version (str): resourceVersion of the list response
+        """
+        with self._lock:
+            self._items = dict(items)
+            self._ordered_keys = None
+            self._indices = {field: {} for field in self.indexed_fields}
+            for key, item in self._items.items():
+                self._index(key, item)
+            self.resource_version = resource_version
+
+    def snapshot(self):
+        """
+        Items and the resourceVersion they are current at, read together.
+
+        Returns:
+            tuple: (items keyed by store key, resourceVersion)
+        """
+        with self._lock:
+            return dict(self._items), self.resource_version
+
+    def upsert(self, key, item, resource_version=None):
+        """
+        Insert or replace one item.
+
+        Returns:
+            dict: The item previously stored under key, or None
+        """
+        with self._lock:
+            previous = self._items.get(key)
+            if previous is not None:
+                self._unindex(key, previous)
+            else:
+                self._ordered_keys = None
+            self._items[key] = item
+            self._index(key, item)
+            if resource_version:
+                self.resource_version = resource_version
+            return previous
+
+    def delete(self, key, resource_version=None):
+        """
+        Remove one item.
+
+        Returns:
+            dict: The removed item, or None if it was not stored
+        """
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._unindex(key, previous)
+                self._ordered_keys = None
+            if resource_version:
+                self.resource_version = resource_version
+            return previous
+
+    def set_resource_version(self, resource_version):
+        """Move the store to a newer resourceVersion without changing items, e.g. on a watch bookmark"""
+        with self._lock:
+            self.resource_version = resource_version
+
+    def items(self):
+        with self._lock:
+            return dict(self._items)
+
+    def _sorted_keys(self):
+        # Called with the lock held
+        if self._ordered_keys is None:
+            self._ordered_keys = sorted(self._items)
+        return self._ordered_keys
+
+    def list(self, namespace=None):
+        """
+        List stored items ordered by key (namespace/name), like the API server does.
+
+        Args:
+            namespace (str, optional): Only return items in this namespace
+
+        Returns:
+            list: Formatted items
+        """
+        if namespace:
+            if "namespace" in self._indices:
+                return self.select(namespace=namespace)
+            return [item for item in self.list() if item.get("namespace") == namespace]
+        with self._lock:
+            return [self._items[key] for key in self._sorted_keys()]
+
+    def select(self, **values):
+        """
+        List the items whose indexed fields have the given values, ordered by key.
+
+        Only the matching keys are visited, so the cost depends on the result size rather than
+        on the store size.
+
+        Args:
+            **values: Indexed field names and the string values to match
+
+        Returns:
+            list: Formatted items
+        """
+        with self._lock:
+            key_sets = sorted((self._indices[field].get(value, ()) for field, value in values.items()), key=len)
+            if not key_sets:
+                return [self._items[key] for key in self._sorted_keys()]
+            keys = set(key_sets[0]).intersection(*key_sets[1:])
+            return [self._items[key] for key in sorted(keys)]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class Subscription:
+    def __init__(self, informer, max_queued):
+        """
+        Queue of change events delivered by an informer to one consumer.
+
+        Args:
+            informer (ResourceInformer): Informer publishing the events
+            max_queued (int): Events kept for a slow consumer before it is resynced with a snapshot
+        """
+        self.informer = informer
+        self.closed = False
+        self._queue = queue.Queue(max_queued)
+        self._overflowed = False
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event.
+
+        Args:
+            timeout (float, optional): Seconds to wait
+
+        Returns:
+            dict: Next event, a SNAPSHOT event if events were dropped, or None on timeout or close
+        """
+        if self._overflowed:
+            return self.informer._resync(self)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.informer.unsubscribe(self)
+
+    def _offer(self, event):
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Too far behind, drop everything queued and send a snapshot on the next read
+            self._overflowed = True
+
+    def _reset(self):
+        self._overflowed = False
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class ResourceInformer:
+    def __init__(self, list_func, format_func, resource_type, watch_timeout=300, retry_delay=5, event_buffer_size=1000,
+                 indexed_fields=()):
+        """
+        Keep an in-memory store of one resource type current using list + watch.
+
+        Args:
+            list_func: Kubernetes list function (e.g. CoreV1Api.list_pod_for_all_namespaces)
+            format_func: Callable turning one raw API object (dict) into a formatted dict
+            resource_type (str): Type of the resource (pods, deployments, services, nodes)
+            watch_timeout (int, optional): Server-side timeout of a single watch request in seconds
+            retry_delay (int, optional): Seconds to wait before re-watching after an error
+            event_buffer_size (int, optional): Recent change events kept for subscribers resuming with an event ID
+            indexed_fields (tuple, optional): Formatted item fields indexed by the store
+        """
+        self.list_func = list_func
+        self.format_func = format_func
+        self.resource_type = resource_type
+        self.watch_timeout = watch_timeout
+        self.retry_delay = retry_delay
+        self.store = ResourceStore(indexed_fields)
+        # True while the store holds a restored snapshot the API server hasn't confirmed yet
+        self.stale = False
+        self._stop_event = threading.Event()
+        self._watch = None
+        self._thread = None
+        # Event IDs are "<stream_id>:<sequence>"; the stream ID tells resumes from another informer apart
+        self.stream_id = uuid.uuid4().hex[:8]
+        self._sequence = 0
+        self._events = deque(maxlen=event_buffer_size)
+        self._subscribers = set()
+        # Held while changing the store and publishing, so subscribers never miss or repeat a change
+        self._events_lock = threading.Lock()
+
+    @staticmethod
+    def _key(obj):
+        metadata = obj['metadata']
+        if metadata.get('namespace'):
+            return f"{metadata['namespace']}/{metadata['name']}"
+        return metadata['name']
+
+    def start(self):
+        """
+        Run the initial list in the calling thread and start the background watch.
+
+        Errors from the initial list are raised to the caller so they can be reported.
+        """
+        self._relist()
+        self._start_watch()
+
+    def resume(self, items, resource_version):
+        """
+        Start from a saved store content instead of listing, watching changes since its resourceVersion.
+
+        The informer is stale until the watch delivers its first event or ends normally. If the
+        resourceVersion is too old to watch from, the watch relists as usual.
+
+        Args:
+            items (dict): Formatted items keyed by store key
+            resource_version (str): resourceVersion the items are current at
+        """
+        self.store.replace(items, resource_version)
+        self.stale = True
+        logger.info(f"Informer resumed {len(items)} {self.resource_type} at resourceVersion {resource_version}")
+        self._start_watch()
+
+    def _start_watch(self):
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"informer-{self.resource_type}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=1):
+        """
+        Stop the background watch. Events arriving after this call are ignored.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the watch thread to exit
+        """
+        self._stop_event.set()
+        with self._events_lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.closed = True
+            subscription._offer(None)
+        if self._watch is not None:
+            self._watch.stop()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    @property
+    def version(self):
+        """Identifies the store content; changes only when a formatted item changes or the store gets confirmed"""
+        version = self._event_id(self._sequence)
+        return f"{version}:stale" if self.stale else version
+
+    def list(self, namespace=None):
+        return self.store.list(namespace=namespace)
+
+    def select(self, **values):
+        return self.store.select(**values)
+
+    def subscribe(self, last_event_id=None, max_queued=1000):
+        """
+        Subscribe to ADDED/MODIFIED/DELETED events of this informer.
+
+        The first event is a SNAPSHOT with all items, unless last_event_id is still covered by
+        the event buffer, in which case only the events after it are replayed.
+
+        Args:
+            last_event_id (str, optional): ID of the last event the consumer has seen
+            max_queued (int, optional): Events kept for a slow consumer before it is resynced
+
+        Returns:
+            Subscription: Subscription to read events from, close it when done
+        """
+        subscription = Subscription(self, max_queued)
+        with self._events_lock:
+            backlog = self._events_after(last_event_id)
+            if backlog is None:
+                subscription._offer(self._snapshot_event())
+            else:
+                for event in backlog:
+                    subscription._offer(event)
+            if self.stopped:
+                subscription.closed = True
+            else:
+                self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._events_lock:
+            self._subscribers.discard(subscription)
+        subscription.closed = True
+
+    def _events_after(self, last_event_id):
+        """Buffered events after last_event_id, or None if they can't be replayed"""
+        if not last_event_id:
+            return None
+        stream_id, _, sequence = last_event_id.partition(':')
+        if stream_id != self.stream_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        oldest = self._events[0]["id"] if self._events else self._event_id(self._sequence + 1)
+        if sequence < int(oldest.partition(':')[2]) - 1:
+            return None
+        return [event for event in self._events if int(event["id"].partition(':')[2]) > sequence]
+
+    def _event_id(self, sequence):
+        return f"{self.stream_id}:{sequence}"
+
+    def _snapshot_event(self):
+        return {"id": self._event_id(self._sequence), "type": "SNAPSHOT", "items": self.store.list()}
+
+    def _resync(self, subscription):
+        with self._events_lock:
+            subscription._reset()
+            return self._snapshot_event()
+
+    def _publish(self, event_type, item):
+        self._sequence += 1
+        event = {"id": self._event_id(self._sequence), "type": event_type, "object": item}
+        self._events.append(event)
+        for subscription in self._subscribers:
+            subscription._offer(event)
+
+    def _apply(self, event_type, key, item, resource_version):
+        with self._events_lock:
+            if event_type == 'DELETED':
+                previous = self.store.delete(key, resource_version)
+                if previous is not None:
+                    self._publish('DELETED', previous)
+                return
+            previous = self.store.upsert(key, item, resource_version)
+            # Skip changes that don't show up in the formatted item (e.g. managedFields, heartbeats)
+            if previous != item:
+                self._publish('ADDED' if previous is None else 'MODIFIED', item)
+
+    def _relist(self):
+        logger.info(f"Listing {self.resource_type} for informer...")
+        resources = list_raw(self.list_func)
+        items = {self._key(item): self.format_func(item) for item in resources['items']}
+        with self._events_lock:
+            initial = self.store.resource_version is None
+            previous_items = self.store.items()
+            self.store.replace(items, resources['metadata']['resourceVersion'])
+            self.stale = False
+            if not initial:
+                # Publish what changed while we weren't watching; the initial list only seeds snapshots
+                for key in sorted(previous_items.keys() - items.keys()):
+                    self._publish('DELETED', previous_items[key])
+                for key in sorted(items):
+                    if previous_items.get(key) != items[key]:
+                        self._publish('ADDED' if key not in previous_items else 'MODIFIED', items[key])
+        logger.info(f"Informer synced {len(items)} {self.resource_type} at resourceVersion {self.store.resource_version}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._watch_once()
+            except ApiException as e:
+                if self._stop_event.is_set():
+                    break
+                if e.status == HTTP_STATUS_GONE:
+                    # Our resourceVersion is too old, start over from a fresh list
+                    logger.warning(f"Watch on {self.resource_type} expired (410 Gone), relisting...")
+                    try:
+                        self._relist()
+                    except Exception as relist_error:
+                        logger.error(f"Error relisting {self.resource_type}: {str(relist_error)}")
+                        self._stop_event.wait(self.retry_delay)
+                    continue
+                logger.warning(f"Watch on {self.resource_type} failed: {str(e)}")
+                self._stop_event.wait(self.retry_delay)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"Watch on {self.resource_type} failed: {str(e)}")
+                self._stop_event.wait(self.retry_delay)
+        logger.info(f"Informer for {self.resource_type} stopped")
+
+    def _watch_once(self):
+        self._watch = RawWatch()
+        stream = self._watch.stream(
+            self.list_func,
+            resource_version=self.store.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.watch_timeout,
+            _request_timeout=self.watch_timeout + 30
+        )
+        for event in stream:
+            if self._stop_event.is_set():
+                self._watch.stop()
+                return
+
+            event_type = event['type']
+            obj = event['object']
+            resource_version = obj['metadata']['resourceVersion']
+            if event_type == 'BOOKMARK':
+                self.store.set_resource_version(resource_version)
+            elif event_type in ('ADDED', 'MODIFIED'):
+                self._apply(event_type, self._key(obj), self.format_func(obj), resource_version)
+            elif event_type == 'DELETED':
+                self._apply(event_type, self._key(obj), None, resource_version)
+            # The API server accepted our resourceVersion, so a resumed store is current
+            self.stale = False
+        # A watch ending without error had nothing more to report since our resourceVersion
+        self.stale = False
@@ -0,0 +1,46 @@
+from kubernetes import watch
+
+# orjson parses large list responses several times faster than the standard library
+try:
+    import orjson
+
+    def loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+
+    def loads(data):
+        return json.loads(data)
+
+
+def list_raw(list_func, *args, **kwargs):
+    """
+    Call a Kubernetes list function without building client models.
+
+    The response body is parsed straight into plain dicts, skipping the
+    V1PodList/V1Pod/... deserialization of the kubernetes client.
+
+    Args:
+        list_func: Kubernetes list function (e.g. CoreV1Api.list_pod_for_all_namespaces)
+        *args, **kwargs: Arguments passed to the list function
+
+    Returns:
+        dict: Parsed list response with "metadata" and "items"
+    """
+    response = list_func(*args, _preload_content=False, **kwargs)
+    try:
+        return loads(response.data)
+    finally:
+        response.release_conn()
+
+
+class RawWatch(watch.Watch):
+    """Watch that yields events with plain dict objects instead of client models."""
+
+    def get_return_type(self, func):
+        return None
+
+    def unmarshal_event(self, data, return_type):
+        event = loads(data)
+        event['raw_object'] = event['object']
+        return event
@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+# Fields added to pods and nodes from the metrics.k8s.io API
+USAGE_FIELDS = ("cpu_millicores", "memory_bytes")
+
+# Kubernetes quantity suffixes (https://kubernetes.io/docs/reference/kubernetes-api/common-definitions/quantity/)
+CPU_SUFFIXES = {"n": Decimal("1e-6"), "u": Decimal("1e-3"), "m": Decimal(1)}
+MEMORY_SUFFIXES = {
+    "Ki": 1024, "Mi": 1024 ** 2, "Gi": 1024 ** 3, "Ti": 1024 ** 4, "Pi": 1024 ** 5, "Ei": 1024 ** 6,
+    "k": 10 ** 3, "M": 10 ** 6, "G": 10 ** 9, "T": 10 ** 12, "P": 10 ** 15, "E": 10 ** 18
+}
+
+
+def parse_cpu(quantity):
+    """
+    Convert a CPU quantity ("250m", "12345678n", "2") to millicores.
+
+    Args:
+        quantity (str): Kubernetes quantity
+
+    Returns:
+        float: CPU in millicores
+    """
+    suffix = quantity[-1:]
+    if suffix in CPU_SUFFIXES:
+        return float(Decimal(quantity[:-1]) * CPU_SUFFIXES[suffix])
+    return float(Decimal(quantity) * 1000)
+
+
+def parse_memory(quantity):
+    """
+    Convert a memory quantity ("128974848", "129Mi", "1.5Gi") to bytes.
+
+    Args:
+        quantity (str): Kubernetes quantity
+
+    Returns:
+        int: Memory in bytes
+    """
+    for length in (2, 1):
+        suffix = quantity[-length:]
+        if suffix in MEMORY_SUFFIXES:
+            return int(Decimal(quantity[:-length]) * MEMORY_SUFFIXES[suffix])
+    return int(Decimal(quantity))
+
+
+def usage_index(metrics_list, resource_type):
+    """
+    Index a PodMetricsList/NodeMetricsList by (namespace, name), summing container usage for pods.
+
+    Args:
+        metrics_list (dict): Parsed metrics.k8s.io list response
+        resource_type (str): "pods" or "nodes"
+
+    Returns:
+        dict: Usage fields (see USAGE_FIELDS) keyed by (namespace, name); namespace is None for nodes
+    """
+    index = {}
+    for item in metrics_list.get('items') or []:
+        metadata = item['metadata']
+        if resource_type == "pods":
+            usages = [container.get('usage') or {} for container in item.get('containers') or []]
+        else:
+            usages = [item.get('usage') or {}]
+        index[(metadata.get('namespace'), metadata['name'])] = {
+            "cpu_millicores": round(sum(parse_cpu(usage['cpu']) for usage in usages if 'cpu' in usage), 1),
+            "memory_bytes": sum(parse_memory(usage['memory']) for usage in usages if 'memory' in usage)
+        }
+    return index
@@ -0,0 +1,143 @@
+import sys
+
+
+def intern(value):
+    """Intern strings repeated across many items (namespaces, nodes, statuses) so they are stored once"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def format_timestamp(timestamp):
+    """
+    Convert an API timestamp ("2024-01-01T00:00:00Z") to the isoformat() form used in responses.
+
+    Args:
+        timestamp (str): RFC 3339 timestamp in UTC, or None
+
+    Returns:
+        str: Timestamp with a "+00:00" offset, or None
+    """
+    if not timestamp:
+        return None
+    if timestamp.endswith('Z'):
+        return timestamp[:-1] + '+00:00'
+    return timestamp
+
+
+def _thaw(value):
+    # Records hold tuples, never lists, so every list read back from JSON was a tuple
+    if isinstance(value, list):
+        return tuple(_thaw(element) for element in value)
+    return intern(value)
+
+
+class Record:
+    """
+    Compact formatted resource kept in informer caches.
+
+    Subclasses list their fields in FIELDS and __slots__, so a record has no per-item __dict__
+    and no copy of the field names. Timestamps are kept as received and the JSON shape is only
+    built by to_dict() when the record leaves the cache.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+
+    def get(self, field, default=None):
+        if field not in self.FIELDS:
+            return default
+        return getattr(self, field)
+
+    def to_dict(self, fields=None):
+        """
+        Build the response representation of the record.
+
+        Args:
+            fields (list, optional): Only include these fields
+
+        Returns:
+            dict: Formatted item
+        """
+        result = {}
+        for field in self.FIELDS:
+            if fields is None or field in fields:
+                result[field] = self._serialize(field, getattr(self, field))
+        return result
+
+    def _serialize(self, field, value):
+        if field == "created_at":
+            return format_timestamp(value)
+        if isinstance(value, tuple):
+            return list(value)
+        return value
+
+    def to_row(self):
+        """Field values in FIELDS order, the compact form stored in snapshots (see from_row)"""
+        return self._values()
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Rebuild a record from to_row() values that went through JSON.
+
+        Args:
+            row (list): Field values in FIELDS order; lists are turned back into tuples
+
+        Returns:
+            Record: Record of this type
+        """
+        record = cls.__new__(cls)
+        for field, value in zip(cls.FIELDS, row):
+            setattr(record, field, _thaw(value))
+        return record
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class PodRecord(Record):
+    FIELDS = ("name", "namespace", "status", "reason", "restarts", "containers", "node", "owner", "created_at")
+    __slots__ = FIELDS
+
+
+class DeploymentRecord(Record):
+    FIELDS = ("name", "namespace", "replicas", "available_replicas", "status", "created_at")
+    __slots__ = FIELDS
+
+
+class ServiceRecord(Record):
+    FIELDS = ("name", "namespace", "type", "cluster_ip", "ports", "created_at")
+    __slots__ = FIELDS
+
+    def _serialize(self, field, value):
+        if field == "ports":
+            # Ports are kept as (port, target_port, protocol) tuples
+            return [{"port": port, "target_port": target_port, "protocol": protocol}
+                    for port, target_port, protocol in value or ()]
+        return super()._serialize(field, value)
+
+
+class NodeRecord(Record):
+    FIELDS = ("name", "status", "roles", "instance_type", "zone", "kubelet_version", "created_at")
+    __slots__ = FIELDS
+
+
+RECORD_TYPES = {
+    "pods": PodRecord,
+    "deployments": DeploymentRecord,
+    "services": ServiceRecord,
+    "nodes": NodeRecord
+}
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, reuse_window=0):
+        """
+        Coalesce concurrent identical calls into one execution whose result they all share.
+
+        While a call for a key runs, other callers with the same key wait for it instead of running
+        their own. With a reuse window, callers arriving shortly after it finished also get its
+        result. Results are shared, so callers must not modify them.
+
+        Args:
+            reuse_window (float, optional): Seconds a finished call's result is reused, 0 to only
+                share calls that are still running
+        """
+        self.reuse_window = reuse_window
+        self.executions = 0
+        self.coalesced = 0
+        self.reused = 0
+        self._calls = {}
+        self._async_calls = {}
+        # key -> (result, expires_at) of finished calls within the reuse window
+        self._recent = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Run func(), or wait for the running call with the same key and share its result.
+
+        Args:
+            key: Hashable identity of the call
+            func: Callable producing the result; its exceptions are raised to every waiting caller
+                but never reused
+
+        Returns:
+            The result of func()
+        """
+        with self._lock:
+            found, result = self._recent_result(key)
+            if found:
+                return result
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None:
+                    self._remember(key, call.result)
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key, func):
+        """
+        Async variant of do() for coroutines of one event loop.
+
+        Args:
+            key: Hashable identity of the call
+            func: Coroutine function producing the result
+
+        Returns:
+            The result of await func()
+        """
+        with self._lock:
+            found, result = self._recent_result(key)
+            if found:
+                return result
+            future = self._async_calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.executions += 1
+
+        if future is not None:
+            # shield: a cancelled waiter must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._async_calls[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._async_calls.pop(key, None)
+        with self._lock:
+            self._remember(key, result)
+        return result
+
+    def _recent_result(self, key):
+        # Called with the lock held
+        entry = self._recent.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            return False, None
+        self.reused += 1
+        return True, entry[0]
+
+    def _remember(self, key, result):
+        # Called with the lock held
+        if self.reuse_window <= 0:
+            return
+        now = time.monotonic()
+        # Drop expired results so keys that aren't requested again don't pile up
+        for expired in [recent_key for recent_key, (_, expires_at) in self._recent.items() if expires_at <= now]:
+            del self._recent[expired]
+        self._recent[key] = (result, now + self.reuse_window)
+
+    def invalidate(self, predicate=None):
+        """Forget reusable results, all of them or those whose key matches a predicate"""
+        with self._lock:
+            keys = [key for key in self._recent if predicate is None or predicate(key)]
+            for key in keys:
+                del self._recent[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "reuse_window": self.reuse_window,
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "reused": self.reused
+            }
@@ -0,0 +1,146 @@
+import json
+import logging
+import time
+
+from sqlite_util import connect, restrict_permissions
+
+logger = logging.getLogger(__name__)
+
+# Auth fields never written to snapshots; connections made with access keys need reconnecting after a restart
+SECRET_AUTH_FIELDS = ("aws_access_key_id", "aws_secret_access_key", "aws_session_token")
+
+
+class SQLiteSnapshotStore:
+    def __init__(self, path):
+        """
+        On-disk snapshots of connections and informer caches, used to warm up after a restart.
+
+        Connections are stored without credentials. Resource snapshots are the compact record
+        rows of an informer store (see Record.to_row) with the resourceVersion they are current
+        at, so watches resume from there instead of relisting.
+
+        Args:
+            path (str): Path of the database file, created if missing
+        """
+        self.path = path
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS connections ("
+                "connection_id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS resources ("
+                "connection_id TEXT NOT NULL, resource_type TEXT NOT NULL, resource_version TEXT NOT NULL, "
+                "fields TEXT NOT NULL, rows TEXT NOT NULL, saved_at REAL NOT NULL, "
+                "PRIMARY KEY (connection_id, resource_type))"
+            )
+        # Snapshots hold cluster contents, keep them readable by the service user only
+        restrict_permissions(path)
+
+    def _connection(self):
+        return connect(self.path)
+
+    def save_connection(self, connection_id, record):
+        """
+        Save the metadata of a connection, dropping any credentials from its auth.
+
+        Args:
+            connection_id (str): ID of the connection
+            record (dict): Connection record as stored in the connection registry
+        """
+        record = dict(record)
+        record["auth"] = {key: value for key, value in (record.get("auth") or {}).items()
+                          if key not in SECRET_AUTH_FIELDS}
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO connections (connection_id, record, updated_at) VALUES (?, ?, ?)",
+                (connection_id, json.dumps(record), time.time())
+            )
+
+    def get_connection(self, connection_id):
+        row = self._connection().execute(
+            "SELECT record FROM connections WHERE connection_id = ?", (connection_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def connections(self):
+        rows = self._connection().execute("SELECT connection_id, record FROM connections ORDER BY connection_id").fetchall()
+        return {connection_id: json.loads(record) for connection_id, record in rows}
+
+    def save_resources(self, connection_id, resource_type, resource_version, fields, rows):
+        """
+        Replace the snapshot of one resource type of a connection.
+
+        Args:
+            connection_id (str): ID of the connection
+            resource_type (str): Type of the resource
+            resource_version (str): resourceVersion the rows are current at
+            fields (tuple): Record fields, in the order of the row values
+            rows (list): (store key, row values) pairs
+        """
+        payload = json.dumps(rows, separators=(",", ":"))
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO resources "
+                "(connection_id, resource_type, resource_version, fields, rows, saved_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (connection_id, resource_type, resource_version, ",".join(fields), payload, time.time())
+            )
+
+    def load_resources(self, connection_id, resource_type):
+        """
+        Get the snapshot of one resource type of a connection.
+
+        Returns:
+            dict: "resource_version", "fields", "rows" and "saved_at" (Unix time), or None
+        """
+        row = self._connection().execute(
+            "SELECT resource_version, fields, rows, saved_at FROM resources WHERE connection_id = ? AND resource_type = ?",
+            (connection_id, resource_type)
+        ).fetchone()
+        if row is None:
+            return None
+        resource_version, fields, rows, saved_at = row
+        return {
+            "resource_version": resource_version,
+            "fields": tuple(fields.split(",")),
+            "rows": json.loads(rows),
+            "saved_at": saved_at
+        }
+
+    def resource_types(self, connection_id):
+        rows = self._connection().execute(
+            "SELECT resource_type FROM resources WHERE connection_id = ? ORDER BY resource_type", (connection_id,)
+        ).fetchall()
+        return [resource_type for (resource_type,) in rows]
+
+    def delete(self, connection_id, resources_only=False):
+        """
+        Forget the snapshots of a connection.
+
+        Args:
+            connection_id (str): ID of the connection
+            resources_only (bool, optional): Keep the connection metadata
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM resources WHERE connection_id = ?", (connection_id,))
+            if not resources_only:
+                connection.execute("DELETE FROM connections WHERE connection_id = ?", (connection_id,))
+
+
+def create_snapshot_store(url):
+    """
+    Create a snapshot store from a URL.
+
+    Args:
+        url (str): "sqlite:///path/to/snapshots.db"
+
+    Returns:
+        SQLiteSnapshotStore: Snapshot store
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteSnapshotStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported snapshot store: {url}")
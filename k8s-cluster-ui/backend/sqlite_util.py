@@ -0,0 +1,42 @@
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def connect(path):
+    """
+    Connection to a SQLite database for the current thread and process.
+
+    sqlite3 connections can't be shared between threads or forked workers, so one is kept per
+    thread and process and reused by every store opened on the same file. Connections use WAL,
+    which lets readers (requests, other workers) proceed while another connection writes.
+
+    Args:
+        path (str): Path of the database file, created if missing
+
+    Returns:
+        sqlite3.Connection: Connection of the calling thread
+    """
+    if getattr(_local, "pid", None) != os.getpid():
+        # Forked worker: connections inherited from the parent must not be used
+        _local.connections = {}
+        _local.pid = os.getpid()
+    connection = _local.connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        _local.connections[path] = connection
+    return connection
+
+
+def restrict_permissions(path):
+    """Make a database file readable by the service user only, logging rather than failing if it can't be"""
+    try:
+        os.chmod(path, 0o600)
+    except OSError as e:
+        logger.warning(f"Couldn't restrict permissions of {path}: {str(e)}")
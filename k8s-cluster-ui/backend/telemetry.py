@@ -0,0 +1,201 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from a cached answer (~1 ms) to a full list of a large cluster
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Stage timings of the current request, None outside of a timed request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    def __init__(self, name, documentation, label_names, buckets=DEFAULT_BUCKETS):
+        """
+        Thread-safe histogram rendered in the Prometheus text exposition format.
+
+        Args:
+            name (str): Metric name
+            documentation (str): HELP text
+            label_names (tuple): Names of the labels every observation carries
+            buckets (tuple, optional): Increasing bucket upper bounds; +Inf is implied
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Label values -> [per-bucket counts, sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        label_values = tuple(str(labels.get(name) or "") for name in self.label_names)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels):
+        """Number of observations with these label values"""
+        label_values = tuple(str(labels.get(name) or "") for name in self.label_names)
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((label_values, (list(counts), total, count))
+                            for label_values, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values))
+            separator = "," if labels else ""
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels}{separator}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels}{separator}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Labels only take a bounded set of values (route patterns, stages, known resource types); connection IDs
+# aren't labels, so clients can't create new series
+REQUEST_DURATION = Histogram(
+    "k8s_ui_request_duration_seconds",
+    "Time to answer an API request, until the response headers are ready.",
+    ("endpoint", "method", "status", "resource_type")
+)
+STAGE_DURATION = Histogram(
+    "k8s_ui_stage_duration_seconds",
+    "Time spent in one stage of a request, e.g. boto3, token, kube_list, cache, format, serialize or compress.",
+    ("stage", "resource_type")
+)
+METRICS = (REQUEST_DURATION, STAGE_DURATION)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    return "".join(metric.render() for metric in METRICS)
+
+
+@contextmanager
+def timed(stage, resource_type=None):
+    """
+    Time a block as a stage of the current request.
+
+    The duration goes to the stage histogram and, inside a request started with
+    start_request_timings(), to that request's Server-Timing header.
+
+    Args:
+        stage (str): Stage name, e.g. "kube_list"
+        resource_type (str, optional): Resource type the stage works on
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_DURATION.observe(duration, stage=stage, resource_type=resource_type)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, duration))
+
+
+def start_request_timings():
+    """Start collecting the stage timings of a request in the current context"""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings, total=None):
+    """
+    Build a Server-Timing header value, summing repeated stages.
+
+    Args:
+        timings (list): (stage, seconds) tuples
+        total (float, optional): Duration of the whole request in seconds
+
+    Returns:
+        str: Header value, e.g. "kube_list;dur=120.4, format;dur=8.2, total;dur=131.0"
+    """
+    durations = {}
+    for stage, duration in timings:
+        durations[stage] = durations.get(stage, 0.0) + duration
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{stage};dur={duration * 1000:.1f}" for stage, duration in durations.items())
+
+
+# LogRecord attributes that aren't structured fields passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format log records as one JSON object per line, including fields passed through extra="""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level="INFO", log_format="json"):
+    """
+    Send the log of every module to stderr.
+
+    Args:
+        level (str, optional): Initial level, changed at runtime with set_log_level()
+        log_format (str, optional): "json" for one JSON object per line, or "text"
+    """
+    handler = logging.StreamHandler()
+    if log_format == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    set_log_level(level)
+
+
+def set_log_level(level):
+    """
+    Change the log level of the service while it runs.
+
+    Args:
+        level (str): DEBUG, INFO, WARNING, ERROR or CRITICAL
+
+    Returns:
+        str: The new level name
+    """
+    name = str(level).upper()
+    if name not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raise ValueError(f"Invalid log level: {level}")
+    logging.getLogger().setLevel(name)
+    return name
+
+
+def get_log_level():
+    return logging.getLevelName(logging.getLogger().level)
@@ -0,0 +1,107 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+import app as app_module
+
+
+def resources_result(count=200):
+    return {
+        "success": True,
+        "items": [{"name": f"pod-{i}", "namespace": "web", "status": "Running"} for i in range(count)]
+    }
+
+
+class TestApp(unittest.TestCase):
+    def setUp(self):
+        self.connector = mock.Mock()
+        self.connector.connection_ids.return_value = ["c1"]
+        self.connector.resources_version.return_value = "a1:5"
+        self.connector.get_resources.return_value = resources_result()
+        patcher = mock.patch.object(app_module, "persistent_eks_connector", self.connector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app_module.app.test_client()
+
+    def test_unchanged_resources_are_not_modified(self):
+        response = self.client.get('/api/clusters/c1/resources/pods')
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["items"]), 200)
+
+        response = self.client.get('/api/clusters/c1/resources/pods', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+        self.connector.get_resources.assert_called_once()
+
+    def test_not_modified_echoes_the_weak_etag_of_a_compressed_response(self):
+        response = self.client.get('/api/clusters/c1/pods', headers={'Accept-Encoding': 'gzip'})
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))["items"]), 200)
+
+        response = self.client.get('/api/clusters/c1/pods',
+                                   headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_changed_query_is_answered_in_full(self):
+        etag = self.client.get('/api/clusters/c1/resources/pods').headers['ETag']
+
+        response = self.client.get('/api/clusters/c1/resources/pods?namespace=web', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.connector.get_resources.call_count, 2)
+
+    def test_uncached_resources_are_validated_by_content(self):
+        self.connector.resources_version.return_value = None
+        etag = self.client.get('/api/clusters/c1/resources/pods').headers['ETag']
+
+        response = self.client.get('/api/clusters/c1/resources/pods', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_connections_to_make_again_are_a_conflict(self):
+        self.connector.resources_version.return_value = None
+        self.connector.get_resources.return_value = {"success": False, "reconnect_required": True,
+                                                     "message": "Cluster was connected with access keys on another worker"}
+
+        response = self.client.get('/api/clusters/c1/resources/pods')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.get_json()["reconnect_required"])
+
+    def test_metrics_are_exposed_in_the_prometheus_format(self):
+        self.client.get('/api/clusters/c1/resources/pods')
+
+        response = self.client.get('/metrics')
+        text = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE k8s_ui_request_duration_seconds histogram', text)
+        self.assertIn('k8s_ui_request_duration_seconds_count{endpoint="/api/clusters/<connection_id>/resources/<resource_type>",'
+                      'method="GET",status="200",resource_type="pods"}', text)
+
+    def test_changing_the_log_level_needs_the_admin_token(self):
+        with mock.patch.dict(app_module.os.environ, clear=False) as environ:
+            environ.pop('ADMIN_TOKEN', None)
+            response = self.client.put('/api/log-level', json={"level": "DEBUG"})
+        self.assertEqual(response.status_code, 403)
+
+        with mock.patch.dict(app_module.os.environ, {'ADMIN_TOKEN': 'secret'}):
+            response = self.client.put('/api/log-level', json={"level": "DEBUG"},
+                                       headers={'Authorization': 'Bearer wrong'})
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
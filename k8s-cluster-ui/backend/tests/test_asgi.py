@@ -0,0 +1,118 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+import asgi
+import app as app_module
+
+
+def http_scope(path, query_string=b"", headers=None, method="GET"):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": headers or [],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345)
+    }
+
+
+def call(scope, messages=None):
+    """Run the ASGI application for one scope, returning the messages it sent"""
+    incoming = list(messages or [{"type": "http.request", "body": b"", "more_body": False}])
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        # Nothing more from the client
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    return sent
+
+
+def response_of(sent):
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return start["status"], dict(start["headers"]), body
+
+
+class TestAsgi(unittest.TestCase):
+    def setUp(self):
+        self.connector = mock.Mock()
+        self.connector.connection_registry = None
+        self.connector.resources_version.return_value = "a1:5"
+        self.connector.get_resources_async = mock.AsyncMock(return_value={"success": True, "items": [{"name": "web-1"}]})
+        patcher = mock.patch.object(app_module, "persistent_eks_connector", self.connector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_resources_are_served_natively(self):
+        status, headers, body = response_of(call(http_scope("/api/clusters/c1/resources/pods", b"namespace=web")))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["items"], [{"name": "web-1"}])
+        self.assertIn(b"server-timing", headers)
+        self.connector.get_resources_async.assert_awaited_once()
+        self.assertEqual(self.connector.get_resources_async.call_args[0], ("c1", "pods"))
+
+        status, _, body = response_of(call(http_scope("/api/clusters/c1/resources/pods", b"namespace=web",
+                                                      [(b"if-none-match", headers[b"etag"])])))
+
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+        self.connector.get_resources_async.assert_awaited_once()
+
+    def test_open_circuit_sends_retry_after(self):
+        self.connector.resources_version.return_value = None
+        self.connector.get_resources_async.return_value = {"success": False, "circuit_open": True, "retry_after": 12,
+                                                           "message": "Cluster is unavailable"}
+
+        status, headers, body = response_of(call(http_scope("/api/clusters/c1/pods")))
+
+        self.assertEqual(status, 503)
+        self.assertEqual(headers[b"retry-after"], b"12")
+        self.assertFalse(json.loads(body)["success"])
+
+    def test_other_routes_fall_back_to_flask(self):
+        self.connector.list_connected_clusters.return_value = [{"connection_id": "c1"}]
+
+        status, _, body = response_of(call(http_scope("/api/clusters")))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["clusters"], [{"connection_id": "c1"}])
+        self.connector.get_resources_async.assert_not_called()
+
+    def test_streamed_resources_fall_back_to_flask(self):
+        self.connector.stream_resources.return_value = {"success": True, "items": iter([{"name": "web-1"}])}
+
+        status, headers, body = response_of(call(http_scope("/api/clusters/c1/resources/pods", b"stream=1")))
+
+        self.assertEqual(status, 200)
+        self.assertEqual([json.loads(line) for line in body.splitlines()], [{"name": "web-1"}])
+        self.connector.get_resources_async.assert_not_called()
+
+    def test_lifespan_starts_and_shuts_down_the_app(self):
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        with mock.patch.object(asgi, "create_app") as create_app, \
+                mock.patch.object(asgi, "shutdown_app") as shutdown_app:
+            sent = call({"type": "lifespan", "asgi": {"version": "3.0"}}, messages)
+
+        self.assertEqual([message["type"] for message in sent],
+                         ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        create_app.assert_called_once_with()
+        shutdown_app.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
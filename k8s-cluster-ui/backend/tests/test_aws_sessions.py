@@ -0,0 +1,86 @@
+import threading
+import unittest
+from unittest import mock
+from aws_sessions import SessionPool
+
+class TestSessionPool(unittest.TestCase):
+    def test_sessions_and_clients_are_reused(self):
+        """Test that one session per identity and region is created, with each client created once"""
+        pool = SessionPool()
+        factory = mock.Mock(side_effect=lambda: mock.Mock())
+        
+        first = pool.get("profile:ops", "us-east-1", factory)
+        second = pool.get("profile:ops", "us-east-1", factory)
+        other_region = pool.get("profile:ops", "eu-west-1", factory)
+        
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_region)
+        self.assertEqual(factory.call_count, 2)
+        self.assertIs(first.client("eks"), second.client("eks"))
+        first.session.client.assert_called_once_with("eks", region_name=None, config=None)
+        self.assertEqual(pool.stats()["hits"], 1)
+        self.assertEqual(pool.stats()["clients"], 1)
+    
+    def test_session_attributes_are_delegated(self):
+        """Test that a pooled session can be used where a boto3 session is expected"""
+        session = mock.Mock(region_name="us-east-1")
+        pooled = SessionPool().get("default", "us-east-1", lambda: session)
+        
+        self.assertEqual(pooled.region_name, "us-east-1")
+        self.assertIs(pooled.get_credentials(), session.get_credentials.return_value)
+    
+    def test_frozen_credentials(self):
+        """Test that credentials are read once under the session's lock, as a snapshot"""
+        session = mock.Mock()
+        pooled = SessionPool().get("default", "us-east-1", lambda: session)
+        
+        self.assertIs(pooled.frozen_credentials(), session.get_credentials.return_value.get_frozen_credentials.return_value)
+        session.get_credentials.return_value = None
+        self.assertIsNone(pooled.frozen_credentials())
+    
+    @mock.patch("aws_sessions.time.monotonic")
+    def test_idle_sessions_are_evicted(self, now):
+        """Test that sessions unused for idle_ttl seconds are dropped"""
+        pool = SessionPool(idle_ttl=60)
+        now.return_value = 100
+        first = pool.get("default", "us-east-1", mock.Mock)
+        pool.get("profile:ops", "us-east-1", mock.Mock)
+        now.return_value = 150
+        self.assertIs(pool.get("default", "us-east-1", mock.Mock), first)
+        now.return_value = 200
+        pool.get("default", "us-east-1", mock.Mock)
+        
+        self.assertEqual(len(pool), 1)
+    
+    def test_concurrent_callers_share_one_session(self):
+        """Test that concurrent misses on the same key create the session once"""
+        pool = SessionPool()
+        created = []
+        release = threading.Event()
+        
+        def factory():
+            release.wait(1)
+            created.append(object())
+            return mock.Mock()
+        
+        threads = [threading.Thread(target=pool.get, args=("default", "us-east-1", factory)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(created), 1)
+    
+    def test_invalidate_identity(self):
+        """Test that the sessions of one identity can be dropped"""
+        pool = SessionPool()
+        pool.get("keys:abc", "us-east-1", mock.Mock)
+        pool.get("keys:abc", "eu-west-1", mock.Mock)
+        pool.get("default", "us-east-1", mock.Mock)
+        
+        self.assertEqual(pool.invalidate("keys:abc"), 2)
+        self.assertEqual(len(pool), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+from unittest import mock
+from circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens at the failure threshold and a success resets the count"""
+        breaker = CircuitBreaker("demo", failure_threshold=3)
+        breaker.record_failure(OSError("timed out"))
+        breaker.record_failure(OSError("timed out"))
+        breaker.record_success()
+        breaker.record_failure(OSError("timed out"))
+        breaker.record_failure(OSError("timed out"))
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure(OSError("refused"))
+
+        self.assertFalse(breaker.allow())
+        stats = breaker.stats()
+        self.assertEqual(stats["state"], OPEN)
+        self.assertEqual(stats["failures"], 3)
+        self.assertEqual(stats["last_error"], "refused")
+
+    def test_trial_call_without_probe(self):
+        """Test that without a probe one call is let through after the reset timeout"""
+        breaker = CircuitBreaker("demo", failure_threshold=1, reset_timeout=30)
+        with mock.patch("circuit_breaker.time.monotonic", return_value=100.0):
+            breaker.record_failure(OSError("timed out"))
+        with mock.patch("circuit_breaker.time.monotonic", return_value=110.0):
+            self.assertFalse(breaker.allow())
+            self.assertEqual(breaker.retry_in(), 20.0)
+        with mock.patch("circuit_breaker.time.monotonic", return_value=131.0):
+            self.assertTrue(breaker.allow())
+            self.assertEqual(breaker.state, HALF_OPEN)
+            # Only one trial call at a time
+            self.assertFalse(breaker.allow())
+            breaker.record_failure(OSError("timed out"))
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_background_probe_closes_circuit(self):
+        """Test that the probe runs in the background once the circuit opens and closes it on success"""
+        probed = threading.Event()
+        attempts = []
+
+        def probe():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("still down")
+            probed.set()
+
+        breaker = CircuitBreaker("demo", failure_threshold=1, reset_timeout=0.01, probe=probe)
+        breaker.record_failure(OSError("timed out"))
+        self.assertFalse(breaker.allow())
+
+        self.assertTrue(probed.wait(1))
+        while breaker.state != CLOSED:
+            threading.Event().wait(0.01)
+        self.assertEqual(len(attempts), 2)
+        self.assertTrue(breaker.allow())
+        self.assertIsNone(breaker.retry_in())
+
+    def test_close_stops_probing(self):
+        """Test that a closed breaker doesn't probe anymore"""
+        probe = mock.Mock()
+        breaker = CircuitBreaker("demo", failure_threshold=1, reset_timeout=0.01, probe=probe)
+        breaker.record_failure(OSError("timed out"))
+        breaker.close()
+        threading.Event().wait(0.05)
+        probe.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from connection_registry import MemoryConnectionRegistry, SQLiteConnectionRegistry, create_connection_registry
+
+
+class RegistryTests:
+    def test_save_get_and_delete(self):
+        self.registry.save("us-east-1_demo", {"generation": "1", "region": "us-east-1"})
+
+        self.assertEqual(self.registry.get("us-east-1_demo"), {"generation": "1", "region": "us-east-1"})
+        self.assertTrue(self.registry.delete("us-east-1_demo"))
+        self.assertIsNone(self.registry.get("us-east-1_demo"))
+        self.assertFalse(self.registry.delete("us-east-1_demo"))
+
+    def test_save_replaces_record(self):
+        self.registry.save("b", {"generation": "1"})
+        self.registry.save("a", {"generation": "1"})
+        self.registry.save("b", {"generation": "2"})
+
+        self.assertEqual(self.registry.list(), {"a": {"generation": "1"}, "b": {"generation": "2"}})
+
+
+class TestMemoryConnectionRegistry(RegistryTests, unittest.TestCase):
+    def setUp(self):
+        self.registry = MemoryConnectionRegistry()
+
+
+class TestSQLiteConnectionRegistry(RegistryTests, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "connections.db")
+        self.registry = SQLiteConnectionRegistry(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_records_are_shared_between_instances(self):
+        """Each worker process opens its own registry on the same file"""
+        self.registry.save("us-east-1_demo", {"generation": "1"})
+        other_worker = SQLiteConnectionRegistry(self.path)
+
+        self.assertEqual(other_worker.get("us-east-1_demo"), {"generation": "1"})
+        other_worker.delete("us-east-1_demo")
+        self.assertIsNone(self.registry.get("us-east-1_demo"))
+
+    def test_database_is_private(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+
+class TestCreateConnectionRegistry(unittest.TestCase):
+    def test_urls(self):
+        self.assertIsInstance(create_connection_registry("memory"), MemoryConnectionRegistry)
+        with self.assertRaises(ValueError):
+            create_connection_registry("redis://localhost")
+
+
+if __name__ == '__main__':
+    unittest.main()
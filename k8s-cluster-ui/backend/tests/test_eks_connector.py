@@ -1,16 +1,1074 @@
-
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
 import unittest
+from datetime import datetime, timezone
+from unittest import mock
+import boto3
+from botocore.stub import Stubber
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import NewConnectionError, ReadTimeoutError
+from connection_registry import MemoryConnectionRegistry
 from eks_connector import EKSConnector
+from informer import ResourceInformer
+from resource_records import NodeRecord, PodRecord
+from snapshot_store import SQLiteSnapshotStore
 
 class TestEKSConnector(unittest.TestCase):
     def setUp(self):
         self.connector = EKSConnector()
     
+    def add_connection(self, connection_id="us-east-1_demo"):
+        """Register a fake connection without talking to AWS"""
+        self.connector.connected_clusters[connection_id] = {
+            "api_client": mock.Mock(),
+            "informers": {},
+            "informer_lock": threading.Lock(),
+            "cluster_info": {"name": "demo", "region": "us-east-1"}
+        }
+        return connection_id
+    
     def test_initialization(self):
         """Test that the connector initializes correctly"""
         self.assertEqual(len(self.connector.connected_clusters), 0)
+    
+    def version_info(self, minor="29+"):
+        return mock.Mock(major="1", minor=minor, git_version=f"v1.{minor.rstrip('+')}.3-eks-1")
+    
+    def make_kubeconfig(self, server):
+        return {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "current-context": "demo",
+            "clusters": [{"name": "demo", "cluster": {"server": server}}],
+            "contexts": [{"name": "demo", "context": {"cluster": "demo", "user": "demo"}}],
+            "users": [{"name": "demo", "user": {"token": "secret"}}]
+        }
+    
+    def test_api_clients_are_isolated(self):
+        """Test that each connection gets its own configuration without touching the global default"""
+        from kubernetes import client
+        default_host = client.Configuration.get_default_copy().host
+        connector = EKSConnector(connection_pool_maxsize=7)
+        
+        first = connector._create_api_client(self.make_kubeconfig("https://one.example.com"))
+        second = connector._create_api_client(self.make_kubeconfig("https://two.example.com"))
+        
+        self.assertEqual(first.configuration.host, "https://one.example.com")
+        self.assertEqual(second.configuration.host, "https://two.example.com")
+        self.assertEqual(first.configuration.connection_pool_maxsize, 7)
+        self.assertEqual(client.Configuration.get_default_copy().host, default_host)
+    
+    @mock.patch("eks_connector.client.VersionApi")
+    @mock.patch("eks_connector.EKSTokenProvider")
+    def test_connect_uses_native_token(self, token_provider_class, version_api):
+        """Test that connecting authenticates with the in-process token instead of an exec plugin"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        version_api.return_value.get_code.return_value = self.version_info()
+        session = mock.Mock()
+        session.client.return_value.describe_cluster.return_value = {"cluster": {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="},
+            "version": "1.29",
+            "status": "ACTIVE"
+        }}
+        
+        result = self.connector._connect_with_session(session, "demo", "us-east-1")
+        
+        self.assertTrue(result["success"])
+        configuration = self.connector.connected_clusters["us-east-1_demo"]["api_client"].configuration
+        self.assertEqual(configuration.get_api_key_with_prefix("authorization"), "Bearer k8s-aws-v1.token")
+        token_provider_class.assert_called_once_with(session, "demo", "us-east-1")
+        version_api.return_value.get_code.assert_called_once_with(_request_timeout=(5, 30))
+        health = self.connector.list_connected_clusters()[0]["health"]
+        self.assertTrue(health["reachable"])
+        self.assertEqual(health["kubernetes_version"], "v1.29.3-eks-1")
+    
+    @mock.patch("eks_connector.boto3.Session")
+    @mock.patch("eks_connector.client.VersionApi")
+    @mock.patch("eks_connector.EKSTokenProvider")
+    def test_connection_registry_shares_connections_between_workers(self, token_provider_class, version_api, session_class):
+        """Test that a worker rebuilds connections made by another one and drops disconnected ones"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        version_api.return_value.get_code.return_value = self.version_info()
+        session = mock.Mock()
+        session.client.return_value.describe_cluster.return_value = {"cluster": {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="},
+            "version": "1.29",
+            "status": "ACTIVE"
+        }}
+        registry = MemoryConnectionRegistry()
+        worker_a = EKSConnector(connection_registry=registry)
+        worker_b = EKSConnector(connection_registry=registry, registry_check_interval=0)
+        
+        worker_a._connect_with_session(session, "demo", "us-east-1", auth={"type": "profile", "profile_name": "ops"})
+        rebuilt = worker_b._get_cluster("us-east-1_demo")
+        
+        session_class.assert_called_once_with(profile_name="ops", region_name="us-east-1")
+        self.assertEqual(rebuilt["generation"], worker_a.connected_clusters["us-east-1_demo"]["generation"])
+        self.assertEqual([cluster["connection_id"] for cluster in worker_b.list_connected_clusters()], ["us-east-1_demo"])
+        # Listing doesn't create breakers for connections this worker never called
+        self.assertIsNone(worker_b.list_connected_clusters()[0]["circuit"])
+        self.assertEqual(worker_b._breakers, {})
+        self.assertIs(worker_b._get_cluster("us-east-1_demo"), rebuilt)
+        
+        self.assertTrue(worker_a.disconnect("us-east-1_demo")["success"])
+        self.assertIsNone(worker_b._get_cluster("us-east-1_demo"))
+        self.assertEqual(worker_b.connected_clusters, {})
+    
+    def test_connection_registry_is_checked_once_per_interval(self):
+        """Test that a local connection is served without reading the registry until the check interval passed"""
+        registry = mock.Mock()
+        registry.get.return_value = {"generation": "1"}
+        connector = EKSConnector(connection_registry=registry, registry_check_interval=2)
+        connector.connected_clusters["us-east-1_demo"] = cluster = {"generation": "1", "registry_checked_at": 100.0}
+        
+        with mock.patch("eks_connector.time.monotonic", return_value=101.0):
+            self.assertIs(connector._get_cluster("us-east-1_demo"), cluster)
+        registry.get.assert_not_called()
+        
+        with mock.patch("eks_connector.time.monotonic", return_value=103.0):
+            self.assertIs(connector._get_cluster("us-east-1_demo"), cluster)
+        registry.get.assert_called_once_with("us-east-1_demo")
+        self.assertEqual(cluster["registry_checked_at"], 103.0)
+    
+    def test_connection_registry_keeps_access_keys_private(self):
+        """Test that access keys are never stored in the registry"""
+        registry = MemoryConnectionRegistry()
+        connector = EKSConnector(connection_registry=registry)
+        with mock.patch("eks_connector.boto3.Session"), \
+                mock.patch.object(connector, "_connect_with_session") as connect:
+            connector.connect_with_aws_credentials("demo", "us-east-1", "AKIAEXAMPLE", "secret")
+        
+        auth = connect.call_args[0][4]
+        self.assertEqual(auth, {"type": "keys", "identity": connect.call_args[0][3]})
+        self.assertIsNone(connector._session_from_auth(auth, "us-east-1"))
+    
+    @mock.patch("eks_connector.client.VersionApi")
+    @mock.patch("eks_connector.EKSTokenProvider")
+    def test_key_based_connections_ask_other_workers_to_reconnect(self, token_provider_class, version_api):
+        """Test that another worker answers for a key-based connection with reconnect_required"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        version_api.return_value.get_code.return_value = self.version_info()
+        session = mock.Mock()
+        session.client.return_value.describe_cluster.return_value = {"cluster": {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="},
+            "version": "1.29",
+            "status": "ACTIVE"
+        }}
+        registry = MemoryConnectionRegistry()
+        worker_a = EKSConnector(connection_registry=registry)
+        worker_b = EKSConnector(connection_registry=registry, registry_check_interval=0)
+        
+        worker_a._connect_with_session(session, "demo", "us-east-1", auth={"type": "keys", "identity": "abc"})
+        result = worker_b.get_resources("us-east-1_demo", "pods")
+        
+        self.assertFalse(result["success"])
+        self.assertTrue(result["reconnect_required"])
+        self.assertEqual([cluster["connection_id"] for cluster in worker_b.list_connected_clusters()], ["us-east-1_demo"])
+        self.assertNotIn("reconnect_required", worker_b.get_resources("us-east-1_other", "pods"))
+    
+    def make_stubbed_eks_client(self):
+        eks_client = boto3.client("eks", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        return eks_client, Stubber(eks_client)
+    
+    def describe_response(self, name):
+        return {"cluster": {
+            "name": name,
+            "status": "ACTIVE",
+            "version": "1.29",
+            "endpoint": f"https://{name}.example.com",
+            "createdAt": datetime(2024, 5, 1, tzinfo=timezone.utc)
+        }}
+    
+    def list_with_stubbed_client(self, connector, eks_client):
+        with mock.patch("eks_connector.boto3.Session") as session_class:
+            session_class.return_value.client.return_value = eks_client
+            return connector.list_available_clusters("us-east-1", profile_name="default")
+    
+    def test_list_available_clusters_follows_pagination(self):
+        """Test that every list_clusters page is read and all clusters are described in parallel"""
+        eks_client, stubber = self.make_stubbed_eks_client()
+        stubber.add_response("list_clusters", {"clusters": ["a", "b"], "nextToken": "page-2"}, {})
+        stubber.add_response("list_clusters", {"clusters": ["c"]}, {"nextToken": "page-2"})
+        for name in ("a", "b", "c"):
+            stubber.add_response("describe_cluster", self.describe_response(name))
+        connector = EKSConnector(describe_concurrency=3)
+        
+        with stubber:
+            result = self.list_with_stubbed_client(connector, eks_client)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 3)
+        self.assertEqual([cluster["name"] for cluster in result["clusters"]], ["a", "b", "c"])
+        self.assertEqual(result["clusters"][0]["created_at"], "2024-05-01T00:00:00+00:00")
+        stubber.assert_no_pending_responses()
+    
+    def test_repeated_discovery_reuses_session_and_client(self):
+        """Test that discovery calls with the same credentials share one boto3 session and EKS client"""
+        eks_client, stubber = self.make_stubbed_eks_client()
+        stubber.add_response("list_clusters", {"clusters": []}, {})
+        stubber.add_response("list_clusters", {"clusters": []}, {})
+        connector = EKSConnector(discovery_cache_ttl=0)
+        
+        with stubber, mock.patch("eks_connector.boto3.Session") as session_class:
+            session_class.return_value.client.return_value = eks_client
+            connector.list_available_clusters("us-east-1", "AKIAEXAMPLE", "secret")
+            connector.list_available_clusters("us-east-1", "AKIAEXAMPLE", "secret")
+        
+        session_class.assert_called_once()
+        session_class.return_value.client.assert_called_once_with("eks", region_name=None,
+                                                                  config=connector.sessions.client_config)
+        self.assertNotIn("secret", repr(list(connector.sessions._entries)))
+    
+    def test_rejected_credentials_drop_pooled_session(self):
+        """Test that expired credentials don't stay pooled"""
+        eks_client, stubber = self.make_stubbed_eks_client()
+        stubber.add_client_error("list_clusters", "ExpiredTokenException", "The security token included in the request is expired")
+        connector = EKSConnector()
+        
+        with stubber, mock.patch("eks_connector.boto3.Session") as session_class:
+            session_class.return_value.client.return_value = eks_client
+            result = connector.list_available_clusters("us-east-1", profile_name="sso")
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(len(connector.sessions), 0)
+    
+    def test_list_available_clusters_retries_throttling_and_skips_failures(self):
+        """Test that throttled describes are retried and other failures are skipped"""
+        eks_client, stubber = self.make_stubbed_eks_client()
+        stubber.add_response("list_clusters", {"clusters": ["a", "b"]}, {})
+        stubber.add_client_error("describe_cluster", "ThrottlingException", expected_params={"name": "a"})
+        stubber.add_response("describe_cluster", self.describe_response("a"), {"name": "a"})
+        stubber.add_client_error("describe_cluster", "ResourceNotFoundException", expected_params={"name": "b"})
+        connector = EKSConnector(describe_concurrency=1, describe_backoff_base=0)
+        
+        with stubber:
+            result = self.list_with_stubbed_client(connector, eks_client)
+        
+        self.assertEqual([cluster["name"] for cluster in result["clusters"]], ["a"])
+        stubber.assert_no_pending_responses()
+    
+    def test_list_available_clusters_is_cached(self):
+        """Test that repeated discovery is answered from the cache until invalidated"""
+        eks_client, stubber = self.make_stubbed_eks_client()
+        for _ in range(2):
+            stubber.add_response("list_clusters", {"clusters": ["a"]}, {})
+            stubber.add_response("describe_cluster", self.describe_response("a"), {"name": "a"})
+        
+        with stubber:
+            self.list_with_stubbed_client(self.connector, eks_client)
+            cached = self.list_with_stubbed_client(self.connector, eks_client)
+            self.assertEqual(cached["count"], 1)
+            self.assertEqual(self.connector.discovery_cache_stats()["hits"], 2)
+            
+            self.connector.invalidate_discovery_cache(region="us-east-1")
+            self.list_with_stubbed_client(self.connector, eks_client)
+        stubber.assert_no_pending_responses()
+    
+    def test_credential_identity_hides_secrets(self):
+        """Test that cache keys never contain raw credentials and depend on the secret"""
+        identity = self.connector._credential_identity("AKIAEXAMPLE", "secret")
+        self.assertNotIn("AKIAEXAMPLE", identity)
+        self.assertNotIn("secret", identity)
+        self.assertNotEqual(identity, self.connector._credential_identity("AKIAEXAMPLE", "other"))
+        self.assertEqual(self.connector._credential_identity(profile_name="dev"), "profile:dev")
+    
+    def test_discover_clusters_in_all_enabled_regions(self):
+        """Test that enabled regions are scanned with one session and region errors are reported"""
+        ec2_client = boto3.client("ec2", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        ec2_stubber = Stubber(ec2_client)
+        ec2_stubber.add_response("describe_regions", {"Regions": [{"RegionName": "us-west-2"}, {"RegionName": "eu-west-1"}]}, {"AllRegions": False})
+        west_client, west_stubber = self.make_stubbed_eks_client()
+        west_stubber.add_response("list_clusters", {"clusters": ["web"]}, {})
+        west_stubber.add_response("describe_cluster", self.describe_response("web"), {"name": "web"})
+        eu_client, eu_stubber = self.make_stubbed_eks_client()
+        eu_stubber.add_client_error("list_clusters", "AccessDeniedException", "Not allowed")
+        clients = {"ec2": ec2_client, ("eks", "us-west-2"): west_client, ("eks", "eu-west-1"): eu_client}
+        
+        with mock.patch("eks_connector.boto3.Session") as session_class, ec2_stubber, west_stubber, eu_stubber:
+            session = session_class.return_value
+            session.region_name = None
+            session.client.side_effect = lambda service, region_name=None, config=None: clients.get((service, region_name), clients.get(service))
+            result = self.connector.list_clusters_in_regions("all", profile_name="default")
+        
+        session_class.assert_called_once()
+        self.assertTrue(result["success"])
+        self.assertEqual(result["regions"], ["eu-west-1", "us-west-2"])
+        self.assertEqual([(c["region"], c["name"]) for c in result["clusters"]], [("us-west-2", "web")])
+        self.assertIn("AccessDeniedException", result["errors"]["eu-west-1"])
+    
+    def test_get_resources_not_connected(self):
+        """Test that unknown connections are reported"""
+        result = self.connector.get_resources("missing", "pods")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["message"], "Cluster not connected")
+    
+    def test_get_resources_unsupported_type(self):
+        """Test that unsupported resource types are rejected"""
+        connection_id = self.add_connection()
+        result = self.connector.get_resources(connection_id, "secrets")
+        self.assertFalse(result["success"])
+    
+    @mock.patch("eks_connector.ResourceInformer")
+    def test_get_resources_reuses_informer(self, informer_class):
+        """Test that the informer is started once and answers later calls"""
+        informer_class.return_value.list.return_value = [PodRecord(name="a")]
+        connection_id = self.add_connection()
+        
+        first = self.connector.get_resources(connection_id, "pods")
+        second = self.connector.get_resources(connection_id, "pods")
+        
+        self.assertEqual(informer_class.call_count, 1)
+        informer_class.return_value.start.assert_called_once()
+        self.assertEqual(first, second)
+        self.assertEqual(first["count"], 1)
+    
+    @mock.patch("eks_connector.ResourceInformer")
+    def test_disconnect_stops_informers(self, informer_class):
+        """Test that disconnecting stops the background watches"""
+        informer_class.return_value.list.return_value = []
+        connection_id = self.add_connection()
+        self.connector.get_resources(connection_id, "pods")
+        
+        result = self.connector.disconnect(connection_id)
+        
+        self.assertTrue(result["success"])
+        informer_class.return_value.stop.assert_called_once()
+        self.assertNotIn(connection_id, self.connector.connected_clusters)
+
+    @mock.patch("eks_connector.ResourceInformer")
+    def test_get_resources_namespace_and_fields_from_informer(self, informer_class):
+        """Test that namespace filtering and field projection work on the informer cache"""
+        informer_class.return_value.list.return_value = [PodRecord(name="a", namespace="web", status="Running")]
+        connection_id = self.add_connection()
+        
+        result = self.connector.get_resources(connection_id, "pods", namespace="web", fields=["name", "status"])
+        
+        informer_class.return_value.list.assert_called_once_with(namespace="web")
+        self.assertEqual(result["items"], [{"name": "a", "status": "Running"}])
+    
+    def test_get_resources_selectors_go_to_api_server(self):
+        """Test that selectors and pagination are passed to the namespaced list call"""
+        core_api = mock.Mock()
+        body = {"items": [], "metadata": {"continue": "next-page"}}
+        core_api.return_value.list_namespaced_pod.return_value = mock.Mock(data=json.dumps(body).encode())
+        connection_id = self.add_connection()
+        
+        listers = {"pods": (core_api, "list_pod_for_all_namespaces", "list_namespaced_pod")}
+        with mock.patch.dict(EKSConnector.RESOURCE_LISTERS, listers):
+            result = self.connector.get_resources(connection_id, "pods", namespace="web", label_selector="app=web",
+                                                  field_selector="status.phase=Running", limit=100, continue_token="page")
+        
+        core_api.return_value.list_namespaced_pod.assert_called_once_with(
+            "web", label_selector="app=web", field_selector="status.phase=Running", limit=100, _continue="page",
+            _preload_content=False, _request_timeout=(5, 30))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["continue"], "next-page")
+
+    def test_get_resources_async_answers_from_running_informer(self):
+        """Test that cached answers are returned without using the executor"""
+        connection_id = self.add_connection()
+        informer = mock.Mock()
+        self.connector.connected_clusters[connection_id]["informers"]["pods"] = informer
+        
+        calling_threads = []
+        informer.list.side_effect = lambda namespace=None: calling_threads.append(threading.current_thread()) or [PodRecord(name="a")]
+        
+        result = asyncio.run(self.connector.get_resources_async(connection_id, "pods"))
+        
+        self.assertEqual(result["items"], [PodRecord(name="a").to_dict()])
+        self.assertEqual(calling_threads, [threading.current_thread()])
+    
+    def test_get_resources_async_lists_with_async_client(self):
+        """Test that selector queries go through the async client and raw parsing"""
+        connection_id = self.add_connection()
+        response = mock.Mock(status=200)
+        response.read = mock.AsyncMock(return_value=json.dumps({"items": [], "metadata": {"continue": "next"}}).encode())
+        async_module = mock.Mock()
+        async_module.CoreV1Api.return_value.list_pod_for_all_namespaces = mock.AsyncMock(return_value=response)
+        
+        with mock.patch("eks_connector.async_client", async_module), \
+                mock.patch.object(self.connector, "_get_async_api_client"):
+            result = asyncio.run(self.connector.get_resources_async(connection_id, "pods", label_selector="app=web"))
+        
+        async_module.CoreV1Api.return_value.list_pod_for_all_namespaces.assert_awaited_once_with(
+            _preload_content=False, _request_timeout=35, label_selector="app=web")
+        response.release.assert_called_once()
+        self.assertEqual(result["continue"], "next")
+    
+    def test_get_resources_async_falls_back_to_executor(self):
+        """Test that without kubernetes_asyncio the blocking call runs in the executor"""
+        connection_id = self.add_connection()
+        
+        calling_threads = []
+        def get_resources(*args, **kwargs):
+            calling_threads.append(threading.current_thread())
+            return {"success": True, "limit": kwargs["limit"]}
+        
+        with mock.patch("eks_connector.async_client", None), \
+                mock.patch.object(self.connector, "get_resources", side_effect=get_resources):
+            result = asyncio.run(self.connector.get_resources_async(connection_id, "pods", limit=10))
+        
+        self.assertEqual(result, {"success": True, "limit": 10})
+        self.assertNotEqual(calling_threads, [threading.current_thread()])
+    
+    def test_stream_resources_walks_all_pages(self):
+        """Test that streaming follows continue tokens and yields items one by one"""
+        core_api = mock.Mock()
+        page_one = {"items": ["a", "b"], "metadata": {"continue": "token"}}
+        page_two = {"items": ["c"], "metadata": {}}
+        core_api.return_value.list_pod_for_all_namespaces.side_effect = [
+            mock.Mock(data=json.dumps(page).encode()) for page in (page_one, page_two)
+        ]
+        connection_id = self.add_connection()
+        
+        listers = {"pods": (core_api, "list_pod_for_all_namespaces", "list_namespaced_pod")}
+        with mock.patch.dict(EKSConnector.RESOURCE_LISTERS, listers), \
+                mock.patch.object(self.connector, "_format_item", side_effect=lambda item, _: {"name": item, "node": "n1"}):
+            result = self.connector.stream_resources(connection_id, "pods", label_selector="app=web", limit=2, fields=["name"])
+            items = list(result["items"])
+        
+        self.assertEqual(items, [{"name": "a"}, {"name": "b"}, {"name": "c"}])
+        calls = core_api.return_value.list_pod_for_all_namespaces.call_args_list
+        self.assertEqual(calls[0], mock.call(limit=2, label_selector="app=web", _preload_content=False, _request_timeout=(5, 30)))
+        self.assertEqual(calls[1], mock.call(limit=2, label_selector="app=web", _continue="token", _preload_content=False, _request_timeout=(5, 30)))
+    
+    @mock.patch("eks_connector.list_raw")
+    def test_stream_page_errors_count_against_circuit(self, list_raw):
+        """Test that failed and successful pages of a stream are recorded by the connection's circuit breaker"""
+        self.connector = EKSConnector(breaker_failure_threshold=2, breaker_reset_timeout=60)
+        connection_id = self.add_connection()
+        timeout = ReadTimeoutError(None, "/api/v1/pods", "Read timed out.")
+        list_raw.side_effect = [timeout, {"items": [], "metadata": {}}, timeout, timeout]
+        
+        with self.assertRaises(ReadTimeoutError):
+            list(self.connector.stream_resources(connection_id, "pods", limit=10)["items"])
+        list(self.connector.stream_resources(connection_id, "pods", limit=10)["items"])
+        self.assertEqual(self.connector._breakers[connection_id].stats()["failures"], 0)
+        for _ in range(2):
+            with self.assertRaises(ReadTimeoutError):
+                list(self.connector.stream_resources(connection_id, "pods", limit=10)["items"])
+        
+        self.assertTrue(self.connector.stream_resources(connection_id, "pods", limit=10)["circuit_open"])
+        self.connector._breakers[connection_id].close()
+    
+    def test_format_raw_pod(self):
+        """Test that pods are formatted straight from the raw API object"""
+        pod = {
+            "metadata": {"name": "web-0", "namespace": "web", "creationTimestamp": "2024-05-01T10:00:00Z"},
+            "spec": {"containers": [{"name": "app"}, {"name": "sidecar"}], "nodeName": "node-1"},
+            "status": {"phase": "Running"}
+        }
+        self.assertEqual(self.connector._format_item(pod, "pods"), {
+            "name": "web-0",
+            "namespace": "web",
+            "status": "Running",
+            "reason": None,
+            "restarts": 0,
+            "containers": ["app", "sidecar"],
+            "node": "node-1",
+            "owner": None,
+            "created_at": "2024-05-01T10:00:00+00:00"
+        })
+    
+    def test_format_raw_pod_reason(self):
+        """Test that a crash looping container shows up as the pod reason"""
+        pod = {
+            "metadata": {"name": "web-0", "namespace": "web"},
+            "spec": {"containers": [{"name": "app"}, {"name": "sidecar"}]},
+            "status": {"phase": "Running", "containerStatuses": [
+                {"name": "app", "restartCount": 7, "state": {"waiting": {"reason": "CrashLoopBackOff"}}},
+                {"name": "sidecar", "restartCount": 1, "state": {"running": {}}}
+            ]}
+        }
+        formatted = self.connector._format_item(pod, "pods")
+        self.assertEqual(formatted["reason"], "CrashLoopBackOff")
+        self.assertEqual(formatted["restarts"], 8)
+    
+    def test_format_raw_node(self):
+        """Test that node readiness and roles are read from the raw API object"""
+        node = {
+            "metadata": {"name": "node-1", "labels": {"node-role.kubernetes.io/worker": "", "topology.kubernetes.io/zone": "us-east-1a"}},
+            "status": {"conditions": [{"type": "Ready", "status": "True"}], "nodeInfo": {"kubeletVersion": "v1.29.0"}}
+        }
+        formatted = self.connector._format_item(node, "nodes")
+        self.assertEqual(formatted["status"], "Ready")
+        self.assertEqual(formatted["roles"], ["worker"])
+        self.assertEqual(formatted["zone"], "us-east-1a")
+        self.assertEqual(formatted["instance_type"], "Unknown")
+        self.assertEqual(formatted["kubelet_version"], "v1.29.0")
+    
+    def test_get_snapshot_lists_types_concurrently(self):
+        """Test that a snapshot runs the lists in parallel and reports per-type errors"""
+        connection_id = self.add_connection()
+        barrier = threading.Barrier(3, timeout=2)
+        
+        def get_resources(connection_id, resource_type, namespace=None, fields=None, conditions=None):
+            # Only returns once all three lists are running at the same time
+            barrier.wait()
+            if resource_type == "nodes":
+                return {"success": False, "message": "Forbidden"}
+            return {"success": True, "resource_type": resource_type, "items": [], "count": 0}
+        
+        with mock.patch.object(self.connector, "get_resources", side_effect=get_resources):
+            result = self.connector.get_snapshot(connection_id, ["pods", "nodes", "services"])
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(list(result["resources"]), ["pods", "nodes", "services"])
+        self.assertEqual(result["errors"], {"nodes": "Forbidden"})
+        self.assertIn("duration_ms", result["resources"]["pods"])
+    
+    def test_get_snapshot_rejects_unsupported_types(self):
+        """Test that unknown types fail the snapshot before anything is listed"""
+        result = self.connector.get_snapshot(self.add_connection(), ["pods", "secrets"])
+        self.assertFalse(result["success"])
+    
+    @mock.patch("eks_connector.ResourceInformer")
+    def test_informers_of_different_types_start_in_parallel(self, informer_class):
+        """Test that a slow initial list only blocks starts of the same type"""
+        connection_id = self.add_connection()
+        cluster = self.connector.connected_clusters[connection_id]
+        barrier = threading.Barrier(2, timeout=2)
+        informer_class.return_value.start.side_effect = lambda: barrier.wait()
+        
+        threads = [threading.Thread(target=self.connector._get_informer, args=(cluster, resource_type))
+                   for resource_type in ("pods", "nodes")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(3)
+        
+        self.assertEqual(set(cluster["informers"]), {"pods", "nodes"})
+    
+    def test_aggregate_resources_merges_and_filters(self):
+        """Test that aggregate queries tag items with their connection and apply conditions"""
+        first = self.add_connection("us-east-1_a")
+        second = self.add_connection("eu-west-1_b")
+        items = {
+            first: [{"name": "web", "namespace": "default", "reason": "CrashLoopBackOff"}, {"name": "db", "namespace": "default", "reason": None}],
+            second: [{"name": "api", "namespace": "default", "reason": "CrashLoopBackOff"}]
+        }
+        
+        def get_resources(connection_id, resource_type, conditions=None, **kwargs):
+            matched = [item for item in items[connection_id] if self.connector._matches(item, conditions)]
+            return {"success": True, "resource_type": resource_type, "items": matched, "count": len(matched)}
+        
+        with mock.patch.object(self.connector, "get_resources", side_effect=get_resources):
+            result = self.connector.aggregate_resources("pods", conditions=[("reason", "=", "CrashLoopBackOff")], fields=["name"])
+        
+        self.assertEqual(result["items"], [{"connection_id": second, "name": "api"}, {"connection_id": first, "name": "web"}])
+        self.assertEqual(result["clusters"][first]["count"], 1)
+        self.assertFalse(result["partial"])
+    
+    def test_aggregate_resources_returns_partial_results(self):
+        """Test that slow and failing clusters don't fail the aggregate query"""
+        fast = self.add_connection("us-east-1_fast")
+        slow = self.add_connection("us-east-1_slow")
+        release = threading.Event()
+        
+        def get_resources(connection_id, resource_type, **kwargs):
+            if connection_id == slow:
+                release.wait(2)
+            return {"success": True, "resource_type": resource_type, "items": [{"name": "n1", "status": "NotReady"}], "count": 1}
+        
+        try:
+            with mock.patch.object(self.connector, "get_resources", side_effect=get_resources):
+                result = self.connector.aggregate_resources("nodes", [fast, slow, "missing"], timeout=0.2)
+        finally:
+            release.set()
+        
+        self.assertTrue(result["success"])
+        self.assertTrue(result["partial"])
+        self.assertEqual([item["connection_id"] for item in result["items"]], [fast])
+        self.assertTrue(result["clusters"][slow]["timed_out"])
+        self.assertIn("missing", result["errors"])
+    
+    def test_get_resources_uses_informer_indexes(self):
+        """Test that equality conditions on indexed fields are answered from the store indexes"""
+        connection_id = self.add_connection()
+        informer = ResourceInformer(mock.Mock(), lambda item: item, "pods", indexed_fields=EKSConnector.INDEXED_FIELDS)
+        informer.store.replace({
+            "db/a": PodRecord(name="a", namespace="db", node="n1", status="Running", restarts=0),
+            "web/b": PodRecord(name="b", namespace="web", node="n1", status="Running", restarts=3),
+            "web/c": PodRecord(name="c", namespace="web", node="n2", status="Pending", restarts=0)
+        }, "10")
+        self.connector.connected_clusters[connection_id]["informers"]["pods"] = informer
+        
+        with mock.patch.object(informer.store, "list", side_effect=AssertionError("full scan")):
+            on_node = self.connector.get_resources(connection_id, "pods", conditions=[("node", "=", "n1")])
+            in_namespace = self.connector.get_resources(connection_id, "pods", namespace="web",
+                                                        conditions=[("status", "=", "Running"), ("restarts", "!=", "0")])
+        
+        self.assertEqual([item["name"] for item in on_node["items"]], ["a", "b"])
+        self.assertEqual([item["name"] for item in in_namespace["items"]], ["b"])
+    
+    def test_namespace_is_ignored_for_cluster_scoped_types(self):
+        """Test that informer answers of nodes ignore the namespace, like the upstream list does"""
+        connection_id = self.add_connection()
+        informer = ResourceInformer(mock.Mock(), lambda item: item, "nodes", indexed_fields=EKSConnector.INDEXED_FIELDS)
+        informer.store.replace({"n1": NodeRecord(name="n1", status="Ready")}, "10")
+        self.connector.connected_clusters[connection_id]["informers"]["nodes"] = informer
+        
+        listed = self.connector.get_resources(connection_id, "nodes", namespace="default")
+        selected = self.connector.get_resources(connection_id, "nodes", namespace="default",
+                                                conditions=[("status", "=", "Ready")])
+        streamed = list(self.connector.stream_resources(connection_id, "nodes", namespace="default")["items"])
+        snapshot = self.connector.get_snapshot(connection_id, ["nodes"], namespace="default")
+        events = self.connector.watch_resources(connection_id, "nodes", namespace="default")["events"]
+        
+        self.assertEqual([item["name"] for item in listed["items"]], ["n1"])
+        self.assertEqual([item["name"] for item in selected["items"]], ["n1"])
+        self.assertEqual([item["name"] for item in streamed], ["n1"])
+        self.assertEqual(snapshot["resources"]["nodes"]["count"], 1)
+        self.assertEqual([item["name"] for item in next(events)["items"]], ["n1"])
+        events.close()
+    
+    def add_pod_informer(self, connection_id, pods):
+        informer = ResourceInformer(mock.Mock(), lambda item: item, "pods", indexed_fields=EKSConnector.INDEXED_FIELDS)
+        informer.store.replace({f"{pod.namespace}/{pod.name}": pod for pod in pods}, "10")
+        self.connector.connected_clusters[connection_id]["informers"]["pods"] = informer
+        return informer
+    
+    def pod_metrics(self, *pods):
+        return {"items": [
+            {"metadata": {"name": name, "namespace": namespace},
+             "containers": [{"name": "app", "usage": {"cpu": cpu, "memory": memory}}]}
+            for namespace, name, cpu, memory in pods
+        ]}
+    
+    def test_get_resources_merges_metrics_and_ranks_top(self):
+        """Test that pod usage is joined by namespace and name, and top keeps the hungriest pods"""
+        connection_id = self.add_connection()
+        self.add_pod_informer(connection_id, [
+            PodRecord(name="a", namespace="web"),
+            PodRecord(name="b", namespace="web"),
+            PodRecord(name="a", namespace="db"),
+            PodRecord(name="idle", namespace="db")
+        ])
+        metrics = self.pod_metrics(("web", "a", "250m", "64Mi"), ("web", "b", "1500000000n", "32Mi"),
+                                   ("db", "a", "10m", "1Gi"))
+        
+        with mock.patch("eks_connector.list_raw", return_value=metrics) as list_raw:
+            top = self.connector.get_resources(connection_id, "pods", top=2, fields=["name", "cpu_millicores"])
+            by_memory = self.connector.get_resources(connection_id, "pods", sort_by="memory_bytes")
+        
+        self.assertEqual(top["items"], [{"name": "b", "cpu_millicores": 1500.0}, {"name": "a", "cpu_millicores": 250.0}])
+        self.assertEqual([(item["namespace"], item["name"]) for item in by_memory["items"]],
+                         [("db", "a"), ("web", "a"), ("web", "b"), ("db", "idle")])
+        self.assertIsNone(by_memory["items"][-1]["memory_bytes"])
+        # Usage is cached briefly
+        self.assertEqual(list_raw.call_count, 1)
+        self.assertEqual(list_raw.call_args.args[1:], ("metrics.k8s.io", "v1beta1", "pods"))
+    
+    def test_get_resources_without_metrics_server(self):
+        """Test that resources are still returned when metrics.k8s.io is unavailable"""
+        connection_id = self.add_connection()
+        self.add_pod_informer(connection_id, [PodRecord(name="a", namespace="web")])
+        
+        with mock.patch("eks_connector.list_raw", side_effect=Exception("the server could not find the requested resource")):
+            result = self.connector.get_resources(connection_id, "pods", metrics=True)
+        
+        self.assertTrue(result["success"])
+        self.assertIn("Metrics unavailable", result["metrics_error"])
+        self.assertIsNone(result["items"][0]["cpu_millicores"])
+    
+    def test_get_resources_rejects_invalid_ranking(self):
+        """Test that usage is only offered for pods and nodes, and sort fields must exist"""
+        connection_id = self.add_connection()
+        
+        self.assertFalse(self.connector.get_resources(connection_id, "services", metrics=True)["success"])
+        self.assertFalse(self.connector.get_resources(connection_id, "pods", sort_by="colour")["success"])
+    
+    def log_response(self, *chunks):
+        response = mock.Mock()
+        response.stream.return_value = iter(chunks)
+        return response
+    
+    @mock.patch("eks_connector.client.CoreV1Api")
+    def test_stream_pod_logs_splits_chunks_into_lines(self, core_api):
+        """Test that log chunks are turned into lines and the log is bounded by default"""
+        connection_id = self.add_connection()
+        response = self.log_response(b"first li", b"ne\nsecond\nthi", b"rd")
+        core_api.return_value.read_namespaced_pod_log.return_value = response
+        
+        result = self.connector.stream_pod_logs(connection_id, "web", "web-0", container="app")
+        
+        self.assertEqual(list(result["lines"]), ["first line", "second", "third"])
+        core_api.return_value.read_namespaced_pod_log.assert_called_once_with(
+            "web-0", "web", follow=False, timestamps=False, _preload_content=False, _request_timeout=(5, 30),
+            container="app", tail_lines=EKSConnector.DEFAULT_LOG_TAIL_LINES
+        )
+        response.release_conn.assert_called_once()
+    
+    @mock.patch("eks_connector.client.CoreV1Api")
+    def test_stream_pod_logs_limits_concurrent_streams(self, core_api):
+        """Test that each cluster allows a bounded number of log streams, released when they are closed"""
+        connector = EKSConnector(log_streams_per_cluster=2)
+        self.connector = connector
+        connection_id = self.add_connection()
+        core_api.return_value.read_namespaced_pod_log.side_effect = lambda *args, **kwargs: self.log_response(b"line\n")
+        
+        first = connector.stream_pod_logs(connection_id, "web", "web-0", follow=True)
+        second = connector.stream_pod_logs(connection_id, "web", "web-1", follow=True)
+        rejected = connector.stream_pod_logs(connection_id, "web", "web-2", follow=True)
+        # Closing before reading any line frees the slot
+        first["lines"].close()
+        third = connector.stream_pod_logs(connection_id, "web", "web-2", follow=True)
+        
+        self.assertTrue(second["success"])
+        self.assertFalse(rejected["success"])
+        self.assertTrue(rejected["limit_reached"])
+        self.assertTrue(third["success"])
+        first["lines"].close()
+        second["lines"].close()
+        third["lines"].close()
+    
+    def quiet_log_response(self, *chunks):
+        """Log response that times out after its chunks, like a followed log without new lines"""
+        def stream(*args, **kwargs):
+            yield from chunks
+            raise ReadTimeoutError(None, "/api/v1/namespaces/web/pods/web-0/log", "Read timed out.")
+        response = mock.Mock()
+        response.stream.side_effect = stream
+        return response
+    
+    @mock.patch("eks_connector.client.CoreV1Api")
+    def test_abandoned_quiet_log_stream_frees_slot(self, core_api):
+        """Test that a quiet followed log yields a keep-alive, and closing it there frees the stream slot"""
+        connector = EKSConnector(log_streams_per_cluster=1, log_keepalive_interval=10)
+        self.connector = connector
+        connection_id = self.add_connection()
+        response = self.quiet_log_response()
+        core_api.return_value.read_namespaced_pod_log.return_value = response
+        
+        lines = connector.stream_pod_logs(connection_id, "web", "web-0", follow=True)["lines"]
+        self.assertIsNone(next(lines))
+        self.assertTrue(connector.stream_pod_logs(connection_id, "web", "web-1", follow=True)["limit_reached"])
+        # The client went away: writing the keep-alive fails and the server closes the generator
+        lines.close()
+        
+        self.assertTrue(connector._log_semaphore(connection_id).acquire(blocking=False))
+        response.release_conn.assert_called()
+        self.assertEqual(core_api.return_value.read_namespaced_pod_log.call_args[1]["_request_timeout"], (5, 10))
+    
+    @mock.patch("eks_connector.time.time", return_value=1714557630.0)
+    @mock.patch("eks_connector.client.CoreV1Api")
+    def test_quiet_followed_log_resumes_after_last_line(self, core_api, now):
+        """Test that a followed log is reopened after a read timeout without repeating lines"""
+        connection_id = self.add_connection()
+        core_api.return_value.read_namespaced_pod_log.side_effect = [
+            self.quiet_log_response(b"2024-05-01T10:00:00.5Z first\n"),
+            self.log_response(b"2024-05-01T10:00:00.5Z first\n2024-05-01T10:00:20.123456789Z second\n")
+        ]
+        
+        lines = self.connector.stream_pod_logs(connection_id, "web", "web-0", follow=True, tail_lines=10)["lines"]
+        
+        self.assertEqual(list(lines), ["first", None, "second"])
+        first_call, second_call = core_api.return_value.read_namespaced_pod_log.call_args_list
+        self.assertTrue(first_call[1]["timestamps"])
+        self.assertEqual(first_call[1]["tail_lines"], 10)
+        self.assertNotIn("tail_lines", second_call[1])
+        # 30 seconds since the last line, plus the margin for clock skew
+        self.assertEqual(second_call[1]["since_seconds"], 30 + EKSConnector.LOG_RESUME_MARGIN)
+    
+    @mock.patch("eks_connector.client.CoreV1Api")
+    def test_stream_pod_logs_releases_slot_on_error(self, core_api):
+        """Test that a failed log request reports the API message and frees its slot"""
+        from kubernetes.client.rest import ApiException
+        connector = EKSConnector(log_streams_per_cluster=1)
+        self.connector = connector
+        connection_id = self.add_connection()
+        error = ApiException(status=404, reason="Not Found")
+        error.body = json.dumps({"message": 'pods "web-9" not found'})
+        core_api.return_value.read_namespaced_pod_log.side_effect = error
+        
+        result = connector.stream_pod_logs(connection_id, "web", "web-9")
+        
+        self.assertEqual(result["message"], 'Failed to read logs: pods "web-9" not found')
+        self.assertTrue(connector._log_semaphore(connection_id).acquire(blocking=False))
+    
+    @mock.patch("eks_connector.list_raw")
+    def test_concurrent_identical_lists_are_coalesced(self, list_raw):
+        """Test that concurrent identical lists share one upstream call, and callers don't see each other's filters"""
+        self.connector = EKSConnector(use_informers=False)
+        connection_id = self.add_connection()
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_list(*args, **kwargs):
+            started.set()
+            release.wait(1)
+            return {"metadata": {}, "items": [
+                {"metadata": {"name": "a", "namespace": "web"}, "status": {"phase": "Running"}, "spec": {}},
+                {"metadata": {"name": "b", "namespace": "web"}, "status": {"phase": "Pending"}, "spec": {}}
+            ]}
+        
+        list_raw.side_effect = slow_list
+        results = {}
+        
+        def get(name, conditions):
+            results[name] = self.connector.get_resources(connection_id, "pods", label_selector="app=web",
+                                                         conditions=conditions)
+        
+        first = threading.Thread(target=get, args=("all", None))
+        first.start()
+        started.wait(1)
+        second = threading.Thread(target=get, args=("running", [("status", "=", "Running")]))
+        second.start()
+        while self.connector.single_flight_stats()["coalesced"] < 1:
+            threading.Event().wait(0.01)
+        release.set()
+        first.join()
+        second.join()
+        
+        self.assertEqual(list_raw.call_count, 1)
+        self.assertEqual([item["name"] for item in results["all"]["items"]], ["a", "b"])
+        self.assertEqual([item["name"] for item in results["running"]["items"]], ["a"])
+    
+    def test_resources_version_follows_informer_changes(self):
+        """Test that the cached resources version only exists for informer answers and changes with them"""
+        connection_id = self.add_connection()
+        informer = ResourceInformer(mock.Mock(), lambda item: item, "pods")
+        informer.store.replace({"web/a": PodRecord(name="a", namespace="web")}, "10")
+        self.connector.connected_clusters[connection_id]["informers"]["pods"] = informer
+        
+        version = self.connector.resources_version(connection_id, "pods")
+        informer._apply("MODIFIED", "web/a", PodRecord(name="a", namespace="web"), "11")
+        unchanged = self.connector.resources_version(connection_id, "pods")
+        informer._apply("MODIFIED", "web/a", PodRecord(name="a", namespace="web", status="Running"), "12")
+        
+        self.assertEqual(version, unchanged)
+        self.assertNotEqual(version, self.connector.resources_version(connection_id, "pods"))
+        self.assertIsNone(self.connector.resources_version(connection_id, "pods", label_selector="app=web"))
+        self.assertIsNone(self.connector.resources_version(connection_id, "nodes"))
+        self.assertIsNone(self.connector.resources_version(connection_id, "pods", metrics=True))
+    
+    def test_watch_resources_shares_informer_and_filters_namespace(self):
+        """Test that watchers share one informer and only see their namespace"""
+        connection_id = self.add_connection()
+        informer = ResourceInformer(mock.Mock(), lambda item: item, "pods")
+        informer.store.replace({
+            "db/b": PodRecord(name="b", namespace="db"),
+            "web/a": PodRecord(name="a", namespace="web")
+        }, "10")
+        self.connector.connected_clusters[connection_id]["informers"]["pods"] = informer
+        
+        first = self.connector.watch_resources(connection_id, "pods", namespace="web", heartbeat_interval=0.01)
+        second = self.connector.watch_resources(connection_id, "pods")
+        events = first["events"]
+        snapshot = next(events)
+        informer._apply("ADDED", "db/c", PodRecord(name="c", namespace="db"), "11")
+        informer._apply("ADDED", "web/d", PodRecord(name="d", namespace="web"), "12")
+        
+        self.assertTrue(second["success"])
+        self.assertEqual(snapshot["items"], [PodRecord(name="a", namespace="web").to_dict()])
+        self.assertEqual(next(events)["object"]["name"], "d")
+        self.assertIsNone(next(events))
+        self.assertEqual(len(informer._subscribers), 2)
+        events.close()
+        self.assertEqual(len(informer._subscribers), 1)
+    
+    def test_watch_resources_requires_informers(self):
+        """Test that live updates are refused when informers are disabled"""
+        connector = EKSConnector(use_informers=False)
+        connector.connected_clusters = self.connector.connected_clusters
+        result = connector.watch_resources(self.add_connection(), "pods")
+        self.assertFalse(result["success"])
+    
+    def test_stream_resources_not_connected(self):
+        """Test that streaming reports unknown connections before any item is produced"""
+        result = self.connector.stream_resources("missing", "pods")
+        self.assertFalse(result["success"])
+    
+    @mock.patch("eks_connector.list_raw")
+    def test_repeated_cluster_errors_open_circuit(self, list_raw):
+        """Test that unreachable clusters fail fast, client errors don't count and cached answers are still served"""
+        self.connector = EKSConnector(use_informers=False, breaker_failure_threshold=2, breaker_reset_timeout=60)
+        connection_id = self.add_connection()
+        list_raw.side_effect = ApiException(status=403, reason="Forbidden")
+        for _ in range(3):
+            self.connector.get_resources(connection_id, "pods")
+        self.assertEqual(self.connector.list_connected_clusters()[0]["circuit"]["state"], "closed")
+        
+        list_raw.side_effect = ReadTimeoutError(None, "/api/v1/pods", "Read timed out.")
+        self.connector.get_resources(connection_id, "pods")
+        self.connector.get_resources(connection_id, "pods")
+        list_raw.reset_mock()
+        result = self.connector.get_resources(connection_id, "pods")
+        
+        list_raw.assert_not_called()
+        self.assertFalse(result["success"])
+        self.assertTrue(result["circuit_open"])
+        self.assertEqual(result["retry_after"], 60)
+        circuit = self.connector.list_connected_clusters()[0]["circuit"]
+        self.assertEqual(circuit["state"], "open")
+        self.assertIn("Read timed out", circuit["last_error"])
+        self.assertTrue(self.connector.stream_pod_logs(connection_id, "web", "web-0")["circuit_open"])
+        
+        self.connector.disconnect(connection_id)
+        self.assertNotIn(connection_id, self.connector._breakers)
+    
+    @mock.patch("eks_connector.EKSTokenProvider")
+    def test_reconnecting_resets_circuit(self, token_provider_class):
+        """Test that a new connection doesn't inherit the open circuit of the connection it replaces"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        cluster_info = {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="}
+        }
+        self.connector._connect_with_cluster_info(mock.Mock(), cluster_info, "demo", "us-east-1", probe=False)
+        breaker = self.connector._breaker("us-east-1_demo")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(OSError("Connection refused"))
+        
+        self.connector._connect_with_cluster_info(mock.Mock(), cluster_info, "demo", "us-east-1", probe=False)
+        
+        self.assertNotIn("us-east-1_demo", self.connector._breakers)
+        self.assertTrue(breaker._closed)
+        self.assertTrue(self.connector._breaker("us-east-1_demo").allow())
+    
+    @mock.patch("eks_connector.ResourceInformer")
+    def test_open_circuit_still_serves_informer_cache(self, informer_class):
+        """Test that a running informer answers while the cluster's circuit is open"""
+        informer_class.return_value.list.return_value = [PodRecord(name="a")]
+        connection_id = self.add_connection()
+        self.connector.get_resources(connection_id, "pods")
+        breaker = self.connector._breaker(connection_id)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(OSError("Connection refused"))
+        
+        self.assertTrue(self.connector.get_resources(connection_id, "pods")["success"])
+        self.assertTrue(self.connector.get_resources(connection_id, "deployments")["circuit_open"])
+        breaker.close()
+    
+    @mock.patch("eks_connector.client.VersionApi")
+    def test_health_check_refreshes_cluster_info(self, version_api):
+        """Test that health checks mark unreachable clusters, count against the circuit and refresh the version"""
+        self.connector = EKSConnector(breaker_failure_threshold=1, breaker_reset_timeout=60)
+        connection_id = self.add_connection()
+        cluster = self.connector.connected_clusters[connection_id]
+        cluster["cluster_info"].update(status="ACTIVE", version="1.29")
+        cluster["eks_status"] = "ACTIVE"
+        version_api.return_value.get_code.side_effect = NewConnectionError(None, "Connection refused")
+        
+        health = self.connector.check_health(connection_id)
+        
+        self.assertFalse(health["reachable"])
+        self.assertIn("Connection refused", health["error"])
+        listed = self.connector.list_connected_clusters()[0]
+        self.assertEqual(listed["cluster_info"]["status"], "UNREACHABLE")
+        self.assertEqual(listed["circuit"]["state"], "open")
+        
+        version_api.return_value.get_code.side_effect = None
+        version_api.return_value.get_code.return_value = self.version_info(minor="30+")
+        health = self.connector.check_health(connection_id)
+        
+        self.assertTrue(health["reachable"])
+        self.assertIsNotNone(health["latency_ms"])
+        self.assertEqual(health["last_seen"], health["last_checked"])
+        listed = self.connector.list_connected_clusters()[0]
+        self.assertEqual(listed["cluster_info"]["status"], "ACTIVE")
+        self.assertEqual(listed["cluster_info"]["version"], "1.30")
+        self.assertEqual(listed["circuit"]["state"], "closed")
+        self.assertIsNone(self.connector.check_health("missing"))
+    
+    @mock.patch("eks_connector.client.VersionApi")
+    @mock.patch("eks_connector.EKSTokenProvider")
+    @mock.patch("eks_connector.boto3.Session")
+    def test_restart_restores_snapshots(self, session_class, token_provider_class, version_api):
+        """Test that a new connector restores saved connections and serves saved items while watches resume"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        version_api.return_value.get_code.return_value = self.version_info()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = SQLiteSnapshotStore(os.path.join(directory, "snapshots.db"))
+        cluster_info = {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="},
+            "version": "1.29",
+            "status": "ACTIVE"
+        }
+        before = EKSConnector(snapshot_store=store)
+        before._connect_with_cluster_info(mock.Mock(), cluster_info, "demo", "us-east-1", {"type": "profile", "profile_name": "ops"})
+        before._connect_with_cluster_info(mock.Mock(), dict(cluster_info, name="keyed"), "keyed", "us-east-1",
+                                          {"type": "keys", "identity": "keys:abc", "aws_access_key_id": "AKIAEXAMPLE",
+                                           "aws_secret_access_key": "secret"})
+        for connection_id in ("us-east-1_demo", "us-east-1_keyed"):
+            informer = ResourceInformer(mock.Mock(), None, "pods")
+            informer.store.replace({"web/a": PodRecord(name="a", namespace="web", containers=("app",))}, "10")
+            before.connected_clusters[connection_id]["informers"]["pods"] = informer
+        # Nothing of the key-based connection is saved
+        self.assertEqual(before.save_snapshots(), 1)
+        self.assertEqual(before.save_snapshots(), 0)
+        self.assertEqual(list(store.connections()), ["us-east-1_demo"])
+        # Left by an older version, which saved key-based connections too
+        store.save_connection("us-east-1_old", {"region": "us-east-1", "auth": {"type": "keys", "identity": "keys:def"}})
+        version_api.reset_mock()
+        
+        after = EKSConnector(snapshot_store=store)
+        with mock.patch.object(ResourceInformer, "_start_watch") as start_watch:
+            self.assertEqual(after.restore_snapshots(), ["us-east-1_demo"])
+            result = after.get_resources("us-east-1_demo", "pods")
+        
+        version_api.return_value.get_code.assert_not_called()
+        start_watch.assert_called_once()
+        session_class.assert_called_with(profile_name="ops", region_name="us-east-1")
+        self.assertTrue(result["stale"])
+        self.assertEqual(result["items"][0]["containers"], ["app"])
+        self.assertEqual(after.connected_clusters["us-east-1_demo"]["informers"]["pods"].store.resource_version, "10")
+        
+        after.disconnect("us-east-1_demo")
+        self.assertEqual(store.connections(), {})
+        self.assertIsNone(store.load_resources("us-east-1_demo", "pods"))
+    
+    @mock.patch("eks_connector.client.VersionApi")
+    @mock.patch("eks_connector.EKSTokenProvider")
+    @mock.patch("eks_connector.boto3.Session")
+    def test_registry_connections_resume_informers_from_snapshots(self, session_class, token_provider_class, version_api):
+        """Test that with a registry, connections are rebuilt on first use and their informers resume from snapshots"""
+        token_provider_class.return_value.get_token.return_value = "k8s-aws-v1.token"
+        version_api.return_value.get_code.return_value = self.version_info()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = SQLiteSnapshotStore(os.path.join(directory, "snapshots.db"))
+        registry = MemoryConnectionRegistry()
+        cluster_info = {
+            "name": "demo",
+            "arn": "arn:aws:eks:us-east-1:123456789012:cluster/demo",
+            "endpoint": "https://demo.example.com",
+            "certificateAuthority": {"data": "Y2VydA=="}
+        }
+        before = EKSConnector(connection_registry=registry, snapshot_store=store)
+        before._connect_with_cluster_info(mock.Mock(), cluster_info, "demo", "us-east-1", {"type": "default"})
+        informer = ResourceInformer(mock.Mock(), None, "pods")
+        informer.store.replace({"web/a": PodRecord(name="a", namespace="web")}, "10")
+        before.connected_clusters["us-east-1_demo"]["informers"]["pods"] = informer
+        before.save_snapshots()
+        
+        after = EKSConnector(connection_registry=registry, snapshot_store=store)
+        self.assertEqual(after.restore_snapshots(), [])
+        self.assertEqual(after.connected_clusters, {})
+        with mock.patch.object(ResourceInformer, "_start_watch"):
+            result = after.get_resources("us-east-1_demo", "pods")
         
-    # TODO: Add more tests
+        self.assertTrue(result["stale"])
+        self.assertEqual(result["items"][0]["name"], "a")
 
 if __name__ == '__main__':
     unittest.main()
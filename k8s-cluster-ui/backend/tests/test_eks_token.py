@@ -0,0 +1,74 @@
+import base64
+import unittest
+from unittest import mock
+import boto3
+from botocore.credentials import Credentials
+from aws_sessions import PooledSession
+from eks_token import EKSTokenProvider, TOKEN_LIFETIME
+
+PRESIGNED_URL = "https://sts.us-east-1.amazonaws.com/?Action=GetCallerIdentity&Version=2011-06-15&X-Amz-Signature=abc"
+
+def decode_token(token):
+    encoded = token[len("k8s-aws-v1."):]
+    return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+
+class TestEKSTokenProvider(unittest.TestCase):
+    def setUp(self):
+        self.signer = mock.Mock()
+        self.signer.generate_presigned_url.return_value = PRESIGNED_URL
+        self.provider = EKSTokenProvider(mock.Mock(), "demo", "us-east-1", signer=self.signer)
+    
+    def test_token_format(self):
+        """Test that the token is the base64url encoded presigned URL without padding"""
+        token = self.provider.get_token()
+        
+        self.assertTrue(token.startswith("k8s-aws-v1."))
+        self.assertNotIn("=", token)
+        encoded = token[len("k8s-aws-v1."):]
+        decoded = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+        self.assertEqual(decoded, PRESIGNED_URL)
+    
+    def test_presigned_request_is_bound_to_cluster(self):
+        """Test that the signed request carries the cluster name header"""
+        self.provider.get_token()
+        
+        request_dict = self.signer.generate_presigned_url.call_args[0][0]
+        self.assertEqual(request_dict["headers"], {"x-k8s-aws-id": "demo"})
+        self.assertIn("Action=GetCallerIdentity", request_dict["url"])
+        self.assertEqual(self.signer.generate_presigned_url.call_args[1]["region_name"], "us-east-1")
+    
+    @mock.patch("eks_token.time.time")
+    def test_token_is_cached_until_expiry(self, now):
+        """Test that a new token is only signed shortly before the cached one expires"""
+        now.return_value = 1000
+        self.provider.get_token()
+        now.return_value = 1000 + TOKEN_LIFETIME - 120
+        self.provider.get_token()
+        self.assertEqual(self.signer.generate_presigned_url.call_count, 1)
+        
+        now.return_value = 1000 + TOKEN_LIFETIME - 30
+        self.provider.get_token()
+        self.assertEqual(self.signer.generate_presigned_url.call_count, 2)
+    
+    @mock.patch("eks_token.time.time")
+    def test_each_token_is_signed_with_current_credentials(self, now):
+        """Test that new tokens are signed with the shared session's credentials at that time"""
+        boto_session = boto3.Session(region_name="us-east-1")
+        boto_session.get_credentials = mock.Mock(side_effect=[
+            Credentials("AKIAFIRST", "first-secret"),
+            Credentials("AKIAROTATED", "rotated-secret", "rotated-token")
+        ])
+        provider = EKSTokenProvider(PooledSession(boto_session), "demo", "us-east-1")
+        
+        now.return_value = 1000
+        first = decode_token(provider.get_token())
+        now.return_value = 1000 + TOKEN_LIFETIME
+        second = decode_token(provider.get_token())
+        
+        self.assertIn("X-Amz-Credential=AKIAFIRST%2F", first)
+        self.assertIn("X-Amz-Credential=AKIAROTATED%2F", second)
+        self.assertIn("X-Amz-Security-Token=rotated-token", second)
+        self.assertNotIn("X-Amz-Security-Token", first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import threading
+import unittest
+from unittest import mock
+from health_monitor import HealthMonitor
+
+class TestHealthMonitor(unittest.TestCase):
+    def test_targets_are_checked_on_jittered_schedule(self):
+        """Test that new targets get a random first check and are then checked about every interval"""
+        monitor = HealthMonitor(mock.Mock(), lambda: ["a", "b"], interval=60, jitter=0.2)
+        with mock.patch("health_monitor.random.uniform", side_effect=[10, 50]):
+            self.assertEqual(monitor._due_targets(0), [])
+        self.assertEqual(monitor._next_wait(0), 10)
+
+        with mock.patch("health_monitor.random.uniform", return_value=1.1):
+            self.assertEqual(monitor._due_targets(10), ["a"])
+        self.assertEqual(monitor._due["a"], 10 + 66)
+        # A check still running isn't started again
+        monitor._due["a"] = 0
+        self.assertEqual(monitor._due_targets(20), [])
+
+    def test_removed_targets_are_forgotten(self):
+        """Test that targets that went away are no longer scheduled"""
+        targets = ["a", "b"]
+        monitor = HealthMonitor(mock.Mock(), lambda: list(targets), interval=60)
+        monitor._due_targets(0)
+        targets.remove("b")
+        monitor._due_targets(1)
+        self.assertEqual(list(monitor._due), ["a"])
+
+    def test_background_checks_survive_errors(self):
+        """Test that the monitor keeps checking after a check raised an exception"""
+        checked = []
+        done = threading.Event()
+
+        def check(target):
+            checked.append(target)
+            if len(checked) >= 2:
+                done.set()
+            raise RuntimeError("unreachable")
+
+        monitor = HealthMonitor(check, lambda: ["a"], interval=0.05)
+        monitor.start()
+        try:
+            self.assertTrue(done.wait(2))
+        finally:
+            monitor.stop()
+        self.assertEqual(checked[:2], ["a", "a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import gzip
+import unittest
+from unittest import mock
+import http_cache
+from http_cache import choose_encoding, compress, content_etag, etag_matches, matched_etag, version_etag
+
+
+class TestHttpCache(unittest.TestCase):
+    def test_etag_matches(self):
+        etag = content_etag(b'{"success": true}')
+
+        self.assertTrue(etag_matches(f'"{etag}"', etag))
+        self.assertTrue(etag_matches(f'"other", W/"{etag}"', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+    def test_matched_etag_keeps_the_clients_form(self):
+        self.assertEqual(matched_etag('W/"abc"', "abc"), 'W/"abc"')
+        self.assertEqual(matched_etag('"other", "abc"', "abc"), '"abc"')
+        self.assertEqual(matched_etag('*', "abc"), '"abc"')
+        self.assertIsNone(matched_etag('W/"other"', "abc"))
+
+    def test_version_etag_depends_on_all_parts(self):
+        self.assertEqual(version_etag("c", "pods", "a1:5", ""), version_etag("c", "pods", "a1:5", ""))
+        self.assertNotEqual(version_etag("c", "pods", "a1:5", ""), version_etag("c", "pods", "a1:6", ""))
+        self.assertNotEqual(version_etag("c", "pods", "a1:5", ""), version_etag("c", "pods", "a1:5", "namespace=web"))
+
+    def test_choose_encoding(self):
+        with mock.patch.object(http_cache, "brotli", None):
+            self.assertEqual(choose_encoding("gzip, deflate, br"), "gzip")
+        with mock.patch.object(http_cache, "brotli", mock.Mock()):
+            self.assertEqual(choose_encoding("gzip, deflate, br"), "br")
+            self.assertEqual(choose_encoding("gzip, br;q=0"), "gzip")
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding(None))
+
+    def test_gzip_round_trip(self):
+        body = b'{"items": []}' * 200
+        self.assertEqual(gzip.decompress(compress(body, "gzip")), body)
+
+
+if __name__ == '__main__':
+    unittest.main()
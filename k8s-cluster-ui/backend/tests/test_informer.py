@@ -0,0 +1,266 @@
+import json
+import threading
+import unittest
+from unittest import mock
+from kubernetes.client.rest import ApiException
+from informer import ResourceInformer, ResourceStore
+
+
+def make_pod(name, resource_version, namespace="default"):
+    return {"metadata": {"name": name, "namespace": namespace, "resourceVersion": resource_version}}
+
+
+def make_list(pods, resource_version):
+    """Build a raw (_preload_content=False) list response"""
+    body = {"items": pods, "metadata": {"resourceVersion": resource_version}}
+    return mock.Mock(data=json.dumps(body).encode())
+
+
+class FakeWatch:
+    """Replays a scripted sequence of watch rounds; each round is a list of events or an exception."""
+    def __init__(self, rounds, done):
+        self.rounds = rounds
+        self.done = done
+        self.calls = []
+
+    def __call__(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def stream(self, func, **kwargs):
+        self.calls.append(kwargs)
+        if not self.rounds:
+            self.done.set()
+            # Block like an idle watch until the informer is stopped
+            threading.Event().wait(0.05)
+            return
+        current = self.rounds.pop(0)
+        if isinstance(current, Exception):
+            raise current
+        for event in current:
+            yield event
+
+
+def format_pod(pod):
+    return {"name": pod["metadata"]["name"], "namespace": pod["metadata"]["namespace"]}
+
+
+class TestResourceInformer(unittest.TestCase):
+    def run_informer(self, list_func, rounds):
+        done = threading.Event()
+        fake_watch = FakeWatch(rounds, done)
+        with mock.patch("informer.RawWatch", fake_watch):
+            informer = ResourceInformer(list_func, format_pod, "pods", retry_delay=0)
+            informer.start()
+            self.assertTrue(done.wait(2))
+            informer.stop()
+        return informer, fake_watch
+
+    def test_initial_list_populates_store(self):
+        list_func = mock.Mock(return_value=make_list([make_pod("b", "1"), make_pod("a", "2")], "10"))
+        informer, fake_watch = self.run_informer(list_func, [])
+
+        self.assertEqual([item["name"] for item in informer.list()], ["a", "b"])
+        self.assertEqual(fake_watch.calls[0]["resource_version"], "10")
+
+    def test_watch_events_update_store(self):
+        list_func = mock.Mock(return_value=make_list([make_pod("a", "1"), make_pod("b", "2")], "10"))
+        events = [
+            {"type": "ADDED", "object": make_pod("c", "11")},
+            {"type": "DELETED", "object": make_pod("a", "12")},
+            {"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "15"}}},
+        ]
+        informer, fake_watch = self.run_informer(list_func, [events])
+
+        self.assertEqual([item["name"] for item in informer.list()], ["b", "c"])
+        self.assertEqual(informer.store.resource_version, "15")
+        self.assertEqual(fake_watch.calls[-1]["resource_version"], "15")
+
+    def test_relist_on_gone(self):
+        list_func = mock.Mock(side_effect=[
+            make_list([make_pod("a", "1")], "10"),
+            make_list([make_pod("z", "30")], "30"),
+        ])
+        informer, fake_watch = self.run_informer(list_func, [ApiException(status=410, reason="Gone")])
+
+        self.assertEqual(list_func.call_count, 2)
+        self.assertEqual([item["name"] for item in informer.list()], ["z"])
+        self.assertEqual(fake_watch.calls[-1]["resource_version"], "30")
+
+    def test_resume_watches_from_saved_version(self):
+        """Test that a resumed informer serves the saved items as stale and doesn't list"""
+        list_func = mock.Mock()
+        done = threading.Event()
+        release = threading.Event()
+        fake_watch = FakeWatch([[{"type": "ADDED", "object": make_pod("b", "21")}]], done)
+        original_stream = fake_watch.stream
+
+        def stream(func, **kwargs):
+            release.wait(1)
+            return original_stream(func, **kwargs)
+
+        fake_watch.stream = stream
+        with mock.patch("informer.RawWatch", fake_watch):
+            informer = ResourceInformer(list_func, format_pod, "pods", retry_delay=0)
+            informer.resume({"default/a": {"name": "a", "namespace": "default"}}, "20")
+            self.assertTrue(informer.stale)
+            self.assertTrue(informer.version.endswith(":stale"))
+            self.assertEqual([item["name"] for item in informer.list()], ["a"])
+            release.set()
+            self.assertTrue(done.wait(2))
+            informer.stop()
+
+        list_func.assert_not_called()
+        self.assertEqual(fake_watch.calls[0]["resource_version"], "20")
+        self.assertFalse(informer.stale)
+        self.assertEqual([item["name"] for item in informer.list()], ["a", "b"])
+
+    def test_resume_relists_when_saved_version_expired(self):
+        list_func = mock.Mock(return_value=make_list([make_pod("z", "30")], "30"))
+        done = threading.Event()
+        fake_watch = FakeWatch([ApiException(status=410, reason="Gone")], done)
+        with mock.patch("informer.RawWatch", fake_watch):
+            informer = ResourceInformer(list_func, format_pod, "pods", retry_delay=0)
+            informer.resume({"default/a": {"name": "a", "namespace": "default"}}, "5")
+            self.assertTrue(done.wait(2))
+            informer.stop()
+
+        self.assertFalse(informer.stale)
+        self.assertEqual([item["name"] for item in informer.list()], ["z"])
+
+    def test_stop_ends_thread(self):
+        list_func = mock.Mock(return_value=make_list([], "1"))
+        informer, _ = self.run_informer(list_func, [])
+
+        self.assertTrue(informer.stopped)
+        informer._thread.join(1)
+        self.assertFalse(informer._thread.is_alive())
+
+
+
+class TestResourceStoreIndexes(unittest.TestCase):
+    def setUp(self):
+        self.store = ResourceStore(indexed_fields=("namespace", "node"))
+        self.store.replace({
+            "db/a": {"name": "a", "namespace": "db", "node": "n1"},
+            "web/b": {"name": "b", "namespace": "web", "node": "n1"},
+            "web/c": {"name": "c", "namespace": "web", "node": "n2"}
+        }, "1")
+
+    def names(self, items):
+        return [item["name"] for item in items]
+
+    def test_select_intersects_indexes(self):
+        self.assertEqual(self.names(self.store.select(node="n1")), ["a", "b"])
+        self.assertEqual(self.names(self.store.select(namespace="web", node="n1")), ["b"])
+        self.assertEqual(self.store.select(node="missing"), [])
+        self.assertEqual(self.names(self.store.list(namespace="web")), ["b", "c"])
+
+    def test_indexes_follow_updates(self):
+        self.store.upsert("web/b", {"name": "b", "namespace": "web", "node": "n2"})
+        self.store.delete("web/c")
+        self.store.delete("db/a")
+        self.store.upsert("web/d", {"name": "d", "namespace": "web", "node": "n1"})
+
+        self.assertEqual(self.names(self.store.select(node="n1")), ["d"])
+        self.assertEqual(self.names(self.store.select(node="n2")), ["b"])
+        self.assertNotIn("db", self.store._indices["namespace"])
+
+    def test_list_order_follows_changes(self):
+        self.assertEqual(self.names(self.store.list()), ["a", "b", "c"])
+        ordered_keys = self.store._ordered_keys
+        # Updating an item keeps the order
+        self.store.upsert("web/b", {"name": "b2", "namespace": "web", "node": "n1"})
+        self.assertEqual(self.names(self.store.list()), ["a", "b2", "c"])
+        self.assertIs(self.store._ordered_keys, ordered_keys)
+
+        self.store.upsert("db/0", {"name": "0", "namespace": "db", "node": "n1"})
+        self.store.delete("web/c")
+        self.assertEqual(self.names(self.store.list()), ["0", "a", "b2"])
+
+    def test_set_resource_version(self):
+        self.store.set_resource_version("5")
+        self.assertEqual(self.store.snapshot()[1], "5")
+
+
+class TestInformerSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.list_func = mock.Mock(return_value=make_list([make_pod("a", "1"), make_pod("b", "2")], "10"))
+        self.informer = ResourceInformer(self.list_func, format_pod, "pods", event_buffer_size=3)
+        self.informer._relist()
+
+    def test_subscribe_starts_with_snapshot_then_deltas(self):
+        subscription = self.informer.subscribe()
+        self.informer._apply("ADDED", "default/c", format_pod(make_pod("c", "11")), "11")
+        self.informer._apply("DELETED", "default/a", None, "12")
+
+        snapshot = subscription.get(0)
+        self.assertEqual(snapshot["type"], "SNAPSHOT")
+        self.assertEqual([item["name"] for item in snapshot["items"]], ["a", "b"])
+        self.assertEqual([(event["type"], event["object"]["name"]) for event in (subscription.get(0), subscription.get(0))],
+                         [("ADDED", "c"), ("DELETED", "a")])
+        self.assertIsNone(subscription.get(0))
+
+    def test_unchanged_items_are_not_published(self):
+        subscription = self.informer.subscribe()
+        subscription.get(0)
+        self.informer._apply("MODIFIED", "default/a", format_pod(make_pod("a", "11")), "11")
+
+        self.assertIsNone(subscription.get(0))
+        self.assertEqual(self.informer.store.resource_version, "11")
+
+    def test_resume_replays_buffered_events(self):
+        first = self.informer.subscribe()
+        self.informer._apply("ADDED", "default/c", format_pod(make_pod("c", "11")), "11")
+        first.get(0)
+        seen = first.get(0)["id"]
+        self.informer._apply("ADDED", "default/d", format_pod(make_pod("d", "12")), "12")
+
+        resumed = self.informer.subscribe(last_event_id=seen)
+
+        event = resumed.get(0)
+        self.assertEqual((event["type"], event["object"]["name"]), ("ADDED", "d"))
+        self.assertIsNone(resumed.get(0))
+
+    def test_resume_outside_buffer_gets_snapshot(self):
+        for index in range(5):
+            self.informer._apply("ADDED", f"default/n{index}", format_pod(make_pod(f"n{index}", "2")), "2")
+
+        stale = self.informer.subscribe(last_event_id=f"{self.informer.stream_id}:1")
+        other_stream = self.informer.subscribe(last_event_id="deadbeef:5")
+
+        self.assertEqual(stale.get(0)["type"], "SNAPSHOT")
+        self.assertEqual(other_stream.get(0)["type"], "SNAPSHOT")
+
+    def test_slow_subscriber_is_resynced(self):
+        subscription = self.informer.subscribe(max_queued=2)
+        for index in range(3):
+            self.informer._apply("ADDED", f"default/n{index}", format_pod(make_pod(f"n{index}", "2")), "2")
+
+        event = subscription.get(0)
+        self.assertEqual(event["type"], "SNAPSHOT")
+        self.assertEqual(len(event["items"]), 5)
+        self.assertIsNone(subscription.get(0))
+
+    def test_relist_publishes_differences(self):
+        subscription = self.informer.subscribe()
+        subscription.get(0)
+        self.list_func.return_value = make_list([make_pod("b", "2"), make_pod("c", "20")], "20")
+
+        self.informer._relist()
+
+        self.assertEqual([(event["type"], event["object"]["name"]) for event in (subscription.get(0), subscription.get(0))],
+                         [("DELETED", "a"), ("ADDED", "c")])
+
+    def test_stop_closes_subscriptions(self):
+        subscription = self.informer.subscribe()
+        self.informer.stop()
+
+        self.assertTrue(subscription.closed)
+        self.assertTrue(self.informer.subscribe().closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
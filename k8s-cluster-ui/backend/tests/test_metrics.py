@@ -0,0 +1,44 @@
+import unittest
+from metrics import parse_cpu, parse_memory, usage_index
+
+class TestMetrics(unittest.TestCase):
+    def test_parse_cpu(self):
+        """Test that CPU quantities are converted to millicores"""
+        self.assertEqual(parse_cpu("250m"), 250.0)
+        self.assertEqual(parse_cpu("2"), 2000.0)
+        self.assertEqual(parse_cpu("0.5"), 500.0)
+        self.assertEqual(parse_cpu("12345678n"), 12.345678)
+        self.assertEqual(parse_cpu("1500u"), 1.5)
+    
+    def test_parse_memory(self):
+        """Test that memory quantities are converted to bytes"""
+        self.assertEqual(parse_memory("128974848"), 128974848)
+        self.assertEqual(parse_memory("129Mi"), 129 * 1024 ** 2)
+        self.assertEqual(parse_memory("1.5Gi"), 1536 * 1024 ** 2)
+        self.assertEqual(parse_memory("64k"), 64000)
+        self.assertEqual(parse_memory("2M"), 2000000)
+    
+    def test_usage_index_sums_pod_containers(self):
+        """Test that pod usage is the sum of its containers, keyed by namespace and name"""
+        metrics_list = {"items": [{
+            "metadata": {"name": "web-1", "namespace": "default"},
+            "containers": [
+                {"name": "app", "usage": {"cpu": "100m", "memory": "64Mi"}},
+                {"name": "sidecar", "usage": {"cpu": "2500000n", "memory": "16Mi"}}
+            ]
+        }]}
+        
+        self.assertEqual(usage_index(metrics_list, "pods"), {
+            ("default", "web-1"): {"cpu_millicores": 102.5, "memory_bytes": 80 * 1024 ** 2}
+        })
+    
+    def test_usage_index_nodes(self):
+        """Test that node usage is keyed without a namespace"""
+        metrics_list = {"items": [{"metadata": {"name": "node-1"}, "usage": {"cpu": "1", "memory": "2Gi"}}]}
+        
+        self.assertEqual(usage_index(metrics_list, "nodes"), {
+            (None, "node-1"): {"cpu_millicores": 1000.0, "memory_bytes": 2 * 1024 ** 3}
+        })
+
+if __name__ == '__main__':
+    unittest.main()
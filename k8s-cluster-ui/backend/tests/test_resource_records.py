@@ -0,0 +1,58 @@
+import json
+import unittest
+from resource_records import NodeRecord, PodRecord, ServiceRecord, format_timestamp, intern
+
+
+class TestResourceRecords(unittest.TestCase):
+    def test_to_dict_builds_response_shape(self):
+        pod = PodRecord(name="web-0", namespace="web", containers=("app", "sidecar"), created_at="2024-05-01T10:00:00Z")
+
+        self.assertEqual(pod.to_dict(), {
+            "name": "web-0",
+            "namespace": "web",
+            "status": None,
+            "reason": None,
+            "restarts": None,
+            "containers": ["app", "sidecar"],
+            "node": None,
+            "owner": None,
+            "created_at": "2024-05-01T10:00:00+00:00"
+        })
+        self.assertEqual(pod.to_dict(["name", "containers"]), {"name": "web-0", "containers": ["app", "sidecar"]})
+
+    def test_service_ports_expand(self):
+        service = ServiceRecord(name="web", ports=((80, "http", "TCP"),))
+
+        self.assertEqual(service.to_dict()["ports"], [{"port": 80, "target_port": "http", "protocol": "TCP"}])
+
+    def test_records_have_no_instance_dict(self):
+        node = NodeRecord(name="n1", status="Ready")
+
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.get("status"), "Ready")
+        self.assertEqual(node.get("namespace", "none"), "none")
+
+    def test_equality_compares_values(self):
+        self.assertEqual(PodRecord(name="a", status="Running"), PodRecord(name="a", status="Running"))
+        self.assertNotEqual(PodRecord(name="a", status="Running"), PodRecord(name="a", status="Pending"))
+        self.assertNotEqual(PodRecord(name="a"), NodeRecord(name="a"))
+
+    def test_rows_survive_json(self):
+        """Test that records stored as JSON rows come back equal, with their tuples"""
+        service = ServiceRecord(name="web", namespace="shop", ports=((80, "http", "TCP"), (443, 8443, "TCP")))
+
+        restored = ServiceRecord.from_row(json.loads(json.dumps(service.to_row())))
+
+        self.assertEqual(restored, service)
+        self.assertEqual(restored.ports, ((80, "http", "TCP"), (443, 8443, "TCP")))
+        self.assertIs(restored.namespace, intern("shop"))
+
+    def test_helpers(self):
+        self.assertIs(intern("".join(["team-", "a"])), intern("team-a"))
+        self.assertIsNone(intern(None))
+        self.assertIsNone(format_timestamp(None))
+        self.assertEqual(format_timestamp("2024-05-01T10:00:00+02:00"), "2024-05-01T10:00:00+02:00")
+
+
+if __name__ == '__main__':
+    unittest.main()
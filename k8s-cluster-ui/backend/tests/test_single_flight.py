@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from single_flight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+    def run_concurrently(self, flight, key, func, callers=5):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do(key, func))) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+    
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers arriving while a call runs wait for it and get its result"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        
+        def func():
+            calls.append(1)
+            started.set()
+            release.wait(1)
+            return {"items": []}
+        
+        leader = threading.Thread(target=flight.do, args=("pods", func))
+        leader.start()
+        started.wait(1)
+        threads, results = self.run_concurrently(flight, "pods", func, callers=4)
+        while flight.stats()["coalesced"] < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads + [leader]:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"items": []}] * 4)
+        self.assertEqual(flight.stats()["executions"], 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+    
+    def test_errors_are_shared_but_not_reused(self):
+        """Test that a failed call raises for every caller and the next call runs again"""
+        flight = SingleFlight(reuse_window=60)
+        
+        with self.assertRaises(ValueError):
+            flight.do("pods", mock.Mock(side_effect=ValueError("boom")))
+        
+        self.assertEqual(flight.do("pods", lambda: 1), 1)
+        self.assertEqual(flight.stats()["executions"], 2)
+    
+    @mock.patch("single_flight.time.monotonic")
+    def test_reuse_window(self, now):
+        """Test that finished results are reused within the window only"""
+        flight = SingleFlight(reuse_window=2)
+        func = mock.Mock(side_effect=[1, 2])
+        now.return_value = 100
+        
+        self.assertEqual(flight.do("pods", func), 1)
+        now.return_value = 101
+        self.assertEqual(flight.do("pods", func), 1)
+        now.return_value = 102
+        self.assertEqual(flight.do("pods", func), 2)
+        
+        self.assertEqual(flight.stats()["reused"], 1)
+    
+    def test_async_calls_share_one_execution(self):
+        """Test that concurrent coroutines with the same key await one call"""
+        flight = SingleFlight()
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        async def main():
+            return await asyncio.gather(*(flight.do_async("pods", fetch) for _ in range(3)))
+        
+        self.assertEqual(asyncio.run(main()), ["result"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from snapshot_store import SQLiteSnapshotStore, create_snapshot_store
+
+
+class TestSQLiteSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "snapshots.db")
+        self.store = SQLiteSnapshotStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_connections_are_saved_without_credentials(self):
+        self.store.save_connection("us-east-1_demo", {
+            "region": "us-east-1",
+            "auth": {"type": "keys", "identity": "keys:abc", "aws_access_key_id": "AKIAEXAMPLE",
+                     "aws_secret_access_key": "secret", "aws_session_token": "token"}
+        })
+
+        self.assertEqual(SQLiteSnapshotStore(self.path).connections(), {
+            "us-east-1_demo": {"region": "us-east-1", "auth": {"type": "keys", "identity": "keys:abc"}}
+        })
+        with open(self.path, "rb") as database:
+            self.assertNotIn(b"secret", database.read())
+
+    def test_resources_round_trip(self):
+        self.store.save_resources("us-east-1_demo", "pods", "10", ("name", "namespace"), [["web/a", ["a", "web"]]])
+        self.store.save_resources("us-east-1_demo", "pods", "12", ("name", "namespace"), [["web/b", ["b", "web"]]])
+
+        snapshot = self.store.load_resources("us-east-1_demo", "pods")
+
+        self.assertEqual(snapshot["resource_version"], "12")
+        self.assertEqual(snapshot["fields"], ("name", "namespace"))
+        self.assertEqual(snapshot["rows"], [["web/b", ["b", "web"]]])
+        self.assertEqual(self.store.resource_types("us-east-1_demo"), ["pods"])
+        self.assertIsNone(self.store.load_resources("us-east-1_demo", "nodes"))
+
+    def test_delete(self):
+        self.store.save_connection("us-east-1_demo", {"region": "us-east-1"})
+        self.store.save_resources("us-east-1_demo", "pods", "10", ("name",), [])
+
+        self.store.delete("us-east-1_demo", resources_only=True)
+        self.assertEqual(self.store.resource_types("us-east-1_demo"), [])
+        self.assertIsNotNone(self.store.get_connection("us-east-1_demo"))
+
+        self.store.delete("us-east-1_demo")
+        self.assertEqual(self.store.connections(), {})
+
+    def test_database_is_private(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_urls(self):
+        self.assertIsInstance(create_snapshot_store(f"sqlite:///{self.path}"), SQLiteSnapshotStore)
+        with self.assertRaises(ValueError):
+            create_snapshot_store("memory")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import sqlite_util
+from sqlite_util import connect, restrict_permissions
+
+
+class TestSqliteUtil(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_connections_are_kept_per_thread(self):
+        connection = connect(self.path)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(connect(self.path)))
+        thread.start()
+        thread.join()
+
+        self.assertIs(connect(self.path), connection)
+        self.assertIsNot(other[0], connection)
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_forked_workers_open_their_own_connection(self):
+        connection = connect(self.path)
+        with mock.patch.object(sqlite_util.os, "getpid", return_value=os.getpid() + 1):
+            self.assertIsNot(connect(self.path), connection)
+
+    def test_restrict_permissions(self):
+        connect(self.path)
+        restrict_permissions(self.path)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        with self.assertLogs("sqlite_util", "WARNING"):
+            restrict_permissions(os.path.join(self.directory, "missing.db"))
+
+
+if __name__ == '__main__':
+    unittest.main()
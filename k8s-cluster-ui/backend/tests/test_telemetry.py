@@ -0,0 +1,65 @@
+import json
+import logging
+import unittest
+from telemetry import STAGE_DURATION, Histogram, JSONFormatter, server_timing, set_log_level, start_request_timings, timed
+
+class TestTelemetry(unittest.TestCase):
+    def test_histogram_renders_prometheus_text(self):
+        """Test that observations are counted in cumulative buckets with sum and count"""
+        histogram = Histogram("test_seconds", "Test histogram.", ("endpoint",), buckets=(0.1, 1))
+        histogram.observe(0.05, endpoint="/api/a")
+        histogram.observe(0.5, endpoint="/api/a")
+        histogram.observe(2, endpoint='/api/"b"')
+        
+        lines = histogram.render().splitlines()
+        
+        self.assertEqual(lines[:2], ["# HELP test_seconds Test histogram.", "# TYPE test_seconds histogram"])
+        self.assertIn('test_seconds_bucket{endpoint="/api/a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{endpoint="/api/a",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{endpoint="/api/a",le="+Inf"} 2', lines)
+        self.assertIn('test_seconds_sum{endpoint="/api/a"} 0.55', lines)
+        self.assertIn('test_seconds_count{endpoint="/api/\\"b\\""} 1', lines)
+    
+    def test_timed_records_request_stages(self):
+        """Test that timed stages feed the histogram and the current request's timings"""
+        before = STAGE_DURATION.count(stage="kube_list", resource_type="pods")
+        timings = start_request_timings()
+        
+        with timed("kube_list", resource_type="pods"):
+            pass
+        with timed("format"):
+            pass
+        
+        self.assertEqual([stage for stage, _ in timings], ["kube_list", "format"])
+        self.assertEqual(STAGE_DURATION.count(stage="kube_list", resource_type="pods"), before + 1)
+    
+    def test_server_timing_sums_repeated_stages(self):
+        """Test that the Server-Timing header adds up stages and reports milliseconds"""
+        header = server_timing([("kube_list", 0.1), ("format", 0.002), ("kube_list", 0.05)], total=0.2)
+        
+        self.assertEqual(header, "kube_list;dur=150.0, format;dur=2.0, total;dur=200.0")
+    
+    def test_json_formatter_includes_extra_fields(self):
+        """Test that log records become JSON objects with their structured fields"""
+        record = logging.LogRecord("eks_connector", logging.INFO, __file__, 1, "Found %d pods", (3,), None)
+        record.connection_id = "us-east-1_demo"
+        
+        entry = json.loads(JSONFormatter().format(record))
+        
+        self.assertEqual(entry["message"], "Found 3 pods")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["connection_id"], "us-east-1_demo")
+    
+    def test_set_log_level(self):
+        """Test that the log level changes at runtime and invalid levels are rejected"""
+        previous = logging.getLogger().level
+        try:
+            self.assertEqual(set_log_level("debug"), "DEBUG")
+            self.assertTrue(logging.getLogger("eks_connector").isEnabledFor(logging.DEBUG))
+            with self.assertRaises(ValueError):
+                set_log_level("chatty")
+        finally:
+            logging.getLogger().setLevel(previous)
+
+if __name__ == '__main__':
+    unittest.main()
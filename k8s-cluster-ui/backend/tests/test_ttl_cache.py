@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+from ttl_cache import TTLCache
+
+class TestTTLCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        """Test that lookups are counted"""
+        cache = TTLCache()
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+    
+    @mock.patch("ttl_cache.time.monotonic")
+    def test_entries_expire(self, now):
+        """Test that entries are dropped once their TTL has passed"""
+        cache = TTLCache(ttl=10)
+        now.return_value = 100
+        cache.set("a", 1)
+        now.return_value = 109
+        self.assertEqual(cache.get("a"), 1)
+        now.return_value = 110
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+    
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used entry is evicted when the cache is full"""
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+    
+    def test_get_or_load_does_not_cache_errors(self):
+        """Test that the loader runs once per miss and failures are not cached"""
+        cache = TTLCache()
+        loader = mock.Mock(side_effect=[RuntimeError("boom"), 42])
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load("a", loader)
+        self.assertEqual(cache.get_or_load("a", loader), 42)
+        self.assertEqual(cache.get_or_load("a", loader), 42)
+        self.assertEqual(loader.call_count, 2)
+    
+    def test_invalidate(self):
+        """Test invalidating one key, a predicate match and everything"""
+        cache = TTLCache()
+        for key in ("a1", "a2", "b1"):
+            cache.set(key, key)
+        self.assertEqual(cache.invalidate(key="a1"), 1)
+        self.assertEqual(cache.invalidate(predicate=lambda key: key.startswith("a")), 1)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=300):
+        """
+        Thread-safe cache whose entries expire after a TTL, evicting the least recently used entry when full.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries
+            ttl (float, optional): Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, counting the lookup as a hit or a miss.
+
+        Args:
+            key: Cache key
+            default (optional): Value returned when the key is missing or expired
+
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Get a cached value, calling loader() and caching its result on a miss.
+
+        Args:
+            key: Cache key
+            loader: Callable producing the value; exceptions are not cached
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None, predicate=None):
+        """
+        Remove one entry, the entries matching a predicate, or everything.
+
+        Args:
+            key (optional): Key to remove
+            predicate (optional): Callable receiving a key, entries for which it returns True are removed
+
+        Returns:
+            int: Number of removed entries
+        """
+        with self._lock:
+            if key is not None:
+                return 1 if self._entries.pop(key, None) is not None else 0
+            if predicate is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            keys = [entry_key for entry_key in self._entries if predicate(entry_key)]
+            for entry_key in keys:
+                del self._entries[entry_key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -38,7 +38,10 @@ class K8sClusterAPI {
             const responseData = await response.json();
 
             if (!response.ok) {
-                throw new Error(responseData.message || 'API request failed');
+                const error = new Error(responseData.message || 'API request failed');
+                // Set when the connection has to be made again on the worker that answered (409)
+                error.reconnectRequired = Boolean(responseData.reconnect_required);
+                throw error;
             }
 
             return responseData;
@@ -38,7 +38,10 @@ class EKSClusterAPI {
             const responseData = await response.json();
 
             if (!response.ok) {
-                throw new Error(responseData.message || 'API request failed');
+                const error = new Error(responseData.message || 'API request failed');
+                // Set when the connection has to be made again on the worker that answered (409)
+                error.reconnectRequired = Boolean(responseData.reconnect_required);
+                throw error;
             }
 
             return responseData;
@@ -143,10 +146,39 @@ class EKSClusterAPI {
      * Get resources from a cluster
      * @param {string} connectionId - Connection ID
      * @param {string} resourceType - Resource type (pods, deployments, services, nodes)
+     * @param {object} options - Optional query parameters (namespace, labelSelector, fieldSelector, limit, continue, fields)
      * @returns {Promise<object>} - Resources data
      */
-    async getResources(connectionId, resourceType) {
-        return this._request(`/clusters/${connectionId}/resources/${resourceType}`);
+    async getResources(connectionId, resourceType, options = {}) {
+        const params = new URLSearchParams();
+        Object.entries(options).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') {
+                params.append(key, Array.isArray(value) ? value.join(',') : value);
+            }
+        });
+        const query = params.toString() ? `?${params.toString()}` : '';
+        return this._request(`/clusters/${connectionId}/resources/${resourceType}${query}`);
+    }
+
+    /**
+     * Get several resource types from a cluster in one request
+     * @param {string} connectionId - Connection ID
+     * @param {string[]} resourceTypes - Resource types to get, all types if empty
+     * @param {object} options - Optional query parameters (namespace, fields)
+     * @returns {Promise<object>} - Results keyed by resource type, with per-type errors
+     */
+    async getSnapshot(connectionId, resourceTypes = [], options = {}) {
+        const params = new URLSearchParams();
+        if (resourceTypes.length) {
+            params.append('types', resourceTypes.join(','));
+        }
+        Object.entries(options).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') {
+                params.append(key, Array.isArray(value) ? value.join(',') : value);
+            }
+        });
+        const query = params.toString() ? `?${params.toString()}` : '';
+        return this._request(`/clusters/${connectionId}/snapshot${query}`);
     }
 
     /**